@@ -96,6 +96,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tasks.activity.ActivityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -223,6 +224,36 @@ REST_FRAMEWORK = {
 }
 
 
+# Bulk task endpoints: items accepted per request and rows per INSERT/UPDATE statement.
+TASKS_BULK_MAX_ITEMS = 10000
+TASKS_BULK_BATCH_SIZE = 500
+
+# Task imports: rows committed per batch, the unit an interrupted import resumes from.
+TASKS_IMPORT_BATCH_SIZE = 5000
+
+# Chunked attachment uploads: largest chunk accepted per request and largest file.
+TASKS_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+TASKS_UPLOAD_MAX_SIZE = 5 * 1024 * 1024 * 1024
+
+# Attachment downloads: None streams files from Django, "x-accel-redirect" (nginx) or
+# "x-sendfile" (Apache, lighttpd) leave sending them to the front proxy. With nginx,
+# TASKS_ATTACHMENT_ACCEL_PREFIX must be an internal location aliased to MEDIA_ROOT.
+TASKS_ATTACHMENT_SENDFILE = None
+TASKS_ATTACHMENT_ACCEL_PREFIX = '/protected-media/'
+
+# Deadline scheduler: seconds between scans, hours before a deadline its reminder is
+# enqueued, and hours of past deadlines every scan looks at again, for late edits.
+TASKS_SCHEDULER_INTERVAL = 60
+TASKS_REMINDER_LEAD_HOURS = 24
+TASKS_SCHEDULER_LOOKBACK_HOURS = 1
+
+# Board ranks: columns whose longest rank key exceeds this many characters are rebalanced.
+TASKS_RANK_MAX_LENGTH = 32
+
+# Sprint critical paths: seconds a path stays cached. Changing a link or a deadline drops it sooner.
+TASKS_CRITICAL_PATH_CACHE_TIMEOUT = 24 * 60 * 60
+
+
 DJOSER = {
 
     'LOGIN_FIELD': 'username',
@@ -1,13 +1,14 @@
 from django.contrib import admin
+from core.admin import SoftDeleteAdmin
 from .models import CustomUser, Team, UserTeam
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(SoftDeleteAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'date_joined')
 
 @admin.register(Team)
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(SoftDeleteAdmin):
     list_display = ('name', 'owner', 'description')
     filter_horizontal = ('members',)  
     raw_id_fields = ('owner',) 
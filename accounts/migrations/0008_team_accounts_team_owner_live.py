@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-17 03:52
+
+import core.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_customuser_deleted_at_team_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=core.models.LiveIndex(fields=['owner'], name='accounts_team_owner_live'),
+        ),
+    ]
@@ -1,12 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext as _
-from core.models import SoftDeleteModel
+from core.models import CustomUserManager, LiveIndex, SoftDeleteModel
 
 
 class CustomUser(SoftDeleteModel, AbstractUser):
     teams = models.ManyToManyField('Team', through='UserTeam', related_name='team_members', verbose_name=_("Teams"))
 
+    objects = CustomUserManager()
+
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
@@ -94,6 +96,9 @@ class Team(SoftDeleteModel, models.Model):
     class Meta:
         verbose_name = _("Team")
         verbose_name_plural = _("Teams")
+        indexes = [
+            LiveIndex(fields=["owner"], name="accounts_team_owner_live"),
+        ]
 
     def __str__(self):
         return self.name
@@ -1,3 +1,23 @@
 from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
 
-# Register your models here.
+
+class SoftDeleteAdmin(admin.ModelAdmin):
+    """Admin for soft deletable models, deleting and restoring with one UPDATE per table."""
+    list_filter = ("is_deleted",)
+    actions = ["restore_selected"]
+
+    def get_queryset(self, request):
+        queryset = self.model._default_manager.with_deleted()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def delete_queryset(self, request, queryset):
+        queryset.soft_delete()
+
+    @admin.action(description=_("Restore selected %(verbose_name_plural)s"))
+    def restore_selected(self, request, queryset):
+        restored = queryset.restore()
+        self.message_user(request, _("Restored %d objects.") % restored)
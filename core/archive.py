@@ -0,0 +1,100 @@
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Exists, OuterRef
+
+
+def _blocking_relations(model):
+    """Yield the reverse relations whose rows must be gone before a row of ``model`` is moved.
+
+    ``SET_NULL`` relations never block, they are cleared in the same
+    transaction as the move.
+    """
+    for relation in model._meta.related_objects:
+        if relation.many_to_many or relation.on_delete is models.SET_NULL:
+            continue
+        yield relation
+
+
+def archive_order(models):
+    """Sorts archivable models so that children are moved before their parents."""
+    ordered = []
+    pending = list(models)
+    while pending:
+        for model in pending:
+            children = {relation.related_model for relation in _blocking_relations(model)}
+            if not children.intersection(pending) - {model}:
+                ordered.append(model)
+                pending.remove(model)
+                break
+        else:
+            ordered.extend(pending)
+            break
+    return ordered
+
+
+def archive_deleted(model, deleted_before, chunk_size=1000, throttle=0.0, using=DEFAULT_DB_ALIAS):
+    """Moves rows soft deleted before ``deleted_before`` to the archive table of ``model``.
+
+    Rows are moved in primary key order, ``chunk_size`` rows per transaction,
+    with one ``INSERT ... SELECT`` and one ``DELETE`` per chunk. Rows that are
+    still referenced by rows of the hot tables are left in place. The rows of
+    a chunk are read and locked in the transaction that moves them.
+
+    Args:
+        model (SoftDeleteModel): Model with an archive table.
+        deleted_before (datetime): Only rows deleted before this time are moved.
+        chunk_size (int): Number of rows moved per transaction.
+        throttle (float): Seconds to sleep between chunks, to let other
+            writers take the locks.
+        using (str): Database alias.
+
+    Returns:
+        int: The number of rows moved.
+    """
+    archive_model = model.archive_model
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in archive_model._meta.concrete_fields)
+    pk_column = quote(model._meta.pk.column)
+
+    candidates = model._base_manager.using(using).filter(is_deleted=True, deleted_at__lt=deleted_before)
+    for relation in _blocking_relations(model):
+        children = relation.related_model._base_manager.using(using).filter(**{relation.field.name: OuterRef("pk")})
+        candidates = candidates.exclude(Exists(children))
+    candidates = candidates.order_by("pk").values_list("pk", flat=True)
+
+    moved = 0
+    last_pk = None
+    while True:
+        chunk = candidates if last_pk is None else candidates.filter(pk__gt=last_pk)
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            # Locked until the chunk is moved, so none of its rows can be restored
+            # or get a new child in the meantime. Checking them again once locked
+            # sees the rows that changed while the locks were awaited.
+            locked = list(chunk.select_for_update()[:chunk_size])
+            if not locked:
+                return moved
+            last_pk = locked[-1]
+            pks = list(candidates.filter(pk__in=locked))
+            if not pks:
+                continue
+            placeholders = ", ".join(["%s"] * len(pks))
+            model.on_archive(pks, using)
+            for relation in model._meta.related_objects:
+                if not relation.many_to_many and relation.on_delete is models.SET_NULL:
+                    relation.related_model._base_manager.using(using).filter(
+                        **{f"{relation.field.name}__in": pks}
+                    ).update(**{relation.field.name: None})
+            cursor.execute(
+                f"INSERT INTO {quote(archive_model._meta.db_table)} ({columns}) "
+                f"SELECT {columns} FROM {quote(model._meta.db_table)} WHERE {pk_column} IN ({placeholders})",
+                pks,
+            )
+            cursor.execute(
+                f"DELETE FROM {quote(model._meta.db_table)} WHERE {pk_column} IN ({placeholders})",
+                pks,
+            )
+        moved += len(pks)
+        if throttle:
+            time.sleep(throttle)
@@ -0,0 +1,53 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+
+CONDITIONAL_HEADERS = ("HTTP_IF_MATCH", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE", "HTTP_IF_UNMODIFIED_SINCE")
+
+
+def version_etag(version):
+    """Returns the strong ETag of the representation of a row at ``version``."""
+    return quote_etag(str(version))
+
+
+def validator_headers(obj):
+    """Returns the ETag and Last-Modified headers of a ``VersionedModel`` row."""
+    return {"ETag": version_etag(obj.version), "Last-Modified": http_date(obj.updated_at.timestamp())}
+
+
+def not_modified(request, queryset):
+    """Answers a conditional GET of the single row of ``queryset`` from the row's validators alone.
+
+    Only the version and update time of the row are read, with the lookup the
+    queryset is filtered on, and only if the request is conditional.
+
+    Returns:
+        HttpResponse: The 304 (or 412) response to send instead of the row,
+        or None if the row has to be loaded and sent, or was not found.
+    """
+    if not any(request.META.get(header) for header in CONDITIONAL_HEADERS):
+        return None
+    row = queryset.values_list("version", "updated_at").first()
+    if row is None:
+        return None
+    version, updated_at = row
+    return get_conditional_response(request, etag=version_etag(version), last_modified=int(updated_at.timestamp()))
+
+
+def if_match_versions(header):
+    """Returns the versions an ``If-Match`` header accepts, or None if it accepts any.
+
+    Weak and unknown tags never match, as If-Match compares strongly; a header
+    with only such tags accepts no version at all.
+    """
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+    versions = []
+    for etag in etags:
+        if etag.startswith("W/"):
+            continue
+        try:
+            versions.append(int(etag.strip('"')))
+        except ValueError:
+            continue
+    return versions
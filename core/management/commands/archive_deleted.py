@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.archive import archive_deleted, archive_order
+
+
+class Command(BaseCommand):
+    help = "Moves rows soft deleted more than --days days ago to their archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30,
+                            help="Archive rows deleted more than this many days ago.")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Number of rows moved per transaction.")
+        parser.add_argument("--sleep", type=float, default=0.1,
+                            help="Seconds to wait between chunks.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        deleted_before = timezone.now() - timedelta(days=options["days"])
+        models = [model for model in apps.get_models() if getattr(model, "archive_model", None)]
+        for model in archive_order(models):
+            moved = archive_deleted(
+                model,
+                deleted_before,
+                chunk_size=options["chunk_size"],
+                throttle=options["sleep"],
+                using=options["database"],
+            )
+            self.stdout.write(f"{model._meta.label}: archived {moved} rows")
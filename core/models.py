@@ -1,20 +1,175 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.db.models.query import QuerySet
+from django.utils import timezone
+from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import BaseUserManager
 
 
+def _cascading_relations(model):
+    """Yield ``(child_model, field_name)`` for soft deletable children of ``model``.
 
-class CustomUserManager(BaseUserManager):
+    Only reverse foreign keys declared with ``on_delete=CASCADE`` are followed,
+    so a soft delete hides exactly what a hard delete would have removed.
+    """
+    for relation in model._meta.related_objects:
+        if relation.on_delete is not models.CASCADE:
+            continue
+        if not issubclass(relation.related_model, SoftDeleteModel):
+            continue
+        yield relation.related_model, relation.field.name
+
+
+def _update_subtree(queryset, values, child_filter, path=()):
+    """Apply ``values`` to every row cascading from ``queryset``, deepest level first.
+
+    Each level is a single ``UPDATE ... WHERE parent_id IN (SELECT ...)`` built
+    from the parent queryset, so nothing is loaded into Python.
+    """
+    path = path + (queryset.model,)
+    for child_model, field_name in _cascading_relations(queryset.model):
+        if child_model in path:
+            continue
+        children = child_model._base_manager.using(queryset.db).filter(
+            child_filter(field_name),
+            **{f"{field_name}__in": queryset.values("pk")},
+        )
+        _update_subtree(children, values, child_filter, path)
+        child_model.on_soft_delete(children, values["is_deleted"])
+        children.update(**values)
+
+
+class SoftDeleteQuerySet(QuerySet):
+
+    def live(self):
+        return self.filter(is_deleted=False)
+
+    def dead(self):
+        return self.filter(is_deleted=True)
+
+    def soft_delete(self, deleted_at=None):
+        """Soft deletes the rows of the queryset and everything cascading from them.
+
+        Args:
+            deleted_at (datetime): Deletion time, defaults to now.
+
+        Returns:
+            int: The number of rows of this queryset that were soft deleted.
+        """
+        deleted_at = deleted_at or timezone.now()
+        values = {"is_deleted": True, "deleted_at": deleted_at}
+        with transaction.atomic(using=self.db):
+            queryset = self.live()
+            _update_subtree(queryset, values, lambda field_name: models.Q(is_deleted=False))
+            self.model.on_soft_delete(queryset, True)
+            return queryset.update(**values)
+
+    soft_delete.alters_data = True
+    soft_delete.queryset_only = True
+
+    def restore(self):
+        """Restores the rows of the queryset and the children deleted along with them.
+
+        Children that were soft deleted on their own, before their parent, keep
+        their tombstone.
+
+        Returns:
+            int: The number of rows of this queryset that were restored.
+        """
+        values = {"is_deleted": False, "deleted_at": None}
+        with transaction.atomic(using=self.db):
+            queryset = self.dead()
+            _update_subtree(
+                queryset,
+                values,
+                lambda field_name: models.Q(is_deleted=True, deleted_at=F(f"{field_name}__deleted_at")),
+            )
+            self.model.on_soft_delete(queryset, False)
+            return queryset.update(**values)
+
+    restore.alters_data = True
+    restore.queryset_only = True
+
+    def delete(self):
+        return self.soft_delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        """Removes the rows from the database for good."""
+        return super().delete()
+
+    hard_delete.alters_data = True
+    hard_delete.queryset_only = True
+
+
+class LiveIndex(models.Index):
+    """Index over live rows only, i.e. a partial index ``WHERE NOT is_deleted``.
+
+    Live lookups always filter on ``is_deleted=False``, so tombstones never
+    need to be in the index. Backends without partial index support get a
+    composite index with ``is_deleted`` as its last column instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("condition", models.Q(is_deleted=False))
+        super().__init__(*args, **kwargs)
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.features.supports_partial_indexes:
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        fallback = models.Index(
+            fields=[*self.fields, "is_deleted"],
+            name=self.name,
+            db_tablespace=self.db_tablespace,
+        )
+        return fallback.create_sql(model, schema_editor, using=using, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        kwargs.pop("condition", None)
+        return path, args, kwargs
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Default manager of soft deletable models, returning live rows only.
+
+    Reverse related managers (``task.comments``, ``sprint.tasks``) are built
+    from this class, so they filter on the child table's own ``is_deleted``
+    column and never join the parent.
+    """
+
+    def get_queryset(self) -> models.QuerySet:
+        return self.with_deleted().live()
+
+    def with_deleted(self):
+        return super().get_queryset()
+
+    def dead(self):
+        return self.with_deleted().dead()
+
+    def archives(self, **filters):
+        """Soft deleted rows, including the ones already moved to the archive table.
+
+        Args:
+            **filters: Lookups applied to both the hot and the archive table.
+
+        Returns:
+            QuerySet: The tombstones of the hot table, unioned with the archived
+            rows when the model has an archive table.
+        """
+        tombstones = self.dead().filter(**filters)
+        if self.model.archive_model is None:
+            return tombstones
+        return tombstones.union(self.model.archive_model._base_manager.filter(**filters), all=True)
+
+
+class CustomUserManager(SoftDeleteManager, BaseUserManager):
     
     def get_by_natural_key(self, username):
         return self.get(username=username)
-    
-    def get_queryset(self) -> models.QuerySet:
-        return super().get_queryset().filter(is_deleted=False)
-
-    def archives(self):
-        return super().get_queryset().filter(is_deleted=True)
 
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -38,21 +193,128 @@ class CustomUserManager(BaseUserManager):
 
 
 class SoftDeleteModel(models.Model):
-    objects = CustomUserManager()
+    objects = SoftDeleteManager()
+    archive_model = None
 
     is_deleted = models.BooleanField(default=False, db_index=True)
+    deleted_at = models.DateTimeField(_("Deleted at"), null=True, blank=True, editable=False)
 
-    def delete(self):
+    def soft_delete(self):
+        """Soft deletes the object and the objects cascading from it in one transaction."""
+        deleted_at = timezone.now()
+        type(self)._default_manager.filter(pk=self.pk).soft_delete(deleted_at)
         self.is_deleted = True
-        self.save()
+        self.deleted_at = deleted_at
+
+    def restore(self):
+        """Restores the object and the objects that were deleted along with it."""
+        type(self)._default_manager.with_deleted().filter(pk=self.pk).restore()
+        self.is_deleted = False
+        self.deleted_at = None
+
+    def delete(self, using=None, keep_parents=False):
+        self.soft_delete()
+
+    @classmethod
+    def on_soft_delete(cls, queryset, is_deleted):
+        """Called with the rows a soft delete (or a restore, when ``is_deleted`` is False) is about to update.
+
+        This includes rows reached by the cascade. The rows still hold their
+        old values, so subclasses can look at what is about to change.
+        """
+
+    @classmethod
+    def on_archive(cls, pks, using):
+        """Called with the primary keys of rows about to be moved to the archive table.
+
+        Runs in the transaction of the move, while the rows are still in the hot table.
+        """
 
     class Meta:
         abstract = True
 
     
 
-        
-class TimeStampMixin:
-    started_at = models.DateTimeField(_("Start time"))
-    ended_at = models.DateTimeField(_("End time"))
-    deadline = models.DateTimeField(_("Deadline"))
\ No newline at end of file
+class VersionedModel(models.Model):
+    """Model whose rows carry a version number that every write increments, and the time of that write.
+
+    They are the validators of the row's representation: the version is sent
+    as the ETag and compared by conditional requests, ``updated_at`` as
+    Last-Modified. Both must be set by every write, including ``update()``
+    calls that change what is shown; ``bump()`` returns the values to set.
+    """
+    version = models.PositiveIntegerField(_("Version"), default=1, editable=False)
+    updated_at = models.DateTimeField(_("Updated Date"), auto_now=True)
+
+    @staticmethod
+    def bump():
+        """The ``update()`` keyword arguments of a write of versioned rows."""
+        return {"version": F("version") + 1, "updated_at": timezone.now()}
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version", "updated_at"}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+def make_archive_model(model):
+    """Builds the archive table of a soft deletable model.
+
+    The archive has the same columns, in the same order, as ``model`` so that
+    rows can be moved with ``INSERT ... SELECT`` and read back with a UNION.
+    Foreign keys keep their columns but lose their database constraints and
+    reverse accessors, since the rows they point to may be archived as well.
+
+    Args:
+        model (SoftDeleteModel): The hot model to archive.
+
+    Returns:
+        Model: The archive model, also stored as ``model.archive_model``.
+    """
+    attrs = {
+        "__module__": model.__module__,
+        "Meta": type("Meta", (), {
+            "verbose_name": format_lazy(_("Archived {}"), model._meta.verbose_name),
+            "verbose_name_plural": format_lazy(_("Archived {}"), model._meta.verbose_name_plural),
+        }),
+    }
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            attrs[field.name] = models.BigIntegerField(primary_key=True, serialize=False)
+            continue
+        if field.is_relation:
+            attrs[field.name] = models.ForeignKey(
+                field.remote_field.model,
+                verbose_name=field.verbose_name,
+                null=field.null,
+                on_delete=models.DO_NOTHING,
+                db_constraint=False,
+                related_name="+",
+            )
+            continue
+        name, path, args, kwargs = field.deconstruct()
+        for option in ("unique", "auto_now", "auto_now_add"):
+            kwargs.pop(option, None)
+        attrs[name] = type(field)(*args, **kwargs)
+    archive_model = type(f"Archived{model.__name__}", (models.Model,), attrs)
+    model.archive_model = archive_model
+    return archive_model
+
+
+class TimeStampMixin(models.Model):
+    """Schedule of a model: when it starts, when it ended and when it is due.
+
+    All three are optional and indexed, so rows can be looked up by time
+    range. Models may redeclare them, e.g. to index them differently.
+    """
+    started_at = models.DateTimeField(_("Start time"), null=True, blank=True, db_index=True)
+    ended_at = models.DateTimeField(_("End time"), null=True, blank=True, db_index=True)
+    deadline = models.DateTimeField(_("Deadline"), null=True, blank=True, db_index=True)
+
+    class Meta:
+        abstract = True
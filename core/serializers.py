@@ -1,3 +1,78 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field resolved from the objects its ``BulkListSerializer`` loaded for the whole batch."""
+
+    def to_internal_value(self, data):
+        batch_objects = getattr(self.root, "batch_objects", None)
+        if batch_objects is None or self.field_name not in batch_objects:
+            return super().to_internal_value(data)
+        try:
+            return batch_objects[self.field_name][int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """List serializer for bulk writes.
+
+    Items are validated one by one and a bad item does not reject the batch:
+    ``validated_data`` holds ``(index, attrs)`` pairs of the valid items and
+    ``item_errors`` maps the index of every invalid item to its errors.
+    Objects referenced through ``BatchPrimaryKeyRelatedField`` fields are
+    loaded with one query per field for the whole batch.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages["not_a_list"].format(input_type=type(data).__name__)
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="not_a_list")
+        if not data:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages["empty"]]}, code="empty")
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(max_length=self.max_length)
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="max_length")
+
+        self.batch_objects = self.load_batch_objects(data)
+        self.item_errors = {}
+        validated = []
+        for index, item in enumerate(data):
+            try:
+                validated.append((index, self.child.run_validation(item)))
+            except ValidationError as exc:
+                self.item_errors[index] = exc.detail
+        return validated
+
+    def load_batch_objects(self, data):
+        batch_objects = {}
+        for name, field in self.child.fields.items():
+            if not isinstance(field, BatchPrimaryKeyRelatedField):
+                continue
+            pks = set()
+            for item in data:
+                try:
+                    pks.add(int(item[name]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            batch_objects[name] = field.get_queryset().in_bulk(pks)
+        return batch_objects
+
+    def results(self, saved, outcome):
+        """Builds the per-item response of a bulk write.
+
+        Args:
+            saved (list): ``(index, instance)`` pairs of the written items.
+            outcome (str): What happened to them, e.g. "created".
+
+        Returns:
+            list: One dict per input item, in input order.
+        """
+        results = [{"index": index, "status": outcome, "id": instance.pk} for index, instance in saved]
+        results += [{"index": index, "status": "error", "errors": errors} for index, errors in self.item_errors.items()]
+        return sorted(results, key=lambda result: result["index"])
 
-#create your serializers here
\ No newline at end of file
@@ -1,3 +1,157 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from accounts.models import CustomUser, Team
+from core.models import LiveIndex
+from projects.models import Project, Sprint, WorkSpace
+from tasks.models import ArchivedComment, ArchivedTask, AttachmentUpload, Comment, Task, TaskLabel, WorkTimeRollup
+
+
+class LiveIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = LiveIndex(fields=["sprint"], name="test_task_sprint_live")
+
+    def test_partial_index_sql(self):
+        sql = str(self.index.create_sql(Task, connection.schema_editor()))
+        self.assertIn("WHERE", sql)
+        self.assertIn('"sprint_id"', sql)
+
+    def test_composite_fallback_without_partial_indexes(self):
+        with mock.patch.object(connection.features, "supports_partial_indexes", False):
+            sql = str(self.index.create_sql(Task, connection.schema_editor()))
+        self.assertNotIn("WHERE", sql)
+        self.assertIn('"sprint_id", "is_deleted"', sql)
+
+    def test_deconstruct_omits_condition(self):
+        path, args, kwargs = self.index.deconstruct()
+        self.assertEqual(path, "core.models.LiveIndex")
+        self.assertNotIn("condition", kwargs)
+
+
+class ArchiveDeletedTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="archiver", email="archiver@example.com")
+        team = Team.objects.create(name="Archive Team", owner=self.user, description="Team")
+        workspace = WorkSpace.objects.create(title="Workspace", team=team)
+        project = Project.objects.create(title="Project", description="Project", workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.tasks = [Task.objects.create(title=f"Task {i}", description="Task", sprint=self.sprint, status="ToDo")
+                      for i in range(5)]
+        self.comment = Comment.objects.create(content="Comment", user=self.user, task=self.tasks[0])
+        self.label = TaskLabel.objects.create(task=self.tasks[0])
+
+    def test_moves_old_tombstones_in_chunks(self):
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[:3]]).soft_delete(
+            deleted_at=timezone.now() - timedelta(days=40))
+        self.tasks[3].delete()
+
+        call_command("archive_deleted", days=30, chunk_size=2, sleep=0, stdout=StringIO())
+
+        self.assertEqual(ArchivedTask.objects.count(), 3)
+        self.assertEqual(ArchivedComment.objects.get().pk, self.comment.pk)
+        self.assertEqual(Task.objects.with_deleted().filter(sprint=self.sprint).count(), 2)
+        self.assertIsNone(TaskLabel.objects.get(pk=self.label.pk).task_id)
+
+    def test_archives_reads_hot_and_archive_tables(self):
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[:3]]).soft_delete(
+            deleted_at=timezone.now() - timedelta(days=40))
+        self.tasks[3].delete()
+        call_command("archive_deleted", days=30, sleep=0, stdout=StringIO())
+
+        archived = Task.objects.archives(sprint=self.sprint)
+        self.assertCountEqual([task.pk for task in archived], [task.pk for task in self.tasks[:4]])
+        self.assertTrue(all(isinstance(task, Task) for task in archived))
+
+    def test_archives_tasks_with_work_time_rollups(self):
+        WorkTimeRollup.objects.create(task=self.tasks[0], user=self.user, day=timezone.localdate(), seconds=60)
+        Task.objects.filter(pk=self.tasks[0].pk).soft_delete(deleted_at=timezone.now() - timedelta(days=40))
+
+        call_command("archive_deleted", days=30, sleep=0, stdout=StringIO())
+
+        self.assertEqual(ArchivedTask.objects.get().pk, self.tasks[0].pk)
+        self.assertFalse(WorkTimeRollup.objects.exists())
+
+    def test_archives_tasks_with_attachment_uploads(self):
+        upload = AttachmentUpload.objects.create(user=self.user, task=self.tasks[0], name="spec.pdf", size=10)
+        Task.objects.filter(pk=self.tasks[0].pk).soft_delete(deleted_at=timezone.now() - timedelta(days=40))
+
+        call_command("archive_deleted", days=30, sleep=0, stdout=StringIO())
+
+        self.assertEqual(ArchivedTask.objects.get().pk, self.tasks[0].pk)
+        self.assertTrue(AttachmentUpload.objects.filter(pk=upload.pk).exists())
+
+    def test_rows_restored_while_locking_are_not_moved(self):
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[1:3]]).soft_delete(
+            deleted_at=timezone.now() - timedelta(days=40))
+        select_for_update = QuerySet.select_for_update
+
+        def restore_first(queryset, *args, **kwargs):
+            Task.objects.with_deleted().filter(pk=self.tasks[1].pk).restore()
+            return select_for_update(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "select_for_update", autospec=True, side_effect=restore_first):
+            call_command("archive_deleted", days=30, sleep=0, stdout=StringIO())
+
+        self.assertEqual(ArchivedTask.objects.get().pk, self.tasks[2].pk)
+        self.assertTrue(Task.objects.filter(pk=self.tasks[1].pk).exists())
+
+    def test_keeps_rows_with_live_children(self):
+        self.tasks[0].delete()
+        self.comment.restore()
+        Task.objects.with_deleted().filter(pk=self.tasks[0].pk).update(
+            deleted_at=timezone.now() - timedelta(days=40))
+
+        call_command("archive_deleted", days=30, sleep=0, stdout=StringIO())
+
+        self.assertFalse(ArchivedTask.objects.exists())
+
+
+class SoftDeleteManagerTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="manager", email="manager@example.com")
+        team = Team.objects.create(name="Manager Team", owner=self.user, description="Team")
+        workspace = WorkSpace.objects.create(title="Workspace", team=team)
+        project = Project.objects.create(title="Project", description="Project", workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.tasks = [Task.objects.create(title=f"Task {i}", description="Task", sprint=self.sprint, status="ToDo")
+                      for i in range(4)]
+        for task in self.tasks:
+            Comment.objects.create(content="Live", user=self.user, task=task)
+            Comment.objects.create(content="Dead", user=self.user, task=task).delete()
+        self.tasks[3].delete()
+
+    def test_live_dead_and_with_deleted(self):
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(Task.objects.dead().count(), 1)
+        self.assertEqual(Task.objects.with_deleted().count(), 4)
+        self.assertEqual(Task.objects.with_deleted().live().count(), 3)
+        self.assertEqual(Task.objects.with_deleted().dead().get(), self.tasks[3])
+
+    def test_composes_with_select_related(self):
+        with self.assertNumQueries(1):
+            tasks = list(Task.objects.with_deleted().dead().select_related("sprint__project"))
+            self.assertEqual(tasks[0].sprint.project.title, "Project")
+
+    def test_reverse_relations_are_live_without_extra_queries(self):
+        with self.assertNumQueries(3):
+            tasks = list(Sprint.objects.prefetch_related("tasks__comments").get(pk=self.sprint.pk).tasks.all())
+            self.assertEqual(len(tasks), 3)
+            self.assertEqual([comment.content for task in tasks for comment in task.comments.all()], ["Live"] * 3)
+
+    def test_reverse_relation_filters_child_table_only(self):
+        sql = str(self.tasks[0].comments.all().query)
+        self.assertNotIn("JOIN", sql)
+        self.assertIn("is_deleted", sql)
+
+    def test_non_user_models_have_no_user_manager_methods(self):
+        self.assertFalse(hasattr(Task.objects, "create_user"))
+        self.assertFalse(hasattr(Task.objects, "get_by_natural_key"))
+        self.assertTrue(hasattr(CustomUser.objects, "create_user"))
+        self.assertEqual(CustomUser.objects.get_by_natural_key("manager"), self.user)
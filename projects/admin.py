@@ -1,17 +1,18 @@
 from django.contrib import admin
+from core.admin import SoftDeleteAdmin
 from .models import WorkSpace, Project, Sprint
 
 
 @admin.register(WorkSpace)
-class WorkSpaceAdmin(admin.ModelAdmin):
+class WorkSpaceAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(Sprint)
-class SprintAdmin(admin.ModelAdmin):
+class SprintAdmin(SoftDeleteAdmin):
     pass
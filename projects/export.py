@@ -0,0 +1,104 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from tasks.models import Comment, Task, TaskLabel, WorkTime
+
+
+class _Echo:
+    """File-like object handing back what ``csv.writer`` writes instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+class ProjectExport:
+    """Streams the tasks, comments and work times of a project as CSV or NDJSON.
+
+    Rows are read with ``QuerySet.iterator(chunk_size=...)``, so only one chunk
+    is held in memory at a time. Sprint and user data are joined into each
+    chunk's query, and labels are prefetched once per chunk.
+
+    Args:
+        project (Project): The project to export.
+        chunk_size (int): Number of rows fetched from the database at a time.
+    """
+    RESOURCES = ("tasks", "comments", "worktimes")
+    COLUMNS = {
+        "tasks": ("id", "title", "status", "sprint", "sprint_started_at", "user", "username", "labels",
+                  "created_at", "deadline", "description"),
+        "comments": ("id", "task", "user", "username", "created_at", "content"),
+        "worktimes": ("id", "task", "user", "start_date", "end_date"),
+    }
+
+    def __init__(self, project, chunk_size=2000):
+        self.project = project
+        self.chunk_size = chunk_size
+
+    def rows(self, resource):
+        """Yields the rows of ``resource`` as dicts keyed by ``COLUMNS[resource]``."""
+        return getattr(self, f"{resource}_rows")()
+
+    def tasks_rows(self):
+        tasks = (Task.objects.filter(sprint__project=self.project)
+                 .select_related("sprint", "user")
+                 .prefetch_related(Prefetch("labels", queryset=TaskLabel.objects.filter(label__is_deleted=False)
+                                            .select_related("label")))
+                 .order_by("pk"))
+        for task in tasks.iterator(chunk_size=self.chunk_size):
+            yield {
+                "id": task.pk,
+                "title": task.title,
+                "status": task.status,
+                "sprint": task.sprint_id,
+                "sprint_started_at": task.sprint.started_at,
+                "user": task.user_id,
+                "username": task.user.username if task.user else None,
+                "labels": [task_label.label.name for task_label in task.labels.all()],
+                "created_at": task.created_at,
+                "deadline": task.deadline,
+                "description": task.description,
+            }
+
+    def comments_rows(self):
+        comments = (Comment.objects.filter(task__sprint__project=self.project, task__is_deleted=False)
+                    .select_related("user")
+                    .order_by("pk"))
+        for comment in comments.iterator(chunk_size=self.chunk_size):
+            yield {
+                "id": comment.pk,
+                "task": comment.task_id,
+                "user": comment.user_id,
+                "username": comment.user.username,
+                "created_at": comment.created_at,
+                "content": comment.content,
+            }
+
+    def worktimes_rows(self):
+        worktimes = (WorkTime.objects.filter(task__sprint__project=self.project, task__is_deleted=False)
+                     .order_by("pk"))
+        for worktime in worktimes.iterator(chunk_size=self.chunk_size):
+            yield {
+                "id": worktime.pk,
+                "task": worktime.task_id,
+                "user": worktime.user_id,
+                "start_date": worktime.start_date,
+                "end_date": worktime.end_date,
+            }
+
+    def csv(self, resource):
+        """Yields the lines of a CSV file of ``resource``, header first."""
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.COLUMNS[resource])
+        for row in self.rows(resource):
+            if resource == "tasks":
+                row["labels"] = ";".join(row["labels"])
+            yield writer.writerow([row[column] for column in self.COLUMNS[resource]])
+
+    def ndjson(self, resources=RESOURCES):
+        """Yields one JSON document per line, tagged with its resource ``type``."""
+        for resource in resources:
+            for row in self.rows(resource):
+                yield json.dumps({"type": resource, **row}, cls=DjangoJSONEncoder) + "\n"
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.export import ProjectExport
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Streams the tasks, comments and work times of a project as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project", type=int, help="Id of the project to export.")
+        parser.add_argument("--output", choices=("ndjson", "csv"), default="ndjson")
+        parser.add_argument("--resource", choices=ProjectExport.RESOURCES, action="append",
+                            help="Resource to export, repeatable. CSV takes exactly one, tasks by default.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--file", help="Write to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options["project"])
+        except Project.DoesNotExist:
+            raise CommandError(f"Project with pk={options['project']} does not exist.")
+
+        export = ProjectExport(project, chunk_size=options["chunk_size"])
+        resources = options["resource"] or (["tasks"] if options["output"] == "csv" else ProjectExport.RESOURCES)
+        if options["output"] == "csv":
+            if len(resources) != 1:
+                raise CommandError("CSV exports take exactly one --resource.")
+            lines = export.csv(resources[0])
+        else:
+            lines = export.ndjson(resources)
+
+        if options["file"]:
+            with open(options["file"], "w", newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
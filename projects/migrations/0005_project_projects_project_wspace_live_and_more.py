@@ -0,0 +1,30 @@
+# Generated by Django 4.2.4 on 2026-10-17 03:52
+
+import core.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_deleted_at_sprint_deleted_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=core.models.LiveIndex(fields=['workspace'], name='projects_project_wspace_live'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=core.models.LiveIndex(fields=['team'], name='projects_project_team_live'),
+        ),
+        migrations.AddIndex(
+            model_name='sprint',
+            index=core.models.LiveIndex(fields=['project'], name='projects_sprint_project_live'),
+        ),
+        migrations.AddIndex(
+            model_name='workspace',
+            index=core.models.LiveIndex(fields=['team'], name='projects_workspace_team_live'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_projects_project_wspace_live_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated Date'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Version'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated Date'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Version'),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated Date'),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Version'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_updated_at_project_version_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='deadline',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Deadline'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='End time'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='started_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Start time'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='deadline',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Deadline'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='End time'),
+        ),
+        migrations.AlterField(
+            model_name='sprint',
+            name='started_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Started At'),
+        ),
+    ]
@@ -1,14 +1,17 @@
 from datetime import timezone
 from django.db import models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django.utils.translation import gettext_lazy as _
-from core.models import SoftDeleteModel,TimeStampMixin
+from core.models import LiveIndex, SoftDeleteModel, TimeStampMixin, VersionedModel
+from core.pagination import keyset_after
 from tasks.models import Task
 from accounts.models import Team
 from django.utils import timezone
 
 
 
-class WorkSpace(SoftDeleteModel):
+class WorkSpace(SoftDeleteModel, VersionedModel):
     title = models.CharField(_("Title"), max_length=50)
     team = models.ForeignKey("accounts.Team",
                              verbose_name=_("Team"),
@@ -19,6 +22,9 @@ class WorkSpace(SoftDeleteModel):
     class Meta:
         verbose_name = _("WorkSpace")
         verbose_name_plural = _("WorkSpaces")
+        indexes = [
+            LiveIndex(fields=["team"], name="projects_workspace_team_live"),
+        ]
     
     def __str__(self):
         return self.title
@@ -54,7 +60,7 @@ class WorkSpace(SoftDeleteModel):
         self.save()
     
     
-class Project(SoftDeleteModel,TimeStampMixin):
+class Project(SoftDeleteModel, VersionedModel, TimeStampMixin):
     title = models.CharField(_("Title"), max_length=50)
     description = models.TextField(_("Description"))
     workspace = models.ForeignKey("WorkSpace",
@@ -66,6 +72,10 @@ class Project(SoftDeleteModel,TimeStampMixin):
     class Meta:
         verbose_name = _("Project")
         verbose_name_plural = _("Projects")
+        indexes = [
+            LiveIndex(fields=["workspace"], name="projects_project_wspace_live"),
+            LiveIndex(fields=["team"], name="projects_project_team_live"),
+        ]
     
     
     def create_project(self, title, description, start_date, end_date, deadline):
@@ -84,8 +94,8 @@ class Project(SoftDeleteModel,TimeStampMixin):
         project = Project.objects.create(
             title=title,
             description=description,
-            start_date=start_date,
-            end_date=end_date,
+            started_at=start_date,
+            ended_at=end_date,
             deadline=deadline,
             workspace=self.workspace
         )
@@ -101,24 +111,27 @@ class Project(SoftDeleteModel,TimeStampMixin):
         }
     
     def edit_project(self, **kwargs):
-        Project.objects.filter(pk=self.pk).update(**kwargs)
+        Project.objects.filter(pk=self.pk).update(**kwargs, **Project.bump())
     
     def __str__(self):
         return self.title
     
     
-class Sprint(SoftDeleteModel, TimeStampMixin):
+class Sprint(SoftDeleteModel, VersionedModel, TimeStampMixin):
     project = models.ForeignKey("Project",
                                 verbose_name=_("Project"),
                                 on_delete=models.CASCADE,
                                 related_name="sprints")
     
-    started_at = models.DateTimeField(verbose_name=_("Started At"), default=timezone.now)
+    started_at = models.DateTimeField(verbose_name=_("Started At"), default=timezone.now, db_index=True)
 
 
     class Meta:
         verbose_name = _("Sprint")
         verbose_name_plural = _("Sprints")
+        indexes = [
+            LiveIndex(fields=["project"], name="projects_sprint_project_live"),
+        ]
 
     def __str__(self):
         return f"Sprint {self.started_at.strftime('%Y-%m-%d')}"
@@ -142,8 +155,8 @@ class Sprint(SoftDeleteModel, TimeStampMixin):
         return sprint
 
     def get_sprint_info(self):
-        active_tasks = self.tasks.filter(end_date__gte=timezone.now())
-        completed_tasks = self.tasks.filter(end_date__lt=timezone.now())
+        active_tasks = self.tasks.exclude(status="Done")
+        completed_tasks = self.tasks.filter(status="Done")
         return {
             "start_date": self.started_at,
             "end_date": self.ended_at,
@@ -152,5 +165,52 @@ class Sprint(SoftDeleteModel, TimeStampMixin):
             "completed_tasks": completed_tasks,
         }
 
+    def get_board(self, page_size=50, status=None, after=None):
+        """Returns the tasks of the sprint grouped by status column.
+
+        Every column is paged in ``(rank, id)`` order. All columns are
+        read in one query that numbers the rows of each status with a window
+        function, plus one query for the labels, whatever the number of tasks.
+
+        Args:
+            page_size (int): Maximum number of tasks per column.
+            status (str): Only return this column.
+            after (tuple): ``(rank, id)`` of the last task of the previous
+                page of the ``status`` column.
+
+        Returns:
+            list: One dict per column with its ``status``, ``label``, ``tasks``
+            and the ``next`` sort key, or None on the last page.
+        """
+        tasks = self.tasks.with_board_data()
+        columns = [(value, label) for value, label in Task.CHOICES if status in (None, value)]
+        if status is not None:
+            tasks = tasks.filter(status=status)
+            if after is not None:
+                tasks = tasks.filter(keyset_after(Task.BOARD_ORDERING, after))
+        tasks = tasks.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("status"),
+                order_by=[F(field).asc() for field in Task.BOARD_ORDERING],
+            )
+        ).filter(position__lte=page_size + 1).order_by("status", *Task.BOARD_ORDERING)
+
+        pages = {value: [] for value, label in columns}
+        for task in tasks:
+            pages[task.status].append(task)
+
+        board = []
+        for value, label in columns:
+            page = pages[value][:page_size]
+            has_next = len(pages[value]) > page_size
+            board.append({
+                "status": value,
+                "label": label,
+                "tasks": page,
+                "next": (page[-1].rank, page[-1].pk) if has_next else None,
+            })
+        return board
+
     def edit_sprint(self, **kwargs):
-        Sprint.objects.filter(pk=self.pk).update(**kwargs)
\ No newline at end of file
+        Sprint.objects.filter(pk=self.pk).update(**kwargs, **Sprint.bump())
\ No newline at end of file
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 
 from accounts.models import Team
+from core.pagination import encode_cursor
 from .models import WorkSpace, Project, Sprint
 from tasks.models import Task
 
@@ -35,6 +36,48 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = ('id', 'title', 'description', 'status', 'start_date', 'end_date')
 
+class BoardTaskSerializer(serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(slug_field='username', read_only=True)
+    labels = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
+    attachment_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ('id', 'title', 'status', 'created_at', 'user', 'labels', 'comment_count', 'attachment_count')
+
+    def get_labels(self, task):
+        return [task_label.label.name for task_label in task.labels.all()]
+
+
+class BoardColumnSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    label = serializers.CharField()
+    tasks = BoardTaskSerializer(many=True)
+    next = serializers.SerializerMethodField()
+
+    def get_next(self, column):
+        if column['next'] is None:
+            return None
+        return encode_cursor(*column['next'])
+
+
+class CriticalPathTaskSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    deadline = serializers.DateTimeField(allow_null=True)
+    due = serializers.DateTimeField(allow_null=True)
+
+
+class WorkTimeReportSerializer(serializers.Serializer):
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'since' in attrs and 'until' in attrs and attrs['since'] > attrs['until']:
+            raise serializers.ValidationError({'until': 'Must not be before since.'})
+        return attrs
+
+
 class SprintDetailSerializer(serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)
 
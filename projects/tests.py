@@ -1,8 +1,19 @@
+import csv
+import io
+import json
 import unittest
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 from datetime import datetime, timedelta
+from core.pagination import encode_cursor
+from projects.export import ProjectExport
 from projects.models import Sprint, Project, WorkSpace
-from accounts.models import Team
+from accounts.models import CustomUser, Team
+from tasks.models import Task, Comment, Attachment, WorkTime, WorkTimeRollup, Label, TaskLabel
 
 class ProjectTestCase(TestCase):
     def setUp(self):
@@ -107,5 +118,284 @@ class WorkSpaceTestCase(TestCase):
         self.assertEqual(self.workspace.team, new_team)
 
 
+class CascadingSoftDeleteTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="owner", email="owner@example.com")
+        self.team = Team.objects.create(name="Cascade Team", owner=self.user, description="Team")
+        self.workspace = WorkSpace.objects.create(title="Workspace", team=self.team)
+        self.project = Project.objects.create(title="Project", description="Project",
+                                              workspace=self.workspace, team=self.team)
+        self.sprint = Sprint.objects.create(project=self.project)
+        self.tasks = [Task.objects.create(title=f"Task {i}", description="Task", sprint=self.sprint, status="ToDo")
+                      for i in range(3)]
+        self.comment = Comment.objects.create(content="Comment", user=self.user, task=self.tasks[0])
+        self.worktime = WorkTime.objects.create(task=self.tasks[0])
+        self.attachment = Attachment.objects.create(content="file.txt", task=self.tasks[1])
+
+    def test_workspace_delete_hides_subtree(self):
+        # 7 UPDATEs and a savepoint pair, plus an aggregate and a counter UPDATE
+        # for comments and attachments and an aggregate for work times, plus a
+        # read and an INSERT of the activity of tasks, comments, attachments
+        # and work times, plus an UPDATE and a read of the sprints of the task
+        # links, from either end.
+        with self.assertNumQueries(26):
+            self.workspace.delete()
+
+        self.assertTrue(self.workspace.is_deleted)
+        self.assertFalse(WorkSpace.objects.filter(pk=self.workspace.pk).exists())
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Sprint.objects.filter(pk=self.sprint.pk).exists())
+        self.assertFalse(Task.objects.filter(sprint=self.sprint).exists())
+        self.assertFalse(Comment.objects.filter(pk=self.comment.pk).exists())
+        self.assertFalse(WorkTime.objects.filter(pk=self.worktime.pk).exists())
+        self.assertFalse(Attachment.objects.filter(pk=self.attachment.pk).exists())
+        self.assertTrue(Team.objects.filter(pk=self.team.pk).exists())
+
+    def test_query_count_does_not_grow_with_subtree(self):
+        for i in range(20):
+            task = Task.objects.create(title=f"Extra {i}", description="Task", sprint=self.sprint, status="ToDo")
+            Comment.objects.create(content="Comment", user=self.user, task=task)
+
+        with self.assertNumQueries(26):
+            WorkSpace.objects.filter(pk=self.workspace.pk).soft_delete()
+
+    def test_restore_keeps_previously_deleted_children(self):
+        self.tasks[2].delete()
+        self.workspace.delete()
+
+        WorkSpace.objects.with_deleted().filter(pk=self.workspace.pk).restore()
+
+        self.assertTrue(WorkSpace.objects.filter(pk=self.workspace.pk).exists())
+        self.assertTrue(Sprint.objects.filter(pk=self.sprint.pk).exists())
+        self.assertCountEqual(Task.objects.filter(sprint=self.sprint), self.tasks[:2])
+        self.assertTrue(Comment.objects.filter(pk=self.comment.pk).exists())
+        self.assertTrue(Attachment.objects.filter(pk=self.attachment.pk).exists())
+
+    def test_queryset_delete_is_soft(self):
+        Task.objects.filter(sprint=self.sprint).delete()
+
+        self.assertFalse(Task.objects.filter(sprint=self.sprint).exists())
+        self.assertEqual(Task.objects.archives(sprint=self.sprint).count(), 3)
+        self.assertFalse(Comment.objects.filter(pk=self.comment.pk).exists())
+
+
+class SprintConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="owner", email="owner@example.com", is_superuser=True)
+        team = Team.objects.create(name="Sprint Team", owner=self.user, description="Team")
+        workspace = WorkSpace.objects.create(title="Workspace", team=team)
+        project = Project.objects.create(title="Project", description="Project", workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("sprint-detail", kwargs={"id": self.sprint.id})
+
+    def test_unchanged_sprint_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.sprint.edit_sprint(started_at=self.sprint.started_at - timedelta(days=1))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"2"')
+
+    def test_non_owner_gets_no_validator_answers(self):
+        other = CustomUser.objects.create(username="other", email="other@example.com", is_superuser=True)
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"1"').status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH='"7"').status_code, 403)
+
+
+class SprintBoardTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="member", email="member@example.com")
+        self.team = Team.objects.create(name="Board Team", owner=self.user, description="Team")
+        workspace = WorkSpace.objects.create(title="Workspace", team=self.team)
+        project = Project.objects.create(title="Project", description="Project", workspace=workspace, team=self.team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.label = Label.objects.create(name="bug")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("sprint-board", kwargs={"id": self.sprint.id})
+
+    def create_tasks(self, count, status="ToDo"):
+        tasks = []
+        for i in range(count):
+            task = Task.objects.create(title=f"{status} {i}", description="Task", sprint=self.sprint,
+                                       status=status, user=self.user)
+            TaskLabel.objects.create(task=task, label=self.label)
+            Comment.objects.create(content="Comment", user=self.user, task=task)
+            tasks.append(task)
+        return tasks
+
+    def test_groups_tasks_by_status(self):
+        self.create_tasks(2, "ToDo")
+        self.create_tasks(1, "Done")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        columns = {column["status"]: column for column in response.data["columns"]}
+        self.assertEqual(list(columns), ["ToDo", "Doing", "Done"])
+        self.assertEqual(len(columns["ToDo"]["tasks"]), 2)
+        self.assertEqual(columns["Doing"]["tasks"], [])
+        card = columns["Done"]["tasks"][0]
+        self.assertEqual(card["user"], "member")
+        self.assertEqual(card["labels"], ["bug"])
+        self.assertEqual(card["comment_count"], 1)
+        self.assertEqual(card["attachment_count"], 0)
+
+    def test_query_count_does_not_depend_on_task_count(self):
+        self.create_tasks(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        # Counted right away: the next request resets the connection's query log.
+        few = len(few)
+        self.create_tasks(20, "Doing")
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(few, len(many))
+
+    def test_column_cursor_pagination(self):
+        tasks = self.create_tasks(5)
+
+        first = self.client.get(self.url, {"page_size": 2}).data["columns"][0]
+        self.assertEqual([task["id"] for task in first["tasks"]], [task.id for task in tasks[:2]])
+
+        second = self.client.get(self.url, {"page_size": 2, "status": "ToDo", "cursor": first["next"]}).data
+        self.assertEqual(len(second["columns"]), 1)
+        self.assertEqual([task["id"] for task in second["columns"][0]["tasks"]], [task.id for task in tasks[2:4]])
+
+        last = self.client.get(self.url, {"page_size": 2, "status": "ToDo",
+                                          "cursor": second["columns"][0]["next"]}).data["columns"][0]
+        self.assertEqual([task["id"] for task in last["tasks"]], [tasks[4].id])
+        self.assertIsNone(last["next"])
+
+    def test_tampered_cursor_is_rejected(self):
+        for cursor in ("not base64!", encode_cursor("a", "x"), encode_cursor(["a"], 1)):
+            response = self.client.get(self.url, {"status": "ToDo", "cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_requires_team_membership(self):
+        outsider = CustomUser.objects.create(username="outsider", email="outsider@example.com")
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ProjectExportTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="member", email="member@example.com")
+        self.team = Team.objects.create(name="Export Team", owner=self.user, description="Team")
+        workspace = WorkSpace.objects.create(title="Workspace", team=self.team)
+        self.project = Project.objects.create(title="Project", description="Project", workspace=workspace,
+                                              team=self.team)
+        self.sprint = Sprint.objects.create(project=self.project)
+        label = Label.objects.create(name="bug")
+        self.tasks = []
+        for i in range(5):
+            task = Task.objects.create(title=f"Task {i}", description="Task", sprint=self.sprint, user=self.user)
+            TaskLabel.objects.create(task=task, label=label)
+            Comment.objects.create(content=f"Comment {i}", user=self.user, task=task)
+            WorkTime.objects.create(task=task, start_date=datetime.now())
+            self.tasks.append(task)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("project-export", kwargs={"pk": self.project.pk})
+
+    def read(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_streams_every_resource(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row["type"] for row in rows], ["tasks"] * 5 + ["comments"] * 5 + ["worktimes"] * 5)
+        self.assertEqual(rows[0]["labels"], ["bug"])
+        self.assertEqual(rows[0]["username"], "member")
+        self.assertEqual(rows[5]["content"], "Comment 0")
+
+    def test_csv_streams_one_resource(self):
+        self.tasks[0].soft_delete()
+
+        response = self.client.get(self.url, {"output": "csv", "resource": "comments"})
+
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(rows[0], ["id", "task", "user", "username", "created_at", "content"])
+        self.assertEqual([row[5] for row in rows[1:]], [f"Comment {i}" for i in range(1, 5)])
+
+    def test_rows_are_joined_per_chunk(self):
+        export = ProjectExport(self.project, chunk_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(export.rows("tasks"))
+        self.assertEqual([row["id"] for row in rows], [task.id for task in self.tasks])
+        self.assertTrue(all(row["labels"] == ["bug"] for row in rows))
+        # One task query plus one label query per chunk of two tasks.
+        self.assertEqual(len(queries), 1 + 3)
+
+    def test_management_command(self):
+        stdout = io.StringIO()
+        call_command("export_project", self.project.pk, "--output", "csv", stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertIn("bug", lines[1])
+
+    def test_requires_team_membership(self):
+        outsider = CustomUser.objects.create(username="outsider", email="outsider@example.com")
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class WorkTimeReportTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="member", email="member@example.com")
+        self.other = CustomUser.objects.create(username="other", email="other@example.com")
+        self.team = Team.objects.create(name="Report Team", owner=self.user, description="Team")
+        workspace = WorkSpace.objects.create(title="Workspace", team=self.team)
+        self.project = Project.objects.create(title="Project", description="Project", workspace=workspace,
+                                              team=self.team)
+        self.sprint = Sprint.objects.create(project=self.project)
+        other_sprint = Sprint.objects.create(project=self.project)
+        self.day = datetime(2023, 3, 1).date()
+        task = Task.objects.create(title="Task", description="Task", sprint=self.sprint)
+        WorkTimeRollup.objects.create(task=task, user=self.user, day=self.day, seconds=60)
+        WorkTimeRollup.objects.create(task=task, user=self.other, day=self.day + timedelta(days=1), seconds=30)
+        other_task = Task.objects.create(title="Other", description="Task", sprint=other_sprint)
+        WorkTimeRollup.objects.create(task=other_task, user=self.user, day=self.day, seconds=100)
+        deleted = Task.objects.create(title="Deleted", description="Task", sprint=self.sprint)
+        WorkTimeRollup.objects.create(task=deleted, user=self.user, day=self.day, seconds=1000)
+        deleted.soft_delete()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_sprint_report(self):
+        response = self.client.get(reverse("sprint-worktime-report", kwargs={"id": self.sprint.id}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_seconds"], 90)
+        self.assertEqual([(row["username"], row["seconds"]) for row in response.data["users"]],
+                         [("member", 60), ("other", 30)])
+        self.assertEqual([row["seconds"] for row in response.data["days"]], [60, 30])
+
+    def test_project_report_with_date_range(self):
+        url = reverse("project-worktime-report", kwargs={"pk": self.project.pk})
+
+        self.assertEqual(self.client.get(url).data["total_seconds"], 190)
+        response = self.client.get(url, {"since": self.day.isoformat(), "until": self.day.isoformat()})
+        self.assertEqual(response.data["total_seconds"], 160)
+        self.assertEqual(self.client.get(url, {"since": "2023-03-02", "until": "2023-03-01"}).status_code, 400)
+
+    def test_requires_team_membership(self):
+        self.client.force_authenticate(self.other)
+        url = reverse("sprint-worktime-report", kwargs={"id": self.sprint.id})
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,12 +1,26 @@
   
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
 from accounts.models import Team
+from core.conditional import not_modified, validator_headers
+from core.pagination import NewestFirstPagination, decode_cursor
+from tasks.dependencies import cached_critical_path
+from tasks.models import Activity, Task, TaskDependency, WorkTimeRollup
+from tasks.serializers import ActivitySerializer, ActivityQuerySerializer
+from .export import ProjectExport
 from .models import Project, Sprint, WorkSpace
-from .serializers import ProjectSerializer, SprintSerializer, TeamSerializer, WorkSpaceSerializer
+from .serializers import (
+    BoardColumnSerializer,
+    CriticalPathTaskSerializer,
+    ProjectSerializer,
+    SprintSerializer,
+    TeamSerializer,
+    WorkSpaceSerializer,
+    WorkTimeReportSerializer,
+)
 from .permissions import IsProjectMember, IsSprintOwner, IsTeamMember, IsTeamMemberOrOwner, IsTeamOwner
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -17,6 +31,20 @@ from rest_framework.permissions import AllowAny
 logger = logging.getLogger(__name__)
 
 
+def build_worktime_report(request, rollups):
+    """
+    Sum the rollup rows of live tasks, optionally limited to the days between ``since`` and ``until``.
+    """
+    params = WorkTimeReportSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    rollups = rollups.filter(task__is_deleted=False)
+    if 'since' in params.validated_data:
+        rollups = rollups.filter(day__gte=params.validated_data['since'])
+    if 'until' in params.validated_data:
+        rollups = rollups.filter(day__lte=params.validated_data['until'])
+    return rollups.report()
+
+
 
 
 class WorkSpaceViewSet(viewsets.ModelViewSet):
@@ -102,10 +130,13 @@ class WorkSpaceViewSet(viewsets.ModelViewSet):
         Returns:
             Response: A response containing the serialized workspace data.
         """
+        response = not_modified(request, self.get_queryset().filter(pk=kwargs['pk']))
+        if response is not None:
+            return response
         workspace = self.get_object()
         serializer = self.get_serializer(workspace)
         self.log_workspace_view(workspace)
-        return Response(serializer.data)
+        return Response(serializer.data, headers=validator_headers(workspace))
 
     def update(self, request, *args, **kwargs):
         """
@@ -249,10 +280,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Returns:
             Response: A response containing the serialized project data.
         """
+        response = not_modified(request, self.get_queryset().filter(pk=kwargs['pk']))
+        if response is not None:
+            return response
         project = self.get_object()
         serializer = self.get_serializer(project)
         self.log_project_view(project)
-        return Response(serializer.data)
+        return Response(serializer.data, headers=validator_headers(project))
 
 
     def update(self, request, *args, **kwargs):
@@ -279,6 +313,102 @@ class ProjectViewSet(viewsets.ModelViewSet):
         project.soft_delete()
         return Response({"message": "Project deleted successfully"}, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream the project's tasks, comments and work times.
+
+        ``output=ndjson`` (the default) streams every resource as one JSON
+        document per line. ``output=csv`` streams a single ``resource``
+        (``tasks`` by default). Pick resources with ``resource``; it can repeat.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            StreamingHttpResponse: The export, written as it is read from the database.
+        """
+        project = get_object_or_404(Project.objects.select_related('team__owner'), pk=kwargs['pk'])
+        team = project.team
+        if team is None or not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to export this project.'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        output = request.query_params.get('output', 'ndjson')
+        resources = request.query_params.getlist('resource')
+        if output not in ('ndjson', 'csv'):
+            return Response({'message': 'Unknown output.'}, status=status.HTTP_400_BAD_REQUEST)
+        if any(resource not in ProjectExport.RESOURCES for resource in resources):
+            return Response({'message': 'Unknown resource.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        export = ProjectExport(project)
+        if output == 'csv':
+            if len(resources) > 1:
+                return Response({'message': 'CSV exports take a single resource.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            resource = resources[0] if resources else 'tasks'
+            response = StreamingHttpResponse(export.csv(resource), content_type='text/csv')
+            filename = f'project-{project.pk}-{resource}.csv'
+        else:
+            response = StreamingHttpResponse(export.ndjson(resources or ProjectExport.RESOURCES),
+                                             content_type='application/x-ndjson')
+            filename = f'project-{project.pk}.ndjson'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        self.log_project_export(project, output)
+        return response
+
+    @action(detail=True, methods=['get'], url_path='worktime-report')
+    def worktime_report(self, request, *args, **kwargs):
+        """
+        Report the time tracked on the project's tasks, in total, per user and per day.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: A response containing the report.
+        """
+        project = get_object_or_404(Project.objects.select_related('team__owner'), pk=kwargs['pk'])
+        team = project.team
+        if team is None or not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to view this report.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        report = build_worktime_report(request, WorkTimeRollup.objects.filter(task__sprint__project=project))
+        return Response({'project': project.pk, **report})
+
+    @action(detail=True, methods=['get'])
+    def activity(self, request, *args, **kwargs):
+        """
+        List the changes made to the project's tasks, newest first, a keyset page at a time.
+
+        ``since=<id>`` lists only the activities recorded after that one.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: A page of activities with the link to the next one.
+        """
+        project = get_object_or_404(Project.objects.select_related('team__owner'), pk=kwargs['pk'])
+        team = project.team
+        if team is None or not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to view this activity.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        params = ActivityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        activities = Activity.objects.filter(project=project)
+        if 'since' in params.validated_data:
+            activities = activities.filter(id__gt=params.validated_data['since'])
+        paginator = NewestFirstPagination()
+        page = paginator.paginate_queryset(activities, request, view=self)
+        return paginator.get_paginated_response(ActivitySerializer(page, many=True).data)
+
     def get_workspace(self):
         workspace_pk = self.kwargs.get('workspace_pk')
         workspace = get_object_or_404(WorkSpace, pk=workspace_pk)
@@ -315,6 +445,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
         logger = logging.getLogger(__name__)
         logger.info(f"Project edited: {project.title}, Team: {project.team.name}")
 
+    def log_project_export(self, project, output):
+        """
+        Log the export of a project.
+        """
+        logger = logging.getLogger(__name__)
+        logger.info(f"Project exported: {project.title}, Output: {output}")
+
     def log_project_deletion(self, project):
         """
         Log the deletion of a project.
@@ -342,6 +479,8 @@ class SprintViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
     # permission_classes = [IsSprintOwner, IsTeamMemberOrOwner]
     lookup_field = 'id'
+    board_page_size = 50
+    board_max_page_size = 200
    
     def get_queryset(self):
         """
@@ -401,6 +540,11 @@ class SprintViewSet(viewsets.ModelViewSet):
         Returns:
             Response: A response containing the serialized sprint data.
         """
+        # Only the team owner may see the sprint, so only the owner's copy can be current or stale.
+        sprints = self.get_queryset().filter(id=kwargs['id'], project__team__owner=request.user)
+        response = not_modified(request, sprints)
+        if response is not None:
+            return response
         sprint = self.get_object()
         
         # Check ownership
@@ -415,7 +559,7 @@ class SprintViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(sprint)
         self.log_sprint_retrieval(sprint)
-        return Response(serializer.data)
+        return Response(serializer.data, headers=validator_headers(sprint))
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -439,6 +583,91 @@ class SprintViewSet(viewsets.ModelViewSet):
 
     
 
+    @action(detail=True, methods=['get'])
+    def board(self, request, *args, **kwargs):
+        """
+        Return the sprint's tasks grouped by status column.
+
+        Every column holds at most ``page_size`` tasks. Pass ``status`` and the
+        column's ``next`` cursor as ``cursor`` to fetch the next page of a column.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: A response containing the board columns.
+        """
+        sprint = get_object_or_404(Sprint.objects.select_related('project__team__owner'), id=kwargs['id'])
+        team = sprint.project.team
+        if not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to view this board.'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        column = request.query_params.get('status')
+        if column is not None and column not in dict(Task.CHOICES):
+            return Response({'message': 'Unknown status.'}, status=status.HTTP_400_BAD_REQUEST)
+        cursor = request.query_params.get('cursor')
+        if cursor is not None and column is None:
+            return Response({'message': 'A cursor needs a status.'}, status=status.HTTP_400_BAD_REQUEST)
+        after = decode_cursor(cursor, Task, Task.BOARD_ORDERING) if cursor else None
+        try:
+            page_size = min(int(request.query_params.get('page_size', self.board_page_size)), self.board_max_page_size)
+        except ValueError:
+            page_size = self.board_page_size
+
+        columns = sprint.get_board(page_size=max(page_size, 1), status=column, after=after)
+        return Response({'sprint': sprint.id, 'columns': BoardColumnSerializer(columns, many=True).data})
+
+    @action(detail=True, methods=['get'], url_path='critical-path')
+    def critical_path(self, request, *args, **kwargs):
+        """
+        Return the longest chain of the sprint's tasks blocking one another.
+
+        Every task of the chain comes with its deadline and the date it is
+        really due, the earliest deadline of the tasks it blocks if that comes
+        first. The chain is cached until a link of the sprint or a deadline
+        of its tasks changes.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: A response containing the chain, first task first.
+        """
+        sprint = get_object_or_404(Sprint.objects.select_related('project__team__owner'), id=kwargs['id'])
+        team = sprint.project.team
+        if not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to view this sprint.'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        path = cached_critical_path(sprint.id, lambda: TaskDependency.critical_path(sprint.id))
+        return Response({'sprint': sprint.id, 'tasks': CriticalPathTaskSerializer(path, many=True).data})
+
+    @action(detail=True, methods=['get'], url_path='worktime-report')
+    def worktime_report(self, request, *args, **kwargs):
+        """
+        Report the time tracked on the sprint's tasks, in total, per user and per day.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Response: A response containing the report.
+        """
+        sprint = get_object_or_404(Sprint.objects.select_related('project__team__owner'), id=kwargs['id'])
+        team = sprint.project.team
+        if not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to view this report.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        report = build_worktime_report(request, WorkTimeRollup.objects.filter(task__sprint=sprint))
+        return Response({'sprint': sprint.id, **report})
+
     def perform_create(self, serializer, project):
         """
         Perform the create operation for the sprint.
@@ -0,0 +1,27 @@
+from contextvars import ContextVar
+
+_request = ContextVar("activity_request", default=None)
+
+
+def current_actor():
+    """Returns the user of the request being handled, or None outside of an authenticated request.
+
+    The user is read when the change happens, so users authenticated by the
+    API views, after the middlewares ran, are seen too.
+    """
+    user = getattr(_request.get(), "user", None)
+    return user if user is not None and user.is_authenticated else None
+
+
+class ActivityMiddleware:
+    """Makes the current request's user the actor of the activity recorded while handling it."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
@@ -1,32 +1,33 @@
 from django.contrib import admin
+from core.admin import SoftDeleteAdmin
 from .models import Task, TaskLabel, WorkTime, Comment, Label, Attachment
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(TaskLabel)
-class TaskLabelAdmin(admin.ModelAdmin):
+class TaskLabelAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(WorkTime)
-class WorkTimeAdmin(admin.ModelAdmin):
+class WorkTimeAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(Label)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(SoftDeleteAdmin):
     pass
 
 
 @admin.register(Attachment)
-class LabelAdmin(admin.ModelAdmin):
+class LabelAdmin(SoftDeleteAdmin):
     pass
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from .models import Attachment, release_attachment_blob
+        from .search import ensure_search_triggers
+        post_migrate.connect(ensure_search_triggers, sender=self)
+        post_delete.connect(release_attachment_blob, sender=Attachment)
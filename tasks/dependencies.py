@@ -0,0 +1,104 @@
+"""Critical paths of the "blocks / blocked by" graph of a sprint's tasks, and their cache.
+
+A cached path stays valid until a link of the sprint or the deadline of one
+of its tasks changes. Every sprint has a generation in the cache, renewed by
+those changes, and paths are cached under the generation they were computed
+at, so a stale path is never read again.
+"""
+import heapq
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = "tasks:critical-path:{sprint}"
+PATH_KEY = "tasks:critical-path:{sprint}:{generation}"
+
+
+def invalidate_critical_paths(sprints, using=None):
+    """Drops the cached critical paths of ``sprints`` once the current transaction commits.
+
+    Waiting for the commit keeps a path computed from the old rows from
+    being cached under the new generation.
+    """
+    sprints = {sprint for sprint in sprints if sprint is not None}
+    if not sprints:
+        return
+
+    def renew():
+        cache.set_many({GENERATION_KEY.format(sprint=sprint): uuid.uuid4().hex for sprint in sprints}, None)
+
+    transaction.on_commit(renew, using=using)
+
+
+def cached_critical_path(sprint, compute):
+    """Returns the cached critical path of ``sprint``, computing it with ``compute()`` when there is none."""
+    generation_key = GENERATION_KEY.format(sprint=sprint)
+    # A generation evicted from the cache starts a new one, never an old one again.
+    cache.add(generation_key, uuid.uuid4().hex, None)
+    key = PATH_KEY.format(sprint=sprint, generation=cache.get(generation_key))
+    path = cache.get(key)
+    if path is None:
+        path = compute()
+        cache.set(key, path, settings.TASKS_CRITICAL_PATH_CACHE_TIMEOUT)
+    return path
+
+
+def critical_path(edges):
+    """Returns the longest chain of tasks blocking one another.
+
+    The graph is sorted topologically, then every task gets the length of
+    the longest chain it starts and the date it is really due: its own
+    deadline or the earliest due date of the tasks it blocks, whichever comes
+    first. Both take one pass over the edges, in reverse topological order.
+    Ties go to the chain starting with the lowest task id.
+
+    Args:
+        edges (iterable): ``(blocker, blocked, blocker_deadline, blocked_deadline)`` tuples.
+
+    Returns:
+        list: ``{"id", "deadline", "due"}`` dicts from the first task of the
+        chain to the last, empty when no task blocks another.
+
+    Raises:
+        ValueError: If the links form a cycle.
+    """
+    successors = defaultdict(list)
+    blockers = defaultdict(int)
+    deadlines = {}
+    for blocker, blocked, blocker_deadline, blocked_deadline in edges:
+        successors[blocker].append(blocked)
+        blockers[blocked] += 1
+        blockers.setdefault(blocker, 0)
+        deadlines[blocker], deadlines[blocked] = blocker_deadline, blocked_deadline
+
+    ready = [task for task, count in blockers.items() if not count]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        task = heapq.heappop(ready)
+        order.append(task)
+        for blocked in successors[task]:
+            blockers[blocked] -= 1
+            if not blockers[blocked]:
+                heapq.heappush(ready, blocked)
+    if len(order) != len(blockers):
+        raise ValueError("The task links form a cycle.")
+
+    length, following, due = {}, {}, {}
+    for task in reversed(order):
+        length[task], following[task], due[task] = 1, None, deadlines[task]
+        for blocked in successors[task]:
+            if (length[blocked] + 1, -blocked) > (length[task], -(following[task] or 0)):
+                length[task], following[task] = length[blocked] + 1, blocked
+            if due[blocked] is not None and (due[task] is None or due[blocked] < due[task]):
+                due[task] = due[blocked]
+
+    path = []
+    task = min(order, key=lambda task: (-length[task], task)) if order else None
+    while task is not None:
+        path.append({"id": task, "deadline": deadlines[task], "due": due[task]})
+        task = following[task]
+    return path
@@ -0,0 +1,112 @@
+import mimetypes
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+PIECE_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Returns the inclusive ``(first, last)`` bytes of a single range ``header`` for a file of ``size`` bytes.
+
+    Returns None when the whole file should be sent: no header, a header that
+    is not understood, or several ranges, which servers may ignore. Raises
+    ValueError when the range lies outside the file.
+    """
+    match = RANGE_RE.match(header or "")
+    if match is None or match.group(1) == match.group(2) == "" or size == 0:
+        return None
+    first, last = match.groups()
+    if first == "":
+        # A suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first > last:
+        raise ValueError(header)
+    return first, last
+
+
+def read_range(file, first, last):
+    """Yields the bytes ``first`` to ``last`` of ``file`` in pieces, then closes it."""
+    try:
+        file.seek(first)
+        remaining = last - first + 1
+        while remaining:
+            piece = file.read(min(PIECE_SIZE, remaining))
+            if not piece:
+                break
+            remaining -= len(piece)
+            yield piece
+    finally:
+        file.close()
+
+
+def serve_attachment(request, attachment):
+    """Returns the response that sends the file of ``attachment``.
+
+    ``If-None-Match`` and ``If-Modified-Since`` are answered with 304 from the
+    content hash and the file's modification time. With
+    ``TASKS_ATTACHMENT_SENDFILE`` set to ``x-accel-redirect`` or
+    ``x-sendfile`` the front proxy sends the bytes, Range requests included.
+    Otherwise a single byte range is answered with 206, and whole files go
+    through ``FileResponse``, which lets the server use ``sendfile()``.
+    """
+    content = attachment.content
+    storage = content.storage
+    etag = quote_etag(attachment.checksum) if attachment.checksum else None
+    last_modified = int(storage.get_modified_time(content.name).timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    name = attachment.name or content.name.rsplit("/", 1)[-1]
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    size = storage.size(content.name)
+    mode = settings.TASKS_ATTACHMENT_SENDFILE
+    if mode == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.TASKS_ATTACHMENT_ACCEL_PREFIX + content.name
+    elif mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = storage.path(content.name)
+    else:
+        response = _file_response(request, content, size, content_type, etag, last_modified)
+
+    response["Content-Disposition"] = content_disposition_header(True, name)
+    response["Last-Modified"] = http_date(last_modified)
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+def _file_response(request, content, size, content_type, etag, last_modified):
+    byte_range = request.META.get("HTTP_RANGE")
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if byte_range and if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        # The client's copy is stale, so it gets the whole file instead of a part of it.
+        byte_range = None
+    try:
+        byte_range = parse_range(byte_range, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    response_file = content.storage.open(content.name, "rb")
+    if byte_range is None:
+        response = FileResponse(response_file, content_type=content_type)
+    else:
+        first, last = byte_range
+        response = StreamingHttpResponse(read_range(response_file, first, last), status=206,
+                                         content_type=content_type)
+        response["Content-Range"] = f"bytes {first}-{last}/{size}"
+        response["Content-Length"] = str(last - first + 1)
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,302 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext as _
+
+from accounts.models import CustomUser
+from projects.models import Sprint
+from .models import Activity, Label, Task, TaskImport, TaskLabel
+
+FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".json": "ndjson",
+}
+
+
+def guess_format(name):
+    """Returns the import format of a file name by its extension, or None."""
+    return FORMATS.get(os.path.splitext(name)[1].lower())
+
+
+def file_checksum(stream, chunk_size=1024 * 1024):
+    """Returns the sha256 of a binary file read in chunks, leaving the file rewound."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def parse_rows(stream, file_format):
+    """Yields ``(line, row)`` for every record of a binary CSV or NDJSON file, one at a time.
+
+    CSV records come out as dicts. NDJSON lines come out undecoded, so a
+    malformed line fails its own row instead of the whole file.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if file_format == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line, document in enumerate(text, start=1):
+                if document.strip():
+                    yield line, document
+    finally:
+        text.detach()
+
+
+def _copy_value(value):
+    # Unquoted empty fields are NULL in COPY's CSV format, quoted ones are empty strings.
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class TaskImporter:
+    """Imports tasks from a CSV or NDJSON file in batches.
+
+    A row has ``title``, ``description``, ``status``, ``sprint`` (an id),
+    ``user`` (an id or a username), ``labels`` (names, as a list or ``;``
+    separated), ``created_at`` and ``deadline``. NDJSON documents with a
+    ``type`` other than ``tasks`` are skipped, so project exports import as
+    they are. Labels that do not exist yet are created.
+
+    References are resolved against lookup tables loaded once per file. Rows
+    are written with ``COPY`` on PostgreSQL and ``bulk_create`` elsewhere, and
+    every batch is committed together with the progress of its ``TaskImport``.
+    Running the same file again resumes after the last committed batch.
+
+    Args:
+        job (TaskImport): The import to continue.
+        sprints (QuerySet): Sprints the file may reference. Defaults to all of them.
+        batch_size (int): Rows per committed batch.
+        using (str): Database alias to import into.
+    """
+    max_errors = 100
+
+    def __init__(self, job, sprints=None, batch_size=None, using=DEFAULT_DB_ALIAS):
+        self.job = job
+        self.sprints = Sprint.objects.all() if sprints is None else sprints
+        self.batch_size = batch_size or settings.TASKS_IMPORT_BATCH_SIZE
+        self.using = using
+        self.errors = []
+        self.rows_done = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    def for_file(cls, stream, name, user=None, **kwargs):
+        """Returns an importer for ``stream``, continuing the import of the same file if there was one.
+
+        A file that was already imported completely is not imported again.
+        """
+        checksum = file_checksum(stream)
+        job = TaskImport.objects.filter(checksum=checksum, user=user).order_by("-pk").first()
+        if job is None:
+            job = TaskImport.objects.create(checksum=checksum, user=user, name=name)
+        return cls(job, **kwargs)
+
+    @property
+    def rows_per_second(self):
+        return self.rows_done / self.elapsed if self.elapsed else 0.0
+
+    def load_lookups(self):
+        self.sprint_ids = set(self.sprints.using(self.using).values_list("pk", flat=True))
+        self.user_ids = set()
+        self.usernames = {}
+        for pk, username in CustomUser.objects.using(self.using).values_list("pk", "username"):
+            self.user_ids.add(pk)
+            self.usernames[username] = pk
+        self.label_ids = dict(Label.objects.using(self.using).values_list("name", "pk"))
+
+    def run(self, stream, file_format, progress=None):
+        """Imports the rows of ``stream`` after the ones already committed.
+
+        Args:
+            stream (file): The file, opened in binary mode.
+            file_format (str): ``csv`` or ``ndjson``.
+            progress (callable): Called with the importer after every committed batch.
+        """
+        if self.job.is_finished:
+            return
+        self.load_lookups()
+        started = time.perf_counter()
+        skip = self.job.rows_read
+        batch, failed, read = [], 0, skip
+        for number, (line, row) in enumerate(parse_rows(stream, file_format), start=1):
+            if number <= skip:
+                continue
+            read = number
+            try:
+                task = self.resolve(row)
+            except ValidationError as error:
+                failed += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append({"line": line, "errors": error.message_dict})
+            else:
+                if task is not None:
+                    batch.append(task)
+            if read - self.job.rows_read >= self.batch_size:
+                self.commit(batch, failed, read)
+                self.elapsed = time.perf_counter() - started
+                if progress is not None:
+                    progress(self)
+                batch, failed = [], 0
+        self.commit(batch, failed, read, finished=True)
+        self.elapsed = time.perf_counter() - started
+        if progress is not None:
+            progress(self)
+
+    def resolve(self, row):
+        """Turns a row into an unsaved task and its label names, or None for rows of another type."""
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except ValueError:
+                raise ValidationError({"row": [_("Invalid JSON.")]})
+            if not isinstance(row, dict):
+                raise ValidationError({"row": [_("Expected a JSON object.")]})
+        if row.get("type", "tasks") != "tasks":
+            return None
+
+        errors = {}
+        title = str(row.get("title") or "").strip()
+        if not title:
+            errors["title"] = [_("This field is required.")]
+        elif len(title) > Task._meta.get_field("title").max_length:
+            errors["title"] = [_("Ensure this field has no more than 255 characters.")]
+        status = row.get("status") or "ToDo"
+        if status not in dict(Task.CHOICES):
+            errors["status"] = [_("Unknown status.")]
+        sprint = self.resolve_id(row.get("sprint"), self.sprint_ids)
+        if sprint is None:
+            errors["sprint"] = [_("Unknown sprint.")]
+        user = None
+        if row.get("user") not in (None, ""):
+            user = self.resolve_id(row["user"], self.user_ids, self.usernames)
+            if user is None:
+                errors["user"] = [_("Unknown user.")]
+        dates = {}
+        for field in ("created_at", "deadline"):
+            try:
+                dates[field] = self.parse_date(row.get(field))
+            except ValueError:
+                errors[field] = [_("Invalid date.")]
+        labels = row.get("labels") or []
+        if isinstance(labels, str):
+            labels = labels.split(";")
+        labels = list(dict.fromkeys(str(name).strip() for name in labels if str(name).strip()))
+        if errors:
+            raise ValidationError(errors)
+
+        task = Task(title=title, description=str(row.get("description") or ""), status=status, sprint_id=sprint,
+                    user_id=user, deadline=dates["deadline"])
+        task.created_at = dates["created_at"]
+        # The label links are inserted in bulk, which does not maintain the counter.
+        task.label_count = len(labels)
+        return task, labels
+
+    @staticmethod
+    def resolve_id(value, ids, names=None):
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            value = int(value)
+            return value if value in ids else None
+        if names is not None and isinstance(value, str):
+            return names.get(value)
+        return None
+
+    @staticmethod
+    def parse_date(value):
+        if value in (None, ""):
+            return None
+        date = parse_datetime(value) if isinstance(value, str) else None
+        if date is None:
+            raise ValueError(value)
+        if settings.USE_TZ and timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
+
+    def commit(self, batch, failed, read, finished=False):
+        with transaction.atomic(using=self.using):
+            self.insert(batch)
+            rows = read - self.job.rows_read
+            self.job.rows_read = read
+            self.job.rows_imported += len(batch)
+            self.job.rows_failed += failed
+            self.job.is_finished = finished
+            self.job.save(using=self.using,
+                          update_fields=["rows_read", "rows_imported", "rows_failed", "is_finished", "updated_at"])
+        self.rows_done += rows
+
+    def insert(self, batch):
+        if not batch:
+            return
+        names = {name for task, labels in batch for name in labels}
+        new = sorted(names - self.label_ids.keys())
+        if new:
+            created = Label.objects.using(self.using).bulk_create(Label(name=name) for name in new)
+            self.label_ids.update((label.name, label.pk) for label in created)
+
+        tasks = [task for task, labels in batch]
+        Task.append_ranks(tasks, using=self.using)
+        if connections[self.using].vendor == "postgresql":
+            self.copy(Task, tasks)
+        else:
+            dated = [(task, task.created_at) for task in tasks if task.created_at]
+            Task.objects.using(self.using).bulk_create(tasks, batch_size=settings.TASKS_BULK_BATCH_SIZE)
+            # created_at is auto_now_add, so bulk_create overwrote the imported dates.
+            for task, created_at in dated:
+                task.created_at = created_at
+            Task.objects.using(self.using).bulk_update([task for task, created_at in dated], ["created_at"],
+                                                       batch_size=settings.TASKS_BULK_BATCH_SIZE)
+
+        Activity.record(tasks, Activity.CREATED, using=self.using, batch_size=settings.TASKS_BULK_BATCH_SIZE)
+
+        links = [TaskLabel(task_id=task.pk, label_id=self.label_ids[name]) for task, labels in batch for name in labels]
+        if connections[self.using].vendor == "postgresql":
+            self.copy(TaskLabel, links)
+        else:
+            TaskLabel.objects.using(self.using).bulk_create(links, batch_size=settings.TASKS_BULK_BATCH_SIZE)
+
+    def copy(self, model, objs):
+        """Writes ``objs`` with one ``COPY ... FROM STDIN``, taking their ids from the table's sequence first.
+
+        Every field is prepared by its ``pre_save``, as an INSERT would, so
+        ``auto_now`` dates are set. An ``auto_now_add`` date set by the caller,
+        e.g. an imported creation date, is kept.
+        """
+        if not objs:
+            return
+        connection = connections[self.using]
+        opts = model._meta
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+                           [opts.db_table, opts.pk.column, len(objs)])
+            for obj, (pk,) in zip(objs, cursor.fetchall()):
+                obj.pk = pk
+            fields = opts.concrete_fields
+            buffer = io.StringIO()
+            for obj in objs:
+                values = [getattr(obj, field.attname)
+                          if getattr(field, "auto_now_add", False) and getattr(obj, field.attname) is not None
+                          else field.pre_save(obj, add=True)
+                          for field in fields]
+                buffer.write(",".join(_copy_value(field.get_db_prep_save(value, connection))
+                                      for field, value in zip(fields, values)))
+                buffer.write("\n")
+            buffer.seek(0)
+            columns = ", ".join(quote(field.column) for field in fields)
+            cursor.copy_expert(f"COPY {quote(opts.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
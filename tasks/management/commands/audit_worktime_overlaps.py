@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import WorkTime
+
+
+class Command(BaseCommand):
+    help = ("Lists the live work times that overlap an earlier work time of the same user, "
+            "in one pass over the work times sorted by user and start.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        worktimes = WorkTime.objects.db_manager(options["database"]).all()
+        found = 0
+        for user_id, earlier, later in WorkTime.find_overlaps(worktimes, batch_size=options["batch_size"]):
+            found += 1
+            self.stdout.write(f"User {user_id}: work time {later} overlaps work time {earlier}")
+        style = self.style.WARNING if found else self.style.SUCCESS
+        self.stdout.write(style(f"Found {found} overlapping work times"))
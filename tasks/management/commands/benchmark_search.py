@@ -0,0 +1,67 @@
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import CustomUser, Team
+from projects.models import Project, Sprint, WorkSpace
+from tasks.models import Task
+from tasks.search import search
+
+
+class Command(BaseCommand):
+    help = ("Times full-text searches over --tasks synthetic tasks made of random words. "
+            "The synthetic rows are rolled back unless --keep is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=1_000_000)
+        parser.add_argument("--vocabulary", type=int, default=50_000, help="Number of distinct words.")
+        parser.add_argument("--queries", nargs="+", default=["w1", "w40000", "w1 w2", "w100 w20000"],
+                            help="Queries to time; words are w<rank>, w1 being the most frequent.")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--keep", action="store_true", help="Commit the synthetic rows.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.create_tasks(options)
+            for query in options["queries"]:
+                self.time_query(user, query, options)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def create_tasks(self, options):
+        user = CustomUser.objects.create(username=f"benchmark-{time.time_ns()}")
+        team = Team.objects.create(name=user.username, owner=user, description="Benchmark")
+        workspace = WorkSpace.objects.create(title="Benchmark", team=team)
+        project = Project.objects.create(title="Benchmark", description="Benchmark", workspace=workspace, team=team)
+        sprint = Sprint.objects.create(project=project)
+
+        # Zipf-like word frequencies, like real text: w1 is everywhere, w40000 is rare.
+        random.seed(0)
+        words = [f"w{rank}" for rank in range(1, options["vocabulary"] + 1)]
+        weights = list(itertools.accumulate(1 / rank for rank in range(1, options["vocabulary"] + 1)))
+        count, batch_size = options["tasks"], options["batch_size"]
+        started = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            Task.objects.bulk_create(
+                Task(title=" ".join(random.choices(words, cum_weights=weights, k=4)),
+                     description=" ".join(random.choices(words, cum_weights=weights, k=30)),
+                     sprint=sprint, user=user, status="ToDo")
+                for number in range(offset, min(offset + batch_size, count))
+            )
+        self.stdout.write(f"Inserted and indexed {count} tasks in {time.perf_counter() - started:.1f}s")
+        return user
+
+    def time_query(self, user, query, options):
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            hits = search(user, query, limit=options["limit"])
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(f"{query!r}: {len(hits)} hits, median {statistics.median(timings) * 1000:.2f} ms, "
+                          f"best {min(timings) * 1000:.2f} ms")
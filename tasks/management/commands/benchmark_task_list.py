@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import CustomUser, Team
+from core.pagination import keyset_after
+from projects.models import Project, Sprint, WorkSpace
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ("Times keyset page fetches of the task list on a synthetic sprint of --tasks tasks. "
+            "The synthetic rows are rolled back unless --keep is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=2_000_000)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--pages", type=int, nargs="+", default=[1, 10_000])
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--explain", action="store_true", help="Print the query plan of every page.")
+        parser.add_argument("--keep", action="store_true", help="Commit the synthetic rows.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            sprint = self.create_tasks(options["tasks"], options["batch_size"])
+            tasks = Task.objects.filter_by(sprint=sprint).order_by(*Task.ORDERING)
+            for page in options["pages"]:
+                self.time_page(tasks, page, options)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def create_tasks(self, count, batch_size):
+        user = CustomUser.objects.create(username=f"benchmark-{time.time_ns()}")
+        team = Team.objects.create(name=user.username, owner=user, description="Benchmark")
+        workspace = WorkSpace.objects.create(title="Benchmark", team=team)
+        project = Project.objects.create(title="Benchmark", description="Benchmark", workspace=workspace, team=team)
+        sprint = Sprint.objects.create(project=project)
+
+        statuses = [value for value, label in Task.CHOICES]
+        started = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            Task.objects.bulk_create(
+                Task(title=f"Task {number}", description="", sprint=sprint, user=user,
+                     status=statuses[number % len(statuses)])
+                for number in range(offset, min(offset + batch_size, count))
+            )
+        self.stdout.write(f"Inserted {count} tasks in {time.perf_counter() - started:.1f}s")
+        return sprint
+
+    def time_page(self, tasks, page, options):
+        page_size = options["page_size"]
+        queryset = tasks
+        if page > 1:
+            last = tasks.values_list(*Task.ORDERING)[(page - 1) * page_size - 1]
+            queryset = tasks.filter(keyset_after(Task.ORDERING, last))
+        queryset = queryset[:page_size]
+
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            rows = list(queryset.all())
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(f"page {page}: {len(rows)} rows, median {statistics.median(timings) * 1000:.2f} ms, "
+                          f"best {min(timings) * 1000:.2f} ms")
+        if options["explain"]:
+            self.stdout.write(queryset.explain())
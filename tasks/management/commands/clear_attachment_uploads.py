@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks import uploads
+from tasks.models import AttachmentUpload
+
+
+class Command(BaseCommand):
+    help = ("Deletes attachment uploads that have not changed for --hours, "
+            "together with the temporary files of the unfinished ones.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = AttachmentUpload.objects.filter(updated_at__lt=cutoff)
+        deleted = 0
+        for upload in stale.only("pk", "offset").iterator():
+            uploads.discard(upload)
+            deleted += 1
+        stale.delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} attachment uploads"))
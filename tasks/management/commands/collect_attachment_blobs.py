@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tasks.models import Attachment, AttachmentBlob
+from tasks.storage import attachment_storage
+
+
+class Command(BaseCommand):
+    help = ("Removes the attachment blobs no attachment references any more, in batches. "
+            "Run it after archive_deleted has purged soft deleted attachments.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-age-hours", type=int, default=1,
+                            help="Keep blobs whose references changed more recently than this.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        cutoff = timezone.now() - timedelta(hours=options["min_age_hours"])
+        # The reference count finds the candidates; the NOT EXISTS check
+        # protects blobs whose count drifted, e.g. after raw SQL deletes.
+        unreferenced = (AttachmentBlob.objects.using(using)
+                        .filter(ref_count__lte=0, updated_at__lt=cutoff)
+                        .exclude(Exists(Attachment._base_manager.filter(blob=OuterRef("pk")))))
+        removed = size = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic(using=using):
+                batch = list(unreferenced.filter(pk__gt=last_pk).select_for_update()
+                             .order_by("pk").values_list("pk", "checksum", "size")[:options["batch_size"]])
+                if not batch:
+                    break
+                AttachmentBlob.objects.using(using).filter(pk__in=[pk for pk, checksum, blob_size in batch]).delete()
+            last_pk = batch[-1][0]
+            recreated = set(AttachmentBlob.objects.using(using)
+                            .filter(checksum__in=[checksum for pk, checksum, blob_size in batch])
+                            .values_list("checksum", flat=True))
+            for pk, checksum, blob_size in batch:
+                if checksum not in recreated:
+                    attachment_storage.purge(attachment_storage.blob_name(checksum))
+                    removed += 1
+                    size += blob_size
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} blobs ({size} bytes)"))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import TaskImporter, guess_format
+
+
+class Command(BaseCommand):
+    help = ("Imports tasks from a CSV or NDJSON file in committed batches. "
+            "Running the same file again resumes after the last committed batch.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument("--input", choices=("csv", "ndjson"),
+                            help="Format of the file. Guessed from its extension by default.")
+        parser.add_argument("--batch-size", type=int, help="Rows per committed batch.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        file_format = options["input"] or guess_format(options["path"])
+        if file_format is None:
+            raise CommandError("Cannot tell the format of the file, pass --input.")
+        try:
+            stream = open(options["path"], "rb")
+        except OSError as error:
+            raise CommandError(error)
+
+        with stream:
+            importer = TaskImporter.for_file(stream, options["path"], batch_size=options["batch_size"],
+                                             using=options["database"])
+            if importer.job.is_finished:
+                self.stdout.write(f"{options['path']} was already imported.")
+                return
+            if importer.job.rows_read:
+                self.stdout.write(f"Resuming after row {importer.job.rows_read}.")
+            importer.run(stream, file_format, progress=self.report)
+
+        for error in importer.errors:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        job = importer.job
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {job.rows_imported} tasks, {job.rows_failed} rows failed "
+            f"in {importer.elapsed:.1f}s ({importer.rows_per_second:.0f} rows/s)"
+        ))
+
+    def report(self, importer):
+        self.stdout.write(f"Committed {importer.job.rows_read} rows ({importer.rows_per_second:.0f} rows/s)")
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.db.models.functions import Length
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ("Rewrites the ranks of the board columns whose longest rank is longer than --max-length "
+            "with short, evenly spread ones, keeping the order of their tasks.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-length", type=int, default=settings.TASKS_RANK_MAX_LENGTH)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        columns = (Task.objects.db_manager(options["database"]).order_by()
+                   .values_list("sprint", "status")
+                   .annotate(longest=Max(Length("rank")))
+                   .filter(longest__gt=options["max_length"]))
+        rebalanced = 0
+        for sprint, status, longest in list(columns):
+            Task.rebalance_column(sprint, status, batch_size=options["batch_size"], using=options["database"])
+            rebalanced += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced the ranks of {rebalanced} columns"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ("Recomputes the comment, attachment, label and tracked time counters of every task "
+            "from its live children, in batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.db_manager(options["database"]).with_deleted()
+        fixed = tasks.repair_counters(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired the counters of {fixed} tasks"))
@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ("Marks tasks whose deadline passed as overdue and enqueues the reminders of the tasks "
+            "due soon or overdue, scanning the deadlines every --interval seconds.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=int, default=settings.TASKS_SCHEDULER_INTERVAL)
+        parser.add_argument("--lead", type=int, default=settings.TASKS_REMINDER_LEAD_HOURS,
+                            help="Enqueue reminders this many hours before a deadline.")
+        parser.add_argument("--lookback", type=int, default=settings.TASKS_SCHEDULER_LOOKBACK_HOURS,
+                            help="Scan deadlines that passed up to this many hours ago.")
+        parser.add_argument("--once", action="store_true", help="Scan once and exit.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.db_manager(options["database"]).all()
+        lead = timedelta(hours=options["lead"])
+        lookback = timedelta(hours=options["lookback"])
+        while True:
+            now = timezone.now()
+            overdue, enqueued = tasks.scan_deadlines(now, now - lookback, lead, batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Marked {overdue} tasks overdue, enqueued {enqueued} reminders"))
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
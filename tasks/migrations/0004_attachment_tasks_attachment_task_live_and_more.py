@@ -0,0 +1,54 @@
+# Generated by Django 4.2.4 on 2026-10-17 03:52
+
+import core.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_attachment_deleted_at_comment_deleted_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attachment',
+            index=core.models.LiveIndex(fields=['task'], name='tasks_attachment_task_live'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=core.models.LiveIndex(fields=['task'], name='tasks_comment_task_live'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=core.models.LiveIndex(fields=['user'], name='tasks_comment_user_live'),
+        ),
+        migrations.AddIndex(
+            model_name='label',
+            index=core.models.LiveIndex(fields=['name'], name='tasks_label_name_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['sprint'], name='tasks_task_sprint_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['user'], name='tasks_task_user_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['status'], name='tasks_task_status_live'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklabel',
+            index=core.models.LiveIndex(fields=['task'], name='tasks_tasklabel_task_live'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklabel',
+            index=core.models.LiveIndex(fields=['label'], name='tasks_tasklabel_label_live'),
+        ),
+        migrations.AddIndex(
+            model_name='worktime',
+            index=core.models.LiveIndex(fields=['task'], name='tasks_worktime_task_live'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.4 on 2026-10-17 03:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0005_project_projects_project_wspace_live_and_more'),
+        ('tasks', '0004_attachment_tasks_attachment_task_live_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWorkTime',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted at')),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField(null=True)),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Task')),
+            ],
+            options={
+                'verbose_name': 'Archived Work Time',
+                'verbose_name_plural': 'Archived Work times',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted at')),
+                ('title', models.CharField(max_length=255, verbose_name='Title')),
+                ('created_at', models.DateTimeField(verbose_name='Created Date')),
+                ('description', models.TextField(verbose_name='Description')),
+                ('status', models.CharField(choices=[('ToDo', 'To Do'), ('Doing', 'Doing'), ('Done', 'Done')], max_length=255, verbose_name='Status')),
+                ('sprint', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.sprint', verbose_name='Sprint ID')),
+                ('user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Archived Task',
+                'verbose_name_plural': 'Archived Tasks',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted at')),
+                ('content', models.TextField(verbose_name='Content')),
+                ('created_at', models.DateTimeField(verbose_name='Created Time')),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Task')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Archived Comment',
+                'verbose_name_plural': 'Archived Comments',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttachment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted at')),
+                ('content', models.FileField(upload_to='task-attachments', verbose_name='Content')),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Task')),
+            ],
+            options={
+                'verbose_name': 'Archived Attachment',
+                'verbose_name_plural': 'Archived Attachments',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.4 on 2026-10-17 03:56
+
+import core.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_archivedworktime_archivedtask_archivedcomment_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_sprint_live',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['sprint', 'status', 'created_at', 'id'], name='tasks_task_board_live'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.4 on 2026-10-17 03:57
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_remove_task_tasks_task_sprint_live_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_user_live',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_status_live',
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Deadline'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['created_at', 'id'], name='tasks_task_created_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['sprint', 'created_at', 'id'], name='tasks_task_sprint_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['user', 'created_at', 'id'], name='tasks_task_user_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['status', 'created_at', 'id'], name='tasks_task_status_live'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['deadline'], name='tasks_task_deadline_live'),
+        ),
+    ]
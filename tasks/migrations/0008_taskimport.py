@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-17 04:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0007_remove_task_tasks_task_user_live_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('checksum', models.CharField(db_index=True, max_length=64, verbose_name='Checksum')),
+                ('rows_read', models.PositiveIntegerField(default=0, verbose_name='Rows read')),
+                ('rows_imported', models.PositiveIntegerField(default=0, verbose_name='Rows imported')),
+                ('rows_failed', models.PositiveIntegerField(default=0, verbose_name='Rows failed')),
+                ('is_finished', models.BooleanField(default=False, verbose_name='Is finished')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated Date')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='task_imports', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Task Import',
+                'verbose_name_plural': 'Task Imports',
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.4 on 2026-10-17 04:14
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def backfill_counters(apps, schema_editor):
+    """Counts the live children of the existing tasks, a batch of tasks at a time, as ``repair_counters`` does."""
+    alias = schema_editor.connection.alias
+    Task = apps.get_model("tasks", "Task")
+    WorkTime = apps.get_model("tasks", "WorkTime")
+    counted = {
+        "comment_count": apps.get_model("tasks", "Comment"),
+        "attachment_count": apps.get_model("tasks", "Attachment"),
+        "label_count": apps.get_model("tasks", "TaskLabel"),
+    }
+    tasks = Task._base_manager.using(alias).order_by("pk").values_list("pk", flat=True)
+    last = None
+    while True:
+        ids = list((tasks if last is None else tasks.filter(pk__gt=last))[:BATCH_SIZE])
+        if not ids:
+            return
+        last = ids[-1]
+        values = {
+            field: dict(model._base_manager.using(alias).filter(task__in=ids, is_deleted=False).order_by()
+                        .values("task").annotate(total=Count("pk")).values_list("task", "total"))
+            for field, model in counted.items()
+        }
+        values["tracked_seconds"] = defaultdict(int)
+        closed = (WorkTime._base_manager.using(alias).filter(task__in=ids, is_deleted=False, end_date__isnull=False)
+                  .values_list("task", "start_date", "end_date"))
+        for task, start_date, end_date in closed.iterator():
+            values["tracked_seconds"][task] += max(int((end_date - start_date).total_seconds()), 0)
+        changed = [Task(pk=pk, **{field: totals.get(pk, 0) for field, totals in values.items()})
+                   for pk in ids if any(pk in totals for totals in values.values())]
+        Task._base_manager.using(alias).bulk_update(changed, list(values))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='attachment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Attachment count'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Comment count'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='label_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Label count'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='tracked_seconds',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Tracked seconds'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='attachment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Attachment count'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Comment count'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='label_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Label count'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tracked_seconds',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Tracked seconds'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
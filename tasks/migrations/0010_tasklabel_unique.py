@@ -0,0 +1,53 @@
+# Generated by Django 4.2.4 on 2026-10-17 04:16
+
+import core.models
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+
+def soft_delete_duplicate_links(apps, schema_editor):
+    """Keeps the oldest live link of every (task, label) pair so the unique constraint can be added.
+
+    The task's label count, backfilled with the duplicates, loses them too.
+    """
+    Task = apps.get_model("tasks", "Task")
+    TaskLabel = apps.get_model("tasks", "TaskLabel")
+    live = TaskLabel.objects.using(schema_editor.connection.alias).filter(is_deleted=False)
+    duplicates = (live.exclude(task=None).exclude(label=None).order_by()
+                  .values("task", "label").annotate(links=Count("pk"), keep=Min("pk")).filter(links__gt=1))
+    now = timezone.now()
+    for pair in duplicates.iterator():
+        live.filter(task=pair["task"], label=pair["label"]).exclude(pk=pair["keep"]).update(
+            is_deleted=True, deleted_at=now,
+        )
+        Task.objects.using(schema_editor.connection.alias).filter(pk=pair["task"]).update(
+            label_count=F("label_count") - (pair["links"] - 1),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tasklabel',
+            name='tasks_tasklabel_task_live',
+        ),
+        migrations.RemoveIndex(
+            model_name='tasklabel',
+            name='tasks_tasklabel_label_live',
+        ),
+        migrations.AddIndex(
+            model_name='tasklabel',
+            index=core.models.LiveIndex(fields=['label', 'task'], name='tasks_tasklabel_label_live'),
+        ),
+        migrations.RunPython(soft_delete_duplicate_links, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tasklabel',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('task', 'label'), name='tasks_tasklabel_unique_live'),
+        ),
+    ]
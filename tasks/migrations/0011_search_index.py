@@ -0,0 +1,128 @@
+from django.db import migrations
+
+POSTGRESQL = [
+    (
+        """
+        ALTER TABLE tasks_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        "ALTER TABLE tasks_task DROP COLUMN search_vector",
+    ),
+    (
+        "CREATE INDEX tasks_task_search_live ON tasks_task USING GIN (search_vector) WHERE NOT is_deleted",
+        "DROP INDEX tasks_task_search_live",
+    ),
+    (
+        """
+        ALTER TABLE tasks_comment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED
+        """,
+        "ALTER TABLE tasks_comment DROP COLUMN search_vector",
+    ),
+    (
+        "CREATE INDEX tasks_comment_search_live ON tasks_comment USING GIN (search_vector) WHERE NOT is_deleted",
+        "DROP INDEX tasks_comment_search_live",
+    ),
+]
+
+# Tasks are stored under rowid 2 * id and comments under 2 * id + 1, so the
+# triggers find their row through the rowid instead of scanning the index.
+SQLITE = [
+    (
+        "CREATE VIRTUAL TABLE tasks_search_index USING fts5(title, body, task_id UNINDEXED, tokenize='unicode61')",
+        "DROP TABLE tasks_search_index",
+    ),
+    (
+        """
+        INSERT INTO tasks_search_index (rowid, title, body, task_id)
+        SELECT 2 * id, title, description, id FROM tasks_task WHERE NOT is_deleted
+        UNION ALL
+        SELECT 2 * id + 1, '', content, task_id FROM tasks_comment WHERE NOT is_deleted
+        """,
+        None,
+    ),
+    (
+        """
+        CREATE TRIGGER tasks_task_search_insert AFTER INSERT ON tasks_task WHEN NOT new.is_deleted BEGIN
+            INSERT INTO tasks_search_index (rowid, title, body, task_id)
+            VALUES (2 * new.id, new.title, new.description, new.id);
+        END
+        """,
+        "DROP TRIGGER tasks_task_search_insert",
+    ),
+    (
+        """
+        CREATE TRIGGER tasks_task_search_update AFTER UPDATE OF title, description, is_deleted ON tasks_task BEGIN
+            DELETE FROM tasks_search_index WHERE rowid = 2 * old.id;
+            INSERT INTO tasks_search_index (rowid, title, body, task_id)
+            SELECT 2 * new.id, new.title, new.description, new.id WHERE NOT new.is_deleted;
+        END
+        """,
+        "DROP TRIGGER tasks_task_search_update",
+    ),
+    (
+        """
+        CREATE TRIGGER tasks_task_search_delete AFTER DELETE ON tasks_task BEGIN
+            DELETE FROM tasks_search_index WHERE rowid = 2 * old.id;
+        END
+        """,
+        "DROP TRIGGER tasks_task_search_delete",
+    ),
+    (
+        """
+        CREATE TRIGGER tasks_comment_search_insert AFTER INSERT ON tasks_comment WHEN NOT new.is_deleted BEGIN
+            INSERT INTO tasks_search_index (rowid, title, body, task_id)
+            VALUES (2 * new.id + 1, '', new.content, new.task_id);
+        END
+        """,
+        "DROP TRIGGER tasks_comment_search_insert",
+    ),
+    (
+        """
+        CREATE TRIGGER tasks_comment_search_update AFTER UPDATE OF content, task_id, is_deleted ON tasks_comment BEGIN
+            DELETE FROM tasks_search_index WHERE rowid = 2 * old.id + 1;
+            INSERT INTO tasks_search_index (rowid, title, body, task_id)
+            SELECT 2 * new.id + 1, '', new.content, new.task_id WHERE NOT new.is_deleted;
+        END
+        """,
+        "DROP TRIGGER tasks_comment_search_update",
+    ),
+    (
+        """
+        CREATE TRIGGER tasks_comment_search_delete AFTER DELETE ON tasks_comment BEGIN
+            DELETE FROM tasks_search_index WHERE rowid = 2 * old.id + 1;
+        END
+        """,
+        "DROP TRIGGER tasks_comment_search_delete",
+    ),
+]
+
+STATEMENTS = {
+    "postgresql": POSTGRESQL,
+    "sqlite": SQLITE,
+}
+
+
+def create_search_index(apps, schema_editor):
+    for forward, backward in STATEMENTS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(forward)
+
+
+def drop_search_index(apps, schema_editor):
+    for forward, backward in reversed(STATEMENTS.get(schema_editor.connection.vendor, [])):
+        if backward is not None:
+            schema_editor.execute(backward)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_tasklabel_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
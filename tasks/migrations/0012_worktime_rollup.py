@@ -0,0 +1,34 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkTimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('seconds', models.BigIntegerField(default=0, verbose_name='Seconds')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='work_time_rollups', to='tasks.task', verbose_name='Task')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='work_time_rollups', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Work Time Rollup',
+                'verbose_name_plural': 'Work Time Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='worktimerollup',
+            constraint=models.UniqueConstraint(fields=('task', 'user', 'day'), name='tasks_worktimerollup_unique'),
+        ),
+    ]
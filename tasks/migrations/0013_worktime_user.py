@@ -0,0 +1,30 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0012_worktime_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedworktime',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddField(
+            model_name='worktime',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='work_times', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddConstraint(
+            model_name='worktime',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_date__isnull', True), ('is_deleted', False)), fields=('user',), name='tasks_worktime_one_open_per_user'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:08
+
+import core.models
+from django.db import migrations
+
+# Half open ranges, so an interval may start exactly when the previous one
+# ends. An open interval has no upper bound and overlaps everything after it.
+POSTGRESQL = [
+    (
+        "CREATE EXTENSION IF NOT EXISTS btree_gist",
+        None,
+    ),
+    (
+        """
+        ALTER TABLE tasks_worktime ADD CONSTRAINT tasks_worktime_no_overlap EXCLUDE USING gist (
+            user_id WITH =,
+            tstzrange(start_date, end_date, '[)') WITH &&
+        ) WHERE (NOT is_deleted AND user_id IS NOT NULL)
+        """,
+        "ALTER TABLE tasks_worktime DROP CONSTRAINT tasks_worktime_no_overlap",
+    ),
+]
+
+STATEMENTS = {
+    "postgresql": POSTGRESQL,
+}
+
+
+def create_overlap_constraint(apps, schema_editor):
+    for forward, backward in STATEMENTS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(forward)
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    for forward, backward in reversed(STATEMENTS.get(schema_editor.connection.vendor, [])):
+        if backward is not None:
+            schema_editor.execute(backward)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_worktime_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worktime',
+            index=core.models.LiveIndex(fields=['user', 'start_date'], name='tasks_worktime_user_start_live'),
+        ),
+        migrations.RunPython(create_overlap_constraint, drop_overlap_constraint),
+    ]
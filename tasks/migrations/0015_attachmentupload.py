@@ -0,0 +1,45 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0014_worktime_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='checksum',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Checksum'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='checksum',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Checksum'),
+        ),
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Offset')),
+                ('checksum', models.CharField(blank=True, max_length=64, verbose_name='Checksum')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated Date')),
+                ('attachment', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='tasks.attachment', verbose_name='Attachment')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachment_uploads', to='tasks.task', verbose_name='Task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachment_uploads', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Attachment Upload',
+                'verbose_name_plural': 'Attachment Uploads',
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import tasks.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_attachmentupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checksum', models.CharField(max_length=64, unique=True, verbose_name='Checksum')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Reference count')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated Date')),
+            ],
+            options={
+                'verbose_name': 'Attachment Blob',
+                'verbose_name_plural': 'Attachment Blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Name'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Name'),
+        ),
+        migrations.AlterField(
+            model_name='archivedattachment',
+            name='content',
+            field=models.FileField(storage=tasks.storage.ContentAddressedStorage(), upload_to='task-attachments', verbose_name='Content'),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='content',
+            field=models.FileField(storage=tasks.storage.ContentAddressedStorage(), upload_to='task-attachments', verbose_name='Content'),
+        ),
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='blob',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.attachmentblob', verbose_name='Blob'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='tasks.attachmentblob', verbose_name='Blob'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:16
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='tasks_comment_task_live',
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='parent',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.comment', verbose_name='Reply to'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='tasks.comment', verbose_name='Reply to'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=core.models.LiveIndex(fields=['task', 'created_at'], name='tasks_comment_task_time_live'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=core.models.LiveIndex(fields=['parent', 'created_at'], name='tasks_comment_reply_time_live'),
+        ),
+    ]
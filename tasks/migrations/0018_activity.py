@@ -0,0 +1,36 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0005_project_projects_project_wspace_live_and_more'),
+        ('tasks', '0017_comment_threads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('verb', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('restored', 'Restored')], max_length=16, verbose_name='Verb')),
+                ('target_type', models.CharField(max_length=32, verbose_name='Target type')),
+                ('target_id', models.BigIntegerField(null=True, verbose_name='Target ID')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Data')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activities', to=settings.AUTH_USER_MODEL, verbose_name='Actor')),
+                ('project', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.project', verbose_name='Project')),
+                ('task', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Task')),
+            ],
+            options={
+                'verbose_name': 'Activity',
+                'verbose_name_plural': 'Activities',
+                'indexes': [models.Index(fields=['project', 'id'], name='tasks_activity_project_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:36
+
+import core.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0020_task_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('upcoming', 'Upcoming'), ('overdue', 'Overdue')], max_length=16, verbose_name='Kind')),
+                ('deadline', models.DateTimeField(verbose_name='Deadline')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent at')),
+            ],
+            options={
+                'verbose_name': 'Task Reminder',
+                'verbose_name_plural': 'Task Reminders',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_deadline_live',
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='End time'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='is_overdue',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Is overdue'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='started_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Start time'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='End time'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='is_overdue',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Is overdue'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='started_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Start time'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['deadline', 'id'], name='tasks_task_deadline_live'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='task',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Task'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_reminders', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreminder',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['id'], name='tasks_taskreminder_pending'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskreminder',
+            constraint=models.UniqueConstraint(fields=('task', 'kind', 'deadline'), name='tasks_taskreminder_unique'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:39
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0021_task_deadlines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='rank',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Rank'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Rank'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=core.models.LiveIndex(fields=['sprint', 'status', 'rank', 'id'], name='tasks_task_rank_live'),
+        ),
+    ]
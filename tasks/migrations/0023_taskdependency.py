@@ -0,0 +1,54 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:42
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0022_task_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTaskDependency',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted at')),
+                ('created_at', models.DateTimeField(verbose_name='Created Date')),
+                ('blocked', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Blocked')),
+                ('blocker', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Blocker')),
+            ],
+            options={
+                'verbose_name': 'Archived Task Dependency',
+                'verbose_name_plural': 'Archived Task Dependencies',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Deleted at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('blocked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_by_links', to='tasks.task', verbose_name='Blocked')),
+                ('blocker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocking_links', to='tasks.task', verbose_name='Blocker')),
+            ],
+            options={
+                'verbose_name': 'Task Dependency',
+                'verbose_name_plural': 'Task Dependencies',
+                'indexes': [core.models.LiveIndex(fields=['blocked', 'blocker'], name='tasks_taskdep_blocked_live')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('blocker', 'blocked'), name='tasks_taskdep_unique_live'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.CheckConstraint(check=models.Q(('blocker', models.F('blocked')), _negated=True), name='tasks_taskdep_not_self'),
+        ),
+    ]
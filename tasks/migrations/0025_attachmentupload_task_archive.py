@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0024_worktimerollup_task_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attachmentupload',
+            name='task',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task', verbose_name='Task'),
+        ),
+    ]
@@ -1,15 +1,156 @@
-from django.db import models
+import operator
+import os
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import reduce
+from itertools import islice
+
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Case, Count, Exists, F, Max, OuterRef, Prefetch, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Concat
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.utils.translation import gettext as _
-from core.models import SoftDeleteModel, TimeStampMixin
+from core.models import (LiveIndex, SoftDeleteManager, SoftDeleteModel, SoftDeleteQuerySet, TimeStampMixin,
+                         VersionedModel, make_archive_model)
+from core.pagination import keyset_after
+from .activity import current_actor
+from .dependencies import critical_path, invalidate_critical_paths
+from .ranking import DIGITS, rank_between, ranks_between, spread_ranks
+from .storage import ContentAddressedStorage, attachment_storage
+
+
+class TaskQuerySet(SoftDeleteQuerySet):
+
+    def filter_by(self, sprint=None, status=None, user=None, label=None, deadline_after=None, deadline_before=None,
+                  labels=None, match="all"):
+        """Filters tasks on the columns the task list supports, skipping the ones left as None.
+
+        Every combination is served by one of the ``(..., created_at, id)``
+        indexes of ``Task``, so the result can be keyset paginated.
+        """
+        filters = {
+            "sprint": sprint,
+            "status": status,
+            "user": user,
+            "deadline__gte": deadline_after,
+            "deadline__lte": deadline_before,
+        }
+        tasks = self.filter(**{lookup: value for lookup, value in filters.items() if value is not None})
+        if label is not None:
+            tasks = tasks.filter(Exists(TaskLabel.objects.filter(task=OuterRef("pk"), label=label)))
+        if labels:
+            tasks = tasks.with_labels(labels, match=match)
+        return tasks
+
+    def with_labels(self, labels, match="all"):
+        """Filters tasks having all (``match="all"``) or any (``match="any"``) of the given label ids.
+
+        Both are a single ``task_id IN (SELECT ...)`` over the ``(label, task)``
+        index of ``TaskLabel``. A task has a label at most once, so ``all`` only
+        needs to count the matched labels of each task.
+        """
+        links = TaskLabel.objects.filter(label__in=labels).order_by()
+        if match == "all":
+            links = links.values("task").annotate(matched=Count("pk")).filter(matched=len(set(labels)))
+        return self.filter(pk__in=links.values("task"))
+
+    def with_board_data(self):
+        """Loads what a board card shows besides its counters: assignee and label names."""
+        return self.select_related("user").prefetch_related(
+            Prefetch("labels", queryset=TaskLabel.objects.filter(label__is_deleted=False).select_related("label"))
+        )
+
+    def repair_counters(self, batch_size=1000):
+        """Recomputes the counter columns of the tasks in the queryset from their live children.
+
+        Tasks are read in primary key order, ``batch_size`` at a time. Every
+        batch costs one aggregate query per counted model and one
+        ``bulk_update`` of the tasks whose counters were wrong.
+
+        Returns:
+            int: The number of tasks whose counters were wrong.
+        """
+        counted = (Comment, Attachment, TaskLabel, WorkTime)
+        fields = [model.task_counter for model in counted]
+        tasks = self.order_by("pk").only("pk", *fields)
+        fixed, last = 0, None
+        while True:
+            batch = list((tasks if last is None else tasks.filter(pk__gt=last))[:batch_size])
+            if not batch:
+                return fixed
+            last = batch[-1].pk
+            ids = [task.pk for task in batch]
+            values = {model.task_counter: model.counter_deltas(model.objects.filter(task__in=ids)) for model in counted}
+            changed = []
+            for task in batch:
+                wrong = False
+                for field in fields:
+                    value = values[field].get(task.pk, 0)
+                    if getattr(task, field) != value:
+                        setattr(task, field, value)
+                        wrong = True
+                if wrong:
+                    for field, value in Task.bump().items():
+                        setattr(task, field, value)
+                    changed.append(task)
+            self.model._base_manager.using(self.db).bulk_update(changed, [*fields, "version", "updated_at"])
+            fixed += len(changed)
+
+    def scan_deadlines(self, now, since, lead, batch_size=1000):
+        """Marks the overdue tasks of the queryset and enqueues their deadline reminders.
+
+        Only the open tasks due after ``since`` and at most ``lead`` after
+        ``now`` are read, in ``(deadline, id)`` order through the deadline
+        index, ``batch_size`` at a time and without loading the rows. Every
+        batch costs one ``UPDATE`` of the tasks that just became overdue, one
+        lookup of the reminders already enqueued and one ``INSERT`` of the new
+        ones, so scanning the same range again changes nothing.
+
+        Returns:
+            tuple: The number of tasks marked overdue and of reminders enqueued.
+        """
+        ordering = ("deadline", "id")
+        tasks = (self.filter(deadline__gt=since, deadline__lte=now + lead)
+                 .exclude(status="Done")
+                 .order_by(*ordering)
+                 .values_list("pk", "user", "deadline", "is_overdue"))
+        overdue, enqueued, last = 0, 0, None
+        while True:
+            batch = list((tasks if last is None else tasks.filter(keyset_after(ordering, last)))[:batch_size])
+            if not batch:
+                return overdue, enqueued
+            last = (batch[-1][2], batch[-1][0])
+            late = [pk for pk, user, deadline, is_overdue in batch if deadline <= now and not is_overdue]
+            if late:
+                overdue += self.model._base_manager.using(self.db).filter(pk__in=late, is_overdue=False).update(
+                    is_overdue=True, **Task.bump()
+                )
+            reminders = TaskReminder.objects.using(self.db)
+            sent = set(reminders.filter(task__in=[row[0] for row in batch]).values_list("task", "kind", "deadline"))
+            queued = []
+            for pk, user, deadline, is_overdue in batch:
+                kind = TaskReminder.OVERDUE if deadline <= now else TaskReminder.UPCOMING
+                if user is not None and (pk, kind, deadline) not in sent:
+                    queued.append(TaskReminder(task_id=pk, user_id=user, kind=kind, deadline=deadline))
+            reminders.bulk_create(queued, ignore_conflicts=True)
+            enqueued += len(queued)
 
 
-class Task(SoftDeleteModel, TimeStampMixin):
+class InvalidMove(ValueError):
+    """Raised when the neighbours a task is moved between are not next to each other in its new column."""
+
+
+class Task(SoftDeleteModel, VersionedModel, TimeStampMixin):
     CHOICES = (
         ("ToDo", "To Do"),
         ("Doing", "Doing"),
         ("Done", "Done"),
     )
+    ORDERING = ("created_at", "id")
+    BOARD_ORDERING = ("rank", "id")
+
     title = models.CharField(_("Title"), max_length=255)
     created_at = models.DateTimeField(verbose_name=_("Created Date"),
                                       auto_now_add=True)
@@ -24,14 +165,74 @@ class Task(SoftDeleteModel, TimeStampMixin):
                              on_delete=models.SET_NULL,
                              related_name="tasks")
     status = models.CharField(_("Status"), choices=CHOICES, max_length=255)
+    deadline = models.DateTimeField(_("Deadline"), null=True, blank=True)
+    is_overdue = models.BooleanField(_("Is overdue"), default=False, editable=False)
+    # Position in the board column of the task's sprint and status, see ranking.py.
+    rank = models.CharField(_("Rank"), max_length=255, default="", editable=False)
+    comment_count = models.IntegerField(_("Comment count"), default=0, editable=False)
+    attachment_count = models.IntegerField(_("Attachment count"), default=0, editable=False)
+    label_count = models.IntegerField(_("Label count"), default=0, editable=False)
+    tracked_seconds = models.BigIntegerField(_("Tracked seconds"), default=0, editable=False)
+
+    objects = SoftDeleteManager.from_queryset(TaskQuerySet)()
 
     class Meta:
         verbose_name = _("Task")
         verbose_name_plural = _("Tasks")
+        indexes = [
+            LiveIndex(fields=["created_at", "id"], name="tasks_task_created_live"),
+            LiveIndex(fields=["sprint", "created_at", "id"], name="tasks_task_sprint_live"),
+            LiveIndex(fields=["sprint", "status", "created_at", "id"], name="tasks_task_board_live"),
+            LiveIndex(fields=["sprint", "status", "rank", "id"], name="tasks_task_rank_live"),
+            LiveIndex(fields=["user", "created_at", "id"], name="tasks_task_user_live"),
+            LiveIndex(fields=["status", "created_at", "id"], name="tasks_task_status_live"),
+            LiveIndex(fields=["deadline", "id"], name="tasks_task_deadline_live"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def activity_data(self):
+        return {"title": self.title, "status": self.status}
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            adding = self._state.adding
+            if adding:
+                Task.append_ranks([self], using=using)
+            else:
+                invalidate_critical_paths([self.sprint_id], using=using)
+            super().save(*args, **kwargs)
+            Activity.record([self], Activity.CREATED if adding else Activity.UPDATED, using=using)
+
+    @classmethod
+    def on_soft_delete(cls, queryset, is_deleted):
+        Activity.record_queryset(queryset, Activity.DELETED if is_deleted else Activity.RESTORED)
+
+    @classmethod
+    def on_archive(cls, pks, using):
+        # Nobody is reminded of an archived task, and its time leaves the reports.
+        TaskReminder.objects.using(using).filter(task__in=pks).delete()
+        WorkTimeRollup.objects.using(using).filter(task__in=pks).delete()
+
+    @classmethod
+    def add_to_counter(cls, field, deltas, using=None):
+        """Adds ``{task_id: delta}`` to the ``field`` counter of each task.
+
+        The counters are incremented with ``F()`` in the database, one
+        ``UPDATE`` for every 500 tasks, so concurrent writers never lose an
+        increment.
+        """
+        deltas = [(pk, delta) for pk, delta in deltas.items() if delta]
+        for start in range(0, len(deltas), 500):
+            chunk = deltas[start:start + 500]
+            change = Case(*(When(pk=pk, then=Value(delta)) for pk, delta in chunk),
+                          default=Value(0), output_field=models.BigIntegerField())
+            cls._base_manager.using(using).filter(pk__in=[pk for pk, delta in chunk]).update(
+                **{field: F(field) + change}, **cls.bump()
+            )
+
     @classmethod
     def create_task(cls: "Task", title, description, deadline, sprint, user, status):
         task = Task.objects.create(title=title,
@@ -48,10 +249,128 @@ class Task(SoftDeleteModel, TimeStampMixin):
         return task
 
     def update_task(self: "Task", task_id, **kwargs):
-        task = Task.get_task(task_id)
-        for attr, value in kwargs.items():
-            setattr(task, attr, value)
-        task.save()
+        if Task.update_if_version(task_id, kwargs) is None:
+            raise Http404
+
+    @classmethod
+    def update_if_version(cls, pk, changes, versions=None, using=None):
+        """Writes ``changes`` to the live task ``pk`` and bumps its version, with one ``UPDATE``.
+
+        With ``versions`` the UPDATE only matches a task still at one of them,
+        so a change made to a stale copy is never applied over a newer one.
+        Only the changed columns are written. A new deadline clears the
+        overdue mark, the scheduler sets it again once the deadline passes.
+        A task changing column without a new rank goes to the end of it, one
+        staying in its column keeps its rank.
+
+        Returns:
+            Task: The updated task, or None if there is no such task or it is
+            at another version.
+        """
+        using = using or router.db_for_write(cls)
+        tasks = cls.objects.using(using).filter(pk=pk)
+        if versions is not None:
+            tasks = tasks.filter(version__in=versions)
+        if "deadline" in changes:
+            changes = {**changes, "is_overdue": False}
+        if "rank" not in changes and ("sprint" in changes or "status" in changes):
+            column = {field: changes.get(field, OuterRef(field)) for field in ("sprint", "status")}
+            moved = reduce(operator.or_, (~Q(**{field: changes[field]}) for field in column if field in changes))
+            last = cls.objects.filter(**column).order_by("-rank").values("rank")[:1]
+            changes = {**changes, "rank": Case(
+                When(moved, then=Concat(Coalesce(Subquery(last), Value("")), Value(DIGITS[-1]))),
+                default=F("rank"),
+            )}
+        with transaction.atomic(using=using):
+            # Moving a task to another sprint takes its links out of the old sprint's graph.
+            sprints = list(tasks.values_list("sprint", flat=True)) if "sprint" in changes else []
+            if not tasks.update(**changes, **cls.bump()):
+                return None
+            task = cls.objects.using(using).get(pk=pk)
+            if "sprint" in changes or "deadline" in changes:
+                invalidate_critical_paths([*sprints, task.sprint_id], using=using)
+            Activity.record([task], Activity.UPDATED, using=using)
+        return task
+
+    @classmethod
+    def append_ranks(cls, tasks, using=None):
+        """Ranks the unranked ``tasks`` after the last task of their column, in list order.
+
+        The last rank of every column involved is read with one query.
+        """
+        columns = defaultdict(list)
+        for task in tasks:
+            if not task.rank:
+                columns[(task.sprint_id, task.status)].append(task)
+        if not columns:
+            return
+        match = reduce(operator.or_, (Q(sprint=sprint, status=status) for sprint, status in columns))
+        last = cls.objects.using(using).filter(match).order_by().values("sprint", "status").annotate(last=Max("rank"))
+        last = {(row["sprint"], row["status"]): row["last"] for row in last}
+        for column, members in columns.items():
+            for task, rank in zip(members, ranks_between(last.get(column), None, len(members))):
+                task.rank = rank
+
+    @classmethod
+    def move(cls, pk, status, after=None, before=None, versions=None, using=None):
+        """Moves the task ``pk`` to the ``status`` column, between the tasks ``after`` and ``before``.
+
+        ``after`` is the task that ends up right above it and ``before`` the
+        one right below, None at the ends of the column. The new rank is
+        computed from the two neighbours and written with the single
+        ``UPDATE`` of ``update_if_version``. Neighbours sharing a rank are
+        first told apart by rebalancing the column.
+
+        Returns:
+            Task: The moved task, or None if there is no such task or it is at
+            another version.
+
+        Raises:
+            InvalidMove: If a neighbour is not a task of the column.
+        """
+        using = using or router.db_for_write(cls)
+        neighbours = [neighbour for neighbour in (after, before) if neighbour is not None]
+        rows = cls.objects.using(using).filter(pk__in=[pk, *neighbours]).values_list("pk", "sprint", "status", "rank")
+        rows = {row[0]: row[1:] for row in rows}
+        if pk not in rows:
+            return None
+        sprint = rows[pk][0]
+        for neighbour in neighbours:
+            if neighbour == pk or rows.get(neighbour, (None, None))[:2] != (sprint, status):
+                raise InvalidMove(_("Task %(id)s is not in the %(status)s column.") % {"id": neighbour, "status": status})
+        low = rows[after][2] if after is not None else None
+        high = rows[before][2] if before is not None else None
+        if high is not None and (low or "") >= high:
+            cls.rebalance_column(sprint, status, using=using)
+            ranks = dict(cls.objects.using(using).filter(pk__in=neighbours).values_list("pk", "rank"))
+            low, high = ranks.get(after), ranks.get(before)
+        try:
+            rank = rank_between(low, high)
+        except ValueError:
+            raise InvalidMove(_("Task %(after)s is not above task %(before)s.") % {"after": after, "before": before})
+        return cls.update_if_version(pk, {"status": status, "rank": rank}, versions=versions, using=using)
+
+    @classmethod
+    def rebalance_column(cls, sprint, status, batch_size=1000, using=None):
+        """Rewrites the ranks of a column with the shortest keys, evenly spread, keeping its order.
+
+        The column's tasks are locked while their ranks are read and written
+        back with ``bulk_update``. Ranks are not shown, so versions are left
+        alone.
+
+        Returns:
+            int: The number of tasks in the column.
+        """
+        using = using or router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            tasks = list(cls.objects.using(using).select_for_update()
+                         .filter(sprint=sprint, status=status)
+                         .order_by(*cls.BOARD_ORDERING)
+                         .only("pk", "rank"))
+            for task, rank in zip(tasks, spread_ranks(len(tasks))):
+                task.rank = rank
+            cls._base_manager.using(using).bulk_update(tasks, ["rank"], batch_size=batch_size)
+        return len(tasks)
 
     @property
     def all_labels(self: "Task"):
@@ -59,8 +378,8 @@ class Task(SoftDeleteModel, TimeStampMixin):
         return labels
 
     @classmethod
-    def task_status(cls: "Task", status):
-        tasks = cls.objects.filter(status=status)
+    def task_status(cls: "Task", status, sprint=None):
+        tasks = cls.objects.filter_by(status=status, sprint=sprint).order_by(*cls.ORDERING)
         return tasks
 
     @property
@@ -79,6 +398,62 @@ class Task(SoftDeleteModel, TimeStampMixin):
         return worktimes
 
 
+class TaskCountedModel(SoftDeleteModel):
+    """Soft deletable child of a task that is tallied in one of the task's counter columns.
+
+    Creating, saving, soft deleting and restoring rows keeps ``task_counter``
+    up to date. ``bulk_create``, ``update`` and hard deletes bypass it; the
+    ``repair_task_counters`` command puts the counters right after those.
+    """
+    task_counter = None
+
+    class Meta:
+        abstract = True
+
+    def counter_value(self):
+        """What this row adds to its task's counter while it is live."""
+        return 1
+
+    def activity_data(self):
+        """What the activity recorded for a change of this row keeps besides its id."""
+        return {}
+
+    @classmethod
+    def counter_deltas(cls, queryset):
+        """Returns ``{task_id: total}`` of ``counter_value`` over the rows of ``queryset``."""
+        totals = (queryset.filter(task__isnull=False)
+                  .order_by()
+                  .values("task")
+                  .annotate(total=Count("pk"))
+                  .values_list("task", "total"))
+        return dict(totals)
+
+    @classmethod
+    def on_soft_delete(cls, queryset, is_deleted):
+        sign = -1 if is_deleted else 1
+        deltas = cls.counter_deltas(queryset)
+        Task.add_to_counter(cls.task_counter, {pk: sign * total for pk, total in deltas.items()}, using=queryset.db)
+        Activity.record_queryset(queryset, Activity.DELETED if is_deleted else Activity.RESTORED)
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            old = None
+            if not self._state.adding:
+                old = type(self)._base_manager.using(using).select_for_update().filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+            deltas = defaultdict(int)
+            for instance, sign in ((old, -1), (self, 1)):
+                if instance is not None and not instance.is_deleted and instance.task_id is not None:
+                    deltas[instance.task_id] += sign * instance.counter_value()
+            Task.add_to_counter(self.task_counter, deltas, using=using)
+            self.on_save(old, using)
+            Activity.record([self], Activity.UPDATED if old is not None else Activity.CREATED, using=using)
+
+    def on_save(self, old, using):
+        """Called by ``save()`` in its transaction with the row as it was before, None if it was created."""
+
+
 class Label(SoftDeleteModel):
     name = models.CharField(_("Name"),
                             max_length=255)
@@ -94,18 +469,23 @@ class Label(SoftDeleteModel):
         return label
 
     def all_tasks(self):
-        tasks = list(TaskLabel.objects.select_related("Task").filter(label=self.id).values("task"))
+        tasks = Task.objects.with_labels([self.pk])
         return tasks
 
     class Meta:
         verbose_name = _("Label")
         verbose_name_plural = _("Labels")
+        indexes = [
+            LiveIndex(fields=["name"], name="tasks_label_name_live"),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class TaskLabel(SoftDeleteModel):
+class TaskLabel(TaskCountedModel):
+    task_counter = "label_count"
+
     label = models.ForeignKey("Label",
                               verbose_name=_("Label"),
                               null=True,
@@ -131,18 +511,66 @@ class TaskLabel(SoftDeleteModel):
             setattr(task_label, attr, value)
         task_label.save()
 
+    def activity_data(self):
+        return {"label": self.label_id}
+
     def does_task_label_exist(self):
         return TaskLabel.objects.filter(label=self.label, task=self.task).exists()
 
+    @classmethod
+    def attach(cls, task_ids, label_ids, batch_size=500, using=None):
+        """Attaches every label to every task, skipping the pairs that are already attached.
+
+        The live pairs of every batch are read with one query and only the
+        others are inserted and recorded as created, without the id of their
+        link. A pair attached concurrently is skipped by the unique constraint.
+        ``label_count`` of the tasks is recounted afterwards.
+        """
+        using = using or router.db_for_write(cls)
+        pairs = [(task_id, label_id) for task_id in task_ids for label_id in label_ids]
+        with transaction.atomic(using=using):
+            for start in range(0, len(pairs), batch_size):
+                batch = pairs[start:start + batch_size]
+                existing = set(cls.objects.using(using)
+                               .filter(task__in={task_id for task_id, label_id in batch},
+                                       label__in={label_id for task_id, label_id in batch})
+                               .values_list("task", "label"))
+                links = [cls(task_id=task_id, label_id=label_id) for task_id, label_id in batch
+                         if (task_id, label_id) not in existing]
+                cls.objects.using(using).bulk_create(links, ignore_conflicts=True)
+                Activity.record(links, Activity.CREATED, using=using, batch_size=batch_size)
+            counts = (cls.objects.filter(task=OuterRef("pk"))
+                      .order_by()
+                      .values("task")
+                      .annotate(count=Count("pk"))
+                      .values("count"))
+            Task._base_manager.using(using).filter(pk__in=task_ids).update(label_count=Coalesce(Subquery(counts), 0),
+                                                                           **Task.bump())
+
+    @classmethod
+    def detach(cls, task_ids, label_ids):
+        """Soft deletes the links between the tasks and the labels, returning how many there were."""
+        return cls.objects.filter(task__in=task_ids, label__in=label_ids).soft_delete()
+
     class Meta:
         verbose_name = _("Task Label")
         verbose_name_plural = _("Task Labels")
+        constraints = [
+            # Also the index for looking up the labels of a task.
+            models.UniqueConstraint(fields=["task", "label"], condition=models.Q(is_deleted=False),
+                                    name="tasks_tasklabel_unique_live"),
+        ]
+        indexes = [
+            LiveIndex(fields=["label", "task"], name="tasks_tasklabel_label_live"),
+        ]
 
     def __str__(self):
         return self.id
 
 
-class Comment(SoftDeleteModel):
+class Comment(TaskCountedModel):
+    task_counter = "comment_count"
+
     content = models.TextField(_("Content"))
     created_at = models.DateTimeField(_("Created Time"),
                                       auto_now_add=True)
@@ -154,6 +582,12 @@ class Comment(SoftDeleteModel):
                              verbose_name=_("Task"),
                              on_delete=models.CASCADE,
                              related_name="comments")
+    parent = models.ForeignKey("self",
+                               verbose_name=_("Reply to"),
+                               null=True,
+                               blank=True,
+                               on_delete=models.CASCADE,
+                               related_name="replies")
 
     @classmethod
     def create_comment(cls: "Comment", content, user_id, task_id):
@@ -173,17 +607,106 @@ class Comment(SoftDeleteModel):
             setattr(comment, attr, value)
         comment.save()
 
+    @classmethod
+    def discussion(cls, task_id, parent_id=None, top_level=False):
+        """Returns the live comments of a task with their authors joined in, for paging by ``(created_at, id)``.
+
+        Args:
+            task_id (int): The task.
+            parent_id (int): Only the replies to this comment.
+            top_level (bool): Only the comments that are not replies, each
+                with its number of live replies as ``reply_count``.
+        """
+        comments = cls.objects.filter(task_id=task_id).select_related("user")
+        if parent_id is not None:
+            comments = comments.filter(parent_id=parent_id)
+        elif top_level:
+            replies = (cls.objects.filter(parent=OuterRef("pk"))
+                       .order_by()
+                       .values("parent")
+                       .annotate(count=Count("pk"))
+                       .values("count"))
+            comments = comments.filter(parent__isnull=True).annotate(reply_count=Coalesce(Subquery(replies), 0))
+        return comments
+
     class Meta:
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
+        indexes = [
+            LiveIndex(fields=["task", "created_at"], name="tasks_comment_task_time_live"),
+            LiveIndex(fields=["parent", "created_at"], name="tasks_comment_reply_time_live"),
+            LiveIndex(fields=["user"], name="tasks_comment_user_live"),
+        ]
 
     def __str__(self):
         return self.content
 
 
-class Attachment(SoftDeleteModel):
+class AttachmentBlob(models.Model):
+    """A file of the content addressed attachment storage and the number of attachments using it.
+
+    ``ref_count`` counts live, soft deleted and not yet archived attachments.
+    A blob nothing references any more is removed by ``collect_attachment_blobs``.
+    """
+    checksum = models.CharField(_("Checksum"), max_length=64, unique=True)
+    size = models.BigIntegerField(_("Size"))
+    ref_count = models.IntegerField(_("Reference count"), default=0)
+    created_at = models.DateTimeField(_("Created Date"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated Date"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Attachment Blob")
+        verbose_name_plural = _("Attachment Blobs")
+
+    def __str__(self):
+        return self.checksum
+
+    @classmethod
+    def acquire(cls, checksum, size, using=None):
+        """Adds a reference to the blob with ``checksum``, creating its row on first use."""
+        blobs = cls.objects.db_manager(using).filter(checksum=checksum)
+        if not blobs.update(ref_count=F("ref_count") + 1, updated_at=timezone.now()):
+            try:
+                with transaction.atomic(using=using):
+                    return blobs.create(checksum=checksum, size=size, ref_count=1)
+            except IntegrityError:
+                # Created by a concurrent request in the meantime.
+                blobs.update(ref_count=F("ref_count") + 1, updated_at=timezone.now())
+        return blobs.get()
+
+    @classmethod
+    def release(cls, counts, using=None):
+        """Removes ``counts[blob_id]`` references from every blob in ``counts``, in one UPDATE."""
+        counts = {pk: count for pk, count in counts.items() if pk is not None and count}
+        if not counts:
+            return
+        cls.objects.db_manager(using).filter(pk__in=counts).update(
+            ref_count=F("ref_count") - Case(*(When(pk=pk, then=Value(count)) for pk, count in counts.items()),
+                                            default=Value(0)),
+            updated_at=timezone.now(),
+        )
+
+
+class Attachment(TaskCountedModel):
+    """File attached to a task.
+
+    Files are stored once per distinct content in the content addressed
+    ``attachment_storage``; ``blob`` counts the attachments sharing one.
+    """
+    task_counter = "attachment_count"
+
     content = models.FileField(_("Content"),
-                               upload_to="task-attachments")
+                               upload_to="task-attachments",
+                               storage=attachment_storage)
+    name = models.CharField(_("Name"), max_length=255, blank=True)
+    checksum = models.CharField(_("Checksum"), max_length=64, blank=True, editable=False)
+    blob = models.ForeignKey("AttachmentBlob",
+                             verbose_name=_("Blob"),
+                             null=True,
+                             blank=True,
+                             editable=False,
+                             on_delete=models.PROTECT,
+                             related_name="attachments")
     task = models.ForeignKey("Task",
                              verbose_name=_("Task"),
                              on_delete=models.CASCADE,
@@ -205,21 +728,75 @@ class Attachment(SoftDeleteModel):
             setattr(attachment, attr, value)
         attachment.save()
 
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            if self.content and not self.content._committed:
+                self.name = self.name or os.path.basename(self.content.name)
+                self.content.save(self.content.name, self.content.file, save=False)
+            storage = self.content.storage
+            if (self.blob_id is None and isinstance(storage, ContentAddressedStorage)
+                    and storage.is_blob(self.content.name)):
+                self.checksum = storage.checksum(self.content.name)
+                self.blob = AttachmentBlob.acquire(self.checksum, self.content.size, using=using)
+            super().save(*args, **kwargs)
+
+    def activity_data(self):
+        return {"name": self.name}
+
+    @classmethod
+    def on_archive(cls, pks, using):
+        # Archived attachments no longer keep their blob.
+        counts = (cls._base_manager.using(using)
+                  .filter(pk__in=pks, blob__isnull=False)
+                  .order_by()
+                  .values("blob")
+                  .annotate(count=Count("pk"))
+                  .values_list("blob", "count"))
+        AttachmentBlob.release(dict(counts), using=using)
+
     class Meta:
         verbose_name = _("Attachment")
         verbose_name_plural = _("Attachments")
+        indexes = [
+            LiveIndex(fields=["task"], name="tasks_attachment_task_live"),
+        ]
 
     def __str__(self):
         return f"Attachment {self.id}"
 
 
-class WorkTime(SoftDeleteModel):
+def release_attachment_blob(sender, instance, using, **kwargs):
+    """Drops the blob reference of a hard deleted attachment; connected to ``post_delete``."""
+    if instance.blob_id is not None:
+        AttachmentBlob.release({instance.blob_id: 1}, using=using)
+
+
+class OverlappingWorkTime(IntegrityError):
+    """Raised when a work time would overlap another live work time of the same user."""
+
+
+class WorkTime(TaskCountedModel):
+    """Interval of time a user worked on a task; ``end_date`` is None while the timer runs.
+
+    Intervals of the same user may not overlap. On PostgreSQL the
+    ``tasks_worktime_no_overlap`` exclusion constraint rejects them; elsewhere
+    ``save()`` checks the neighbouring intervals through the (user,
+    start_date) index.
+    """
+    task_counter = "tracked_seconds"
+
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField(null=True)
     task = models.ForeignKey("Task",
                              verbose_name=_("Task"),
                              on_delete=models.CASCADE,
                              related_name="work_times")
+    user = models.ForeignKey("accounts.CustomUser",
+                             verbose_name=_("User"),
+                             null=True,
+                             on_delete=models.CASCADE,
+                             related_name="work_times")
 
     @classmethod
     def create_worktime(cls: "WorkTime", start_date, task_id):
@@ -237,13 +814,592 @@ class WorkTime(SoftDeleteModel):
             setattr(worktime, attr, value)
         worktime.save()
 
-    def complete_worktime(self: "WorkTime", enddate):
+    def counter_value(self):
+        if self.end_date is None or self.start_date is None:
+            return 0
+        start_date, end_date = self.start_date, self.end_date
+        if timezone.is_naive(start_date) != timezone.is_naive(end_date):
+            start_date, end_date = (timezone.make_aware(date) if timezone.is_naive(date) else date
+                                    for date in (start_date, end_date))
+        return max(int((end_date - start_date).total_seconds()), 0)
+
+    @classmethod
+    def counter_deltas(cls, queryset):
+        totals = defaultdict(int)
+        closed = queryset.filter(task__isnull=False, end_date__isnull=False).only("task", "start_date", "end_date")
+        for worktime in closed.iterator():
+            totals[worktime.task_id] += worktime.counter_value()
+        return dict(totals)
+
+    def complete_worktime(self: "WorkTime", enddate, user=None):
+        # A work time nobody started is completed by ``user``, who gets its time.
         self.end_date = enddate
+        self.user_id = self.user_id or getattr(user, "pk", None)
         self.save()
 
+    @staticmethod
+    def interval(worktime):
+        """Returns ``(task_id, user_id, start_date, end_date)`` of a live closed work time, None otherwise."""
+        if worktime is None or worktime.is_deleted or worktime.task_id is None or worktime.end_date is None:
+            return None
+        return worktime.task_id, worktime.user_id, worktime.start_date, worktime.end_date
+
+    def on_save(self, old, using):
+        # The rollups follow the closed intervals, the way tracked_seconds does.
+        before, after = self.interval(old), self.interval(self)
+        if before == after:
+            return
+        for interval, sign in ((before, -1), (after, 1)):
+            if interval is not None:
+                WorkTimeRollup.add_interval(*interval, sign=sign, using=using)
+
+    @classmethod
+    def on_soft_delete(cls, queryset, is_deleted):
+        # The closed intervals are read once, for tracked_seconds and for the rollups.
+        sign = -1 if is_deleted else 1
+        counters, rollups = defaultdict(int), defaultdict(int)
+        closed = (queryset.filter(task__isnull=False, end_date__isnull=False)
+                  .only("task", "user", "start_date", "end_date"))
+        for worktime in closed.iterator():
+            counters[worktime.task_id] += sign * worktime.counter_value()
+            for day, seconds in WorkTimeRollup.split(worktime.start_date, worktime.end_date):
+                rollups[worktime.task_id, worktime.user_id, day] += sign * seconds
+        Task.add_to_counter(cls.task_counter, counters, using=queryset.db)
+        for (task_id, user_id, day), seconds in rollups.items():
+            WorkTimeRollup.add(task_id, user_id, day, seconds, using=queryset.db)
+        Activity.record_queryset(queryset, Activity.DELETED if is_deleted else Activity.RESTORED)
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            if connections[using].vendor != "postgresql":
+                self.check_overlap(using)
+            super().save(*args, **kwargs)
+
+    def check_overlap(self, using=None):
+        """Raises OverlappingWorkTime if this interval overlaps another live interval of its user.
+
+        Live intervals of a user never overlap each other, so only the ones
+        right before and right after this one's start need to be looked at.
+        Intervals are half open: one may start exactly when another ends.
+        """
+        if self.user_id is None or self.is_deleted:
+            return
+        start_date = timezone.now() if self._state.adding else self.start_date
+        end_date = self.end_date
+        intervals = (WorkTime.objects.db_manager(using or router.db_for_read(WorkTime))
+                     .filter(user_id=self.user_id)
+                     .exclude(pk=self.pk))
+        previous = intervals.filter(start_date__lte=start_date).order_by("-start_date").first()
+        if previous is not None and (previous.end_date is None or previous.end_date > start_date):
+            raise OverlappingWorkTime(_("This work time overlaps work time %s.") % previous.pk)
+        following = intervals.filter(start_date__gt=start_date).order_by("start_date").first()
+        if following is not None and (end_date is None or following.start_date < end_date):
+            raise OverlappingWorkTime(_("This work time overlaps work time %s.") % following.pk)
+
+    @classmethod
+    def find_overlaps(cls, queryset, batch_size=2000):
+        """Yields ``(user_id, earlier_id, later_id)`` for the overlapping intervals of ``queryset``.
+
+        The intervals are read once, sorted by user and start, keeping only
+        the interval that reaches furthest so far. A later interval that
+        starts before that one ends overlaps it.
+        """
+        intervals = (queryset.filter(user__isnull=False)
+                     .order_by("user", "start_date", "pk")
+                     .values_list("pk", "user", "start_date", "end_date"))
+        user_id = reaching = None
+        for pk, user, start_date, end_date in intervals.iterator(chunk_size=batch_size):
+            if user != user_id:
+                user_id, reaching = user, None
+            elif reaching is not None and (reaching[1] is None or reaching[1] > start_date):
+                yield user, reaching[0], pk
+            if reaching is None or (reaching[1] is not None and (end_date is None or end_date > reaching[1])):
+                reaching = (pk, end_date)
+
+    @classmethod
+    def active(cls, user):
+        """Returns the running timer of ``user``, looked up through the open timer index, or None."""
+        return cls.objects.filter(user=user, end_date__isnull=True).first()
+
+    @classmethod
+    def start(cls, user, task, using=None):
+        """Starts a timer for ``user`` on ``task``, stopping the user's running timer first.
+
+        Raises IntegrityError if a concurrent request started another timer
+        for the user in the meantime.
+        """
+        using = using or router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            cls.stop(user, using=using)
+            return cls.objects.using(using).create(user=user, task=task)
+
+    @classmethod
+    def stop(cls, user, end_date=None, using=None):
+        """Stops the running timer of ``user`` and returns it, or None if there was none.
+
+        The timer is found and closed by a single ``UPDATE ... RETURNING``, so
+        there is no window between reading the open row and closing it.
+        """
+        using = using or router.db_for_write(cls)
+        connection = connections[using]
+        end_date = end_date or timezone.now()
+        quote = connection.ops.quote_name
+        sql = (f"UPDATE {quote(cls._meta.db_table)} SET end_date = %s "
+               f"WHERE user_id = %s AND end_date IS NULL AND NOT is_deleted "
+               f"RETURNING id, task_id, user_id, start_date, end_date")
+        with transaction.atomic(using=using):
+            stopped = list(cls.objects.db_manager(using).raw(
+                sql, [connection.ops.adapt_datetimefield_value(end_date), user.pk]))
+            for worktime in stopped:
+                if worktime.task_id is not None:
+                    Task.add_to_counter(cls.task_counter, {worktime.task_id: worktime.counter_value()}, using=using)
+                    WorkTimeRollup.add_interval(worktime.task_id, worktime.user_id, worktime.start_date,
+                                                worktime.end_date, using=using)
+            Activity.record(stopped, Activity.UPDATED, using=using)
+        return stopped[0] if stopped else None
+
     class Meta:
         verbose_name = _("Work Time")
         verbose_name_plural = _("Work times")
+        indexes = [
+            LiveIndex(fields=["task"], name="tasks_worktime_task_live"),
+            LiveIndex(fields=["user", "start_date"], name="tasks_worktime_user_start_live"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user"], condition=models.Q(end_date__isnull=True, is_deleted=False),
+                                    name="tasks_worktime_one_open_per_user"),
+        ]
 
     def __str__(self):
         return f"task: {self.task}, start time: {self.start_date.strftime('%Y - %m - %d')}"
+
+
+class WorkTimeRollupQuerySet(models.QuerySet):
+
+    def report(self):
+        """Sums the tracked seconds of the rollup rows in total, per user and per day, in three aggregate queries."""
+        rows = self.order_by()
+        return {
+            "total_seconds": rows.aggregate(total=Sum("seconds"))["total"] or 0,
+            "users": list(rows.values("user", username=F("user__username"))
+                          .annotate(seconds=Sum("seconds"))
+                          .order_by("-seconds", "user")),
+            "days": list(rows.values("day").annotate(seconds=Sum("seconds")).order_by("day")),
+        }
+
+
+class WorkTimeRollup(models.Model):
+    """Seconds of closed work time per task, user and day, kept up to date as intervals are closed.
+
+    Reports sum these rows instead of the work times, so their cost depends on
+    the number of task days in the report, not on the number of intervals.
+    """
+    # Rollups never keep a soft deleted task from being archived.
+    task = models.ForeignKey("Task",
+                             verbose_name=_("Task"),
+                             on_delete=models.DO_NOTHING,
+                             db_constraint=False,
+                             related_name="+")
+    user = models.ForeignKey("accounts.CustomUser",
+                             verbose_name=_("User"),
+                             null=True,
+                             on_delete=models.SET_NULL,
+                             related_name="work_time_rollups")
+    day = models.DateField(_("Day"))
+    seconds = models.BigIntegerField(_("Seconds"), default=0)
+
+    objects = WorkTimeRollupQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Work Time Rollup")
+        verbose_name_plural = _("Work Time Rollups")
+        constraints = [
+            models.UniqueConstraint(fields=["task", "user", "day"], name="tasks_worktimerollup_unique"),
+        ]
+
+    def __str__(self):
+        return f"task: {self.task_id}, user: {self.user_id}, day: {self.day}"
+
+    @classmethod
+    def add(cls, task_id, user_id, day, seconds, using=None):
+        """Adds ``seconds`` to the row of ``(task_id, user_id, day)``, creating it if needed.
+
+        Negative ``seconds`` never create a row, and delete it once nothing is left.
+        """
+        rows = cls.objects.using(using).filter(task_id=task_id, user_id=user_id, day=day)
+        if seconds < 0:
+            rows.update(seconds=F("seconds") + seconds)
+            rows.filter(seconds__lte=0).delete()
+            return
+        if rows.update(seconds=F("seconds") + seconds):
+            return
+        try:
+            with transaction.atomic(using=using):
+                cls.objects.using(using).create(task_id=task_id, user_id=user_id, day=day, seconds=seconds)
+        except IntegrityError:
+            # Created by a concurrent request in the meantime.
+            rows.update(seconds=F("seconds") + seconds)
+
+    @classmethod
+    def add_interval(cls, task_id, user_id, start_date, end_date, sign=1, using=None):
+        """Adds a closed work time interval, split at local midnights, to the rollup rows of its days.
+
+        The whole seconds of the interval are distributed so that they add up
+        to what the interval adds to ``Task.tracked_seconds``. ``sign=-1``
+        takes an interval that was deleted or changed back out.
+        """
+        for day, seconds in cls.split(start_date, end_date):
+            cls.add(task_id, user_id, day, sign * seconds, using=using)
+
+    @staticmethod
+    def split(start_date, end_date):
+        """Yields ``(day, seconds)`` of a closed interval for every local day it covers."""
+        remaining = WorkTime(start_date=start_date, end_date=end_date).counter_value()
+        if timezone.is_naive(start_date):
+            start_date = timezone.make_aware(start_date)
+        start = timezone.localtime(start_date)
+        day = start.date()
+        while remaining > 0:
+            midnight = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+            seconds = min(remaining, max(int((midnight - start).total_seconds()), 0))
+            if seconds:
+                yield day, seconds
+            remaining -= seconds
+            start, day = midnight, day + timedelta(days=1)
+
+
+class Activity(models.Model):
+    """Append-only record of a change to a task, or to a comment, attachment, label or work time of a task.
+
+    Every change inserts one row and rows are never updated, so recording
+    takes no locks on the rows being changed. Feeds read the rows newest first
+    through the ``(project, id)`` index. A user's feed is assembled from the
+    feeds of their projects when it is read, instead of copying every row to
+    every member when it is written.
+    """
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    RESTORED = "restored"
+    VERBS = (
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+        (RESTORED, "Restored"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    # Rows outlive archived tasks, so the references have no database constraints.
+    project = models.ForeignKey("projects.Project",
+                                verbose_name=_("Project"),
+                                on_delete=models.DO_NOTHING,
+                                db_constraint=False,
+                                db_index=False,
+                                related_name="+")
+    task = models.ForeignKey("Task",
+                             verbose_name=_("Task"),
+                             null=True,
+                             on_delete=models.DO_NOTHING,
+                             db_constraint=False,
+                             db_index=False,
+                             related_name="+")
+    actor = models.ForeignKey("accounts.CustomUser",
+                              verbose_name=_("Actor"),
+                              null=True,
+                              on_delete=models.SET_NULL,
+                              related_name="activities")
+    verb = models.CharField(_("Verb"), choices=VERBS, max_length=16)
+    target_type = models.CharField(_("Target type"), max_length=32)
+    target_id = models.BigIntegerField(_("Target ID"), null=True)
+    data = models.JSONField(_("Data"), default=dict, blank=True)
+    created_at = models.DateTimeField(_("Created Date"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Activity")
+        verbose_name_plural = _("Activities")
+        indexes = [
+            models.Index(fields=["project", "id"], name="tasks_activity_project_id"),
+        ]
+
+    def __str__(self):
+        return f"{self.target_type} {self.target_id} {self.verb}"
+
+    @classmethod
+    def for_object(cls, obj, verb, actor=None):
+        """Returns the unsaved activity of ``verb`` done to ``obj``, a task or a row belonging to a task.
+
+        The project is taken from the task's sprint when it is loaded already,
+        otherwise it is looked up by a subquery of the INSERT itself.
+        """
+        if isinstance(obj, Task):
+            task_id, task = obj.pk, obj
+        else:
+            task_id, task = obj.task_id, obj.task if type(obj).task.is_cached(obj) else None
+        if task is not None and Task.sprint.is_cached(task):
+            project = task.sprint.project_id
+        elif task is not None:
+            sprints = Task._meta.get_field("sprint").related_model._base_manager
+            project = Subquery(sprints.filter(pk=task.sprint_id).values("project")[:1])
+        else:
+            project = Subquery(Task._base_manager.filter(pk=task_id).values("sprint__project")[:1])
+        return cls(project_id=project, task_id=task_id, actor=actor, verb=verb,
+                   target_type=obj._meta.model_name, target_id=obj.pk, data=obj.activity_data())
+
+    @classmethod
+    def record(cls, objs, verb, using=None, batch_size=500):
+        """Records ``verb`` for every object in ``objs``, with one INSERT per ``batch_size`` objects.
+
+        Rows that do not belong to a task have no project and are skipped.
+        """
+        actor = current_actor()
+        activities = [cls.for_object(obj, verb, actor) for obj in objs
+                      if isinstance(obj, Task) or obj.task_id is not None]
+        cls.objects.using(using).bulk_create(activities, batch_size=batch_size)
+
+    @classmethod
+    def record_queryset(cls, queryset, verb, batch_size=500):
+        """Records ``verb`` for every row of ``queryset``, a queryset of tasks or of rows belonging to tasks.
+
+        The rows and their projects are read ``batch_size`` at a time and
+        recorded with one INSERT per batch.
+        """
+        if queryset.model is Task:
+            task, project = "pk", "sprint__project"
+        else:
+            task, project = "task", "task__sprint__project"
+        rows = (queryset.filter(**{f"{task}__isnull": False})
+                .order_by()
+                .values_list("pk", task, project)
+                .iterator(chunk_size=batch_size))
+        actor = current_actor()
+        target_type = queryset.model._meta.model_name
+        while True:
+            activities = [cls(project_id=project_id, task_id=task_id, actor=actor, verb=verb,
+                              target_type=target_type, target_id=pk)
+                          for pk, task_id, project_id in islice(rows, batch_size)]
+            if not activities:
+                return
+            cls.objects.using(queryset.db).bulk_create(activities)
+
+
+class TaskImport(models.Model):
+    """Progress of a task import file, committed together with every batch it imports.
+
+    An import that fails part way is resumed by running the same file again:
+    its ``checksum`` finds this row and the first ``rows_read`` rows are skipped.
+    """
+    user = models.ForeignKey("accounts.CustomUser",
+                             verbose_name=_("User"),
+                             null=True,
+                             blank=True,
+                             on_delete=models.SET_NULL,
+                             related_name="task_imports")
+    name = models.CharField(_("Name"), max_length=255)
+    checksum = models.CharField(_("Checksum"), max_length=64, db_index=True)
+    rows_read = models.PositiveIntegerField(_("Rows read"), default=0)
+    rows_imported = models.PositiveIntegerField(_("Rows imported"), default=0)
+    rows_failed = models.PositiveIntegerField(_("Rows failed"), default=0)
+    is_finished = models.BooleanField(_("Is finished"), default=False)
+    created_at = models.DateTimeField(_("Created Date"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated Date"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Task Import")
+        verbose_name_plural = _("Task Imports")
+
+    def __str__(self):
+        return self.name
+
+
+class AttachmentUpload(models.Model):
+    """Attachment uploaded in chunks, whose bytes so far are kept in a temporary file.
+
+    ``offset`` is the number of bytes received, so an interrupted upload
+    continues from there. Finalizing the upload creates ``attachment``.
+    """
+    user = models.ForeignKey("accounts.CustomUser",
+                             verbose_name=_("User"),
+                             on_delete=models.CASCADE,
+                             related_name="attachment_uploads")
+    # Uploads never keep a soft deleted task from being archived; clear_attachment_uploads
+    # removes the stale ones with their temporary files.
+    task = models.ForeignKey("Task",
+                             verbose_name=_("Task"),
+                             on_delete=models.DO_NOTHING,
+                             db_constraint=False,
+                             related_name="+")
+    name = models.CharField(_("Name"), max_length=255)
+    size = models.BigIntegerField(_("Size"))
+    offset = models.BigIntegerField(_("Offset"), default=0)
+    checksum = models.CharField(_("Checksum"), max_length=64, blank=True)
+    attachment = models.OneToOneField("Attachment",
+                                      verbose_name=_("Attachment"),
+                                      null=True,
+                                      blank=True,
+                                      on_delete=models.SET_NULL,
+                                      related_name="upload")
+    created_at = models.DateTimeField(_("Created Date"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated Date"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Attachment Upload")
+        verbose_name_plural = _("Attachment Uploads")
+
+    def __str__(self):
+        return self.name
+
+
+class TaskReminder(models.Model):
+    """Reminder of a task's deadline, enqueued for its assignee by the scheduler.
+
+    There is at most one reminder of each kind per task and deadline, so
+    moving the deadline enqueues new ones. Whatever delivers the reminders
+    reads the pending ones in ``id`` order and sets ``sent_at``.
+    """
+    UPCOMING = "upcoming"
+    OVERDUE = "overdue"
+    KINDS = (
+        (UPCOMING, "Upcoming"),
+        (OVERDUE, "Overdue"),
+    )
+
+    # Reminders never keep a soft deleted task from being archived.
+    task = models.ForeignKey("Task",
+                             verbose_name=_("Task"),
+                             on_delete=models.DO_NOTHING,
+                             db_constraint=False,
+                             db_index=False,
+                             related_name="+")
+    user = models.ForeignKey("accounts.CustomUser",
+                             verbose_name=_("User"),
+                             on_delete=models.CASCADE,
+                             related_name="task_reminders")
+    kind = models.CharField(_("Kind"), choices=KINDS, max_length=16)
+    deadline = models.DateTimeField(_("Deadline"))
+    created_at = models.DateTimeField(_("Created Date"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("Sent at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Task Reminder")
+        verbose_name_plural = _("Task Reminders")
+        constraints = [
+            models.UniqueConstraint(fields=["task", "kind", "deadline"], name="tasks_taskreminder_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["id"], condition=models.Q(sent_at__isnull=True), name="tasks_taskreminder_pending"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.task_id}"
+
+
+class DependencyCycle(IntegrityError):
+    """Raised when a link between two tasks would make a task block itself."""
+
+
+class TaskDependency(SoftDeleteModel):
+    """Link of a task blocking another task of the same sprint.
+
+    Links never form a cycle: adding one checks with a single recursive query
+    that the blocked task does not already block the blocker, directly or
+    not.
+    """
+    blocker = models.ForeignKey("Task",
+                                verbose_name=_("Blocker"),
+                                on_delete=models.CASCADE,
+                                related_name="blocking_links")
+    blocked = models.ForeignKey("Task",
+                                verbose_name=_("Blocked"),
+                                on_delete=models.CASCADE,
+                                related_name="blocked_by_links")
+    created_at = models.DateTimeField(_("Created Date"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Task Dependency")
+        verbose_name_plural = _("Task Dependencies")
+        constraints = [
+            # Also the index followed by the cycle check, from blocker to blocked.
+            models.UniqueConstraint(fields=["blocker", "blocked"], condition=models.Q(is_deleted=False),
+                                    name="tasks_taskdep_unique_live"),
+            models.CheckConstraint(check=~models.Q(blocker=F("blocked")), name="tasks_taskdep_not_self"),
+        ]
+        indexes = [
+            LiveIndex(fields=["blocked", "blocker"], name="tasks_taskdep_blocked_live"),
+        ]
+
+    def __str__(self):
+        return f"{self.blocker_id} -> {self.blocked_id}"
+
+    @classmethod
+    def on_soft_delete(cls, queryset, is_deleted):
+        invalidate_critical_paths(queryset.values_list("blocker__sprint", flat=True).distinct(), using=queryset.db)
+
+    @classmethod
+    def link(cls, blocker, blocked, using=None):
+        """Makes ``blocker`` block ``blocked``, two tasks of the same sprint.
+
+        The sprint is locked for the check and the insert, so two links
+        closing a cycle together cannot both be added.
+
+        Raises:
+            DependencyCycle: If ``blocked`` already blocks ``blocker``.
+            IntegrityError: If the link exists already.
+        """
+        using = using or router.db_for_write(cls)
+        sprint_model = Task._meta.get_field("sprint").related_model
+        with transaction.atomic(using=using):
+            sprint_model._base_manager.using(using).select_for_update().filter(pk=blocker.sprint_id).first()
+            if blocker.pk == blocked.pk or cls.reaches(blocked.pk, blocker.pk, using=using):
+                raise DependencyCycle(_("Task %(blocked)s already blocks task %(blocker)s.")
+                                      % {"blocked": blocked.pk, "blocker": blocker.pk})
+            link = cls.objects.using(using).create(blocker=blocker, blocked=blocked)
+            invalidate_critical_paths([blocker.sprint_id], using=using)
+        return link
+
+    @classmethod
+    def reaches(cls, source, target, using=None):
+        """Tells if task ``source`` blocks task ``target``, directly or through other tasks.
+
+        The tasks blocked by ``source`` are followed in the database with a
+        recursive common table expression. ``UNION`` drops the tasks already
+        reached, which bounds the walk.
+        """
+        using = using or router.db_for_read(cls)
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        table = quote(cls._meta.db_table)
+        blocker = quote(cls._meta.get_field("blocker").column)
+        blocked = quote(cls._meta.get_field("blocked").column)
+        is_deleted = quote(cls._meta.get_field("is_deleted").column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH RECURSIVE reached (task) AS ("
+                f" SELECT {blocked} FROM {table} WHERE {blocker} = %s AND {is_deleted} = %s"
+                f" UNION"
+                f" SELECT link.{blocked} FROM {table} link"
+                f" INNER JOIN reached ON link.{blocker} = reached.task WHERE link.{is_deleted} = %s"
+                f") SELECT 1 FROM reached WHERE task = %s LIMIT 1",
+                [source, False, False, target],
+            )
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def critical_path(cls, sprint, using=None):
+        """Returns the longest chain of tasks of ``sprint`` blocking one another, see ``dependencies.critical_path``.
+
+        The sprint's links and the deadlines of their tasks are read with one
+        query.
+        """
+        edges = (cls.objects.using(using)
+                 .filter(blocker__sprint=sprint, blocked__sprint=sprint,
+                         blocker__is_deleted=False, blocked__is_deleted=False)
+                 .values_list("blocker", "blocked", "blocker__deadline", "blocked__deadline"))
+        return critical_path(edges)
+
+
+ArchivedTask = make_archive_model(Task)
+ArchivedComment = make_archive_model(Comment)
+ArchivedAttachment = make_archive_model(Attachment)
+ArchivedWorkTime = make_archive_model(WorkTime)
+ArchivedTaskDependency = make_archive_model(TaskDependency)
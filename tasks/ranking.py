@@ -0,0 +1,78 @@
+"""Lexicographic rank keys, ordering the tasks of a board column.
+
+A key is a string of base 36 digits read as a fraction: ``"i"`` is 18/36,
+``"i9"`` is 18/36 + 9/36². Comparing two keys as strings compares the
+fractions, so there is always room for a key between two others and moving a
+task only rewrites its own key. Keys never end with ``"0"``, which would
+leave no room right before them.
+"""
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def rank_between(before=None, after=None):
+    """Returns a key sorting after ``before`` and before ``after``.
+
+    Either bound may be None, for the ends of the column. Appending at the end
+    or prepending at the start changes the first digit it can, so the keys
+    only get one digit longer every few dozen tasks added at the same end.
+
+    Raises:
+        ValueError: If ``before`` does not sort before ``after``.
+    """
+    before = before or ""
+    if after is not None and before >= after:
+        raise ValueError(f"{before!r} does not sort before {after!r}")
+    if after is None:
+        if not before:
+            return DIGITS[BASE // 2]
+        for index, digit in enumerate(before):
+            if digit != DIGITS[-1]:
+                return before[:index] + DIGITS[DIGITS.index(digit) + 1]
+        return before + DIGITS[1]
+    if not before:
+        for index, digit in enumerate(after):
+            if DIGITS.index(digit) > 1:
+                return after[:index] + DIGITS[DIGITS.index(digit) - 1]
+        # Only 0s and 1s, ending with a 1.
+        return after[:-1] + DIGITS[0] + DIGITS[-1]
+
+    key = ""
+    for index in range(len(before) + len(after) + 1):
+        low = DIGITS.index(before[index]) if index < len(before) else 0
+        high = DIGITS.index(after[index]) if after is not None and index < len(after) else BASE
+        if high - low > 1:
+            return key + DIGITS[(low + high) // 2]
+        key += DIGITS[low]
+        if high - low == 1:
+            # Any longer key starting with ``key`` sorts before ``after``.
+            after = None
+
+
+def ranks_between(before, after, count):
+    """Returns ``count`` ascending keys between ``before`` and ``after``.
+
+    The range is halved around each key, so the keys of a batch only grow
+    with the logarithm of its size.
+    """
+    if count <= 0:
+        return []
+    middle = rank_between(before, after)
+    half = count // 2
+    return ranks_between(before, middle, half) + [middle] + ranks_between(middle, after, count - half - 1)
+
+
+def spread_ranks(count):
+    """Returns ``count`` ascending keys spread evenly over the whole key space, all of the shortest length."""
+    length = 1
+    while BASE ** length <= 2 * count:
+        length += 1
+    step = BASE ** length // (count + 1)
+    keys = []
+    for position in range(1, count + 1):
+        value, digits = position * step, []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
@@ -0,0 +1,170 @@
+import html
+import re
+
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections
+from django.db.models import Q
+
+from projects.models import Sprint
+
+# Private use characters mark the matches in snippets. They survive html.escape()
+# and are replaced by <mark> tags afterwards.
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+
+# Re-created after every migrate: rebuilding tasks_task or tasks_comment, which
+# Django does on SQLite for most column changes, drops their triggers.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_task_search_insert AFTER INSERT ON tasks_task WHEN NOT new.is_deleted BEGIN
+        INSERT INTO tasks_search_index (rowid, title, body, task_id)
+        VALUES (2 * new.id, new.title, new.description, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_task_search_update
+    AFTER UPDATE OF title, description, is_deleted ON tasks_task BEGIN
+        DELETE FROM tasks_search_index WHERE rowid = 2 * old.id;
+        INSERT INTO tasks_search_index (rowid, title, body, task_id)
+        SELECT 2 * new.id, new.title, new.description, new.id WHERE NOT new.is_deleted;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_task_search_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM tasks_search_index WHERE rowid = 2 * old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_comment_search_insert
+    AFTER INSERT ON tasks_comment WHEN NOT new.is_deleted BEGIN
+        INSERT INTO tasks_search_index (rowid, title, body, task_id)
+        VALUES (2 * new.id + 1, '', new.content, new.task_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_comment_search_update
+    AFTER UPDATE OF content, task_id, is_deleted ON tasks_comment BEGIN
+        DELETE FROM tasks_search_index WHERE rowid = 2 * old.id + 1;
+        INSERT INTO tasks_search_index (rowid, title, body, task_id)
+        SELECT 2 * new.id + 1, '', new.content, new.task_id WHERE NOT new.is_deleted;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_comment_search_delete AFTER DELETE ON tasks_comment BEGIN
+        DELETE FROM tasks_search_index WHERE rowid = 2 * old.id + 1;
+    END
+    """,
+]
+
+
+def ensure_search_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Installs the triggers that keep the SQLite search index in sync, if they are missing."""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or "tasks_search_index" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in SQLITE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def highlight(snippet):
+    """Escapes a snippet and turns its match markers into ``<mark>`` tags."""
+    return html.escape(snippet or "").replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+class PostgresSearch:
+    """Ranks the ``search_vector`` columns of tasks and comments, both behind a GIN index over live rows.
+
+    Each table contributes its best ``limit`` hits. ``ts_headline`` is only
+    computed for the final ``limit`` rows, since it re-parses the text.
+    """
+    sql = """
+        WITH query AS (SELECT websearch_to_tsquery('simple', %s) AS q),
+        hits AS (
+            (SELECT 'task' AS type, t.id, t.id AS task_id, ts_rank(t.search_vector, query.q) AS rank
+             FROM tasks_task t, query
+             WHERE t.search_vector @@ query.q AND NOT t.is_deleted AND t.sprint_id IN ({sprints})
+             ORDER BY rank DESC LIMIT %s)
+            UNION ALL
+            (SELECT 'comment' AS type, c.id, c.task_id, ts_rank(c.search_vector, query.q) AS rank
+             FROM tasks_comment c JOIN tasks_task t ON t.id = c.task_id, query
+             WHERE c.search_vector @@ query.q AND NOT c.is_deleted AND NOT t.is_deleted AND t.sprint_id IN ({sprints})
+             ORDER BY rank DESC LIMIT %s)
+        )
+        SELECT hits.type, hits.id, hits.task_id, hits.rank,
+               ts_headline('simple',
+                           CASE WHEN hits.type = 'task' THEN t.title || ' ' || t.description ELSE c.content END,
+                           query.q, %s)
+        FROM (SELECT * FROM hits ORDER BY rank DESC LIMIT %s) hits
+        CROSS JOIN query
+        LEFT JOIN tasks_task t ON hits.type = 'task' AND t.id = hits.id
+        LEFT JOIN tasks_comment c ON hits.type = 'comment' AND c.id = hits.id
+        ORDER BY hits.rank DESC, hits.id
+    """
+    headline_options = f"StartSel={MARK_START}, StopSel={MARK_STOP}, MaxWords=24, MinWords=8, MaxFragments=2"
+
+    def params(self, text, sprints, limit):
+        sprints_sql, sprints_params = sprints
+        sql = self.sql.format(sprints=sprints_sql)
+        return sql, [text, *sprints_params, limit, *sprints_params, limit, self.headline_options, limit]
+
+
+class SQLiteSearch:
+    """Ranks the FTS5 ``tasks_search_index`` table, which triggers keep in sync with live tasks and comments.
+
+    Task titles weigh four times as much as bodies in the ``bm25`` rank. The
+    ``CROSS JOIN`` keeps SQLite from reordering the join: the full-text match
+    drives it and every hit looks its task up by primary key.
+    """
+    sql = """
+        SELECT CASE WHEN s.rowid %% 2 = 0 THEN 'task' ELSE 'comment' END, s.rowid / 2, s.task_id,
+               -bm25(tasks_search_index, 4.0, 1.0) AS rank,
+               snippet(tasks_search_index, -1, %s, %s, '…', 16)
+        FROM tasks_search_index s
+        CROSS JOIN tasks_task t ON t.id = s.task_id
+        WHERE tasks_search_index MATCH %s AND NOT t.is_deleted AND t.sprint_id IN ({sprints})
+        ORDER BY bm25(tasks_search_index, 4.0, 1.0), s.rowid
+        LIMIT %s
+    """
+
+    def params(self, text, sprints, limit):
+        sprints_sql, sprints_params = sprints
+        # Every word is quoted, so the input can never be read as FTS5 query syntax.
+        match = " ".join('"%s"' % word for word in re.findall(r"\w+", text))
+        return self.sql.format(sprints=sprints_sql), [MARK_START, MARK_STOP, match, *sprints_params, limit]
+
+
+BACKENDS = {
+    "postgresql": PostgresSearch,
+    "sqlite": SQLiteSearch,
+}
+
+
+def search(user, text, limit=20, using=DEFAULT_DB_ALIAS):
+    """Finds the tasks and comments of the user's teams that best match ``text``.
+
+    Args:
+        user (CustomUser): Only tasks of sprints in teams the user owns or is a member of are searched.
+        text (str): The search words.
+        limit (int): Maximum number of hits.
+        using (str): Database alias to search.
+
+    Returns:
+        list: Hits from best to worst, as dicts with ``type`` (``task`` or
+        ``comment``), ``id``, ``task``, ``rank`` and an HTML ``snippet``.
+    """
+    connection = connections[using]
+    if connection.vendor not in BACKENDS:
+        raise NotSupportedError(f"Search is not supported on {connection.vendor}.")
+    if not re.search(r"\w", text):
+        return []
+    sprints = (Sprint.objects.using(using)
+               .filter(Q(project__team__owner=user) | Q(project__team__members=user))
+               .values("pk")
+               .query.sql_with_params())
+    sql, params = BACKENDS[connection.vendor]().params(text, sprints, limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {"type": kind, "id": pk, "task": task_id, "rank": rank, "snippet": highlight(snippet)}
+        for kind, pk, task_id, rank, snippet in rows
+    ]
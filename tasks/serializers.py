@@ -1,11 +1,189 @@
+from django.conf import settings
+from django.utils.translation import gettext as _
 from rest_framework import serializers
-from .models import Task, Label, TaskLabel, Comment, Attachment, WorkTime
+
+from accounts.models import CustomUser
+from core.serializers import BatchPrimaryKeyRelatedField, BulkListSerializer
+from .dependencies import invalidate_critical_paths
+from .importer import guess_format
+from .models import Activity, Task, TaskDependency, Label, TaskLabel, Comment, Attachment, AttachmentUpload, WorkTime
 
 
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ['title', 'created_at', 'description', 'sprint', 'user', 'status']
+        fields = ['id', 'title', 'created_at', 'description', 'sprint', 'user', 'status', 'deadline', 'is_overdue',
+                  'comment_count', 'attachment_count', 'label_count', 'tracked_seconds', 'version', 'updated_at']
+
+
+class TaskBulkListSerializer(BulkListSerializer):
+
+    def create_tasks(self, batch_size):
+        """Inserts the valid items with ``bulk_create``, at the end of their board columns.
+
+        Returns:
+            list: ``(index, task)`` pairs of the created tasks.
+        """
+        tasks = [Task(**attrs) for index, attrs in self.validated_data]
+        Task.append_ranks(tasks)
+        Task.objects.bulk_create(tasks, batch_size=batch_size)
+        Activity.record(tasks, Activity.CREATED, batch_size=batch_size)
+        return [(index, task) for (index, attrs), task in zip(self.validated_data, tasks)]
+
+    def update_tasks(self, batch_size):
+        """Applies the valid items to their tasks with one ``bulk_update``.
+
+        The tasks are loaded with one query from the sprints of the context,
+        other ids are reported in ``item_errors``. Tasks changing column go
+        to the end of it.
+
+        Returns:
+            list: ``(index, task)`` pairs of the updated tasks.
+        """
+        tasks = (Task.objects.filter(sprint__in=self.context['sprints'].values('pk'))
+                 .in_bulk([attrs['id'] for index, attrs in self.validated_data]))
+        updated = []
+        fields = set()
+        sprints = set()
+        for index, attrs in self.validated_data:
+            attrs = dict(attrs)
+            task = tasks.get(attrs.pop('id'))
+            if task is None:
+                self.item_errors[index] = {'id': [_('Task not found.')]}
+                continue
+            if 'deadline' in attrs:
+                attrs['is_overdue'] = False
+            column = (task.sprint_id, task.status)
+            if 'deadline' in attrs or 'sprint' in attrs:
+                sprints.add(task.sprint_id)
+            for attr, value in attrs.items():
+                setattr(task, attr, value)
+            if 'deadline' in attrs or 'sprint' in attrs:
+                sprints.add(task.sprint_id)
+            if (task.sprint_id, task.status) != column:
+                task.rank = ''
+                fields.add('rank')
+            for field, value in Task.bump().items():
+                setattr(task, field, value)
+            fields.update(attrs)
+            updated.append((index, task))
+        if 'rank' in fields:
+            Task.append_ranks([task for index, task in updated])
+        if fields:
+            Task.objects.bulk_update([task for index, task in updated], [*fields, 'version', 'updated_at'],
+                                     batch_size=batch_size)
+            invalidate_critical_paths(sprints)
+            Activity.record([task for index, task in updated], Activity.UPDATED, batch_size=batch_size)
+        return updated
+
+
+class ContextSprintField(BatchPrimaryKeyRelatedField):
+    """Sprint picked among the ``sprints`` of the serializer context, e.g. those of the caller's teams."""
+
+    def get_queryset(self):
+        return self.context['sprints']
+
+
+class TaskBulkSerializer(TaskSerializer):
+    id = serializers.IntegerField(required=False)
+    sprint = ContextSprintField()
+    user = BatchPrimaryKeyRelatedField(queryset=CustomUser.objects.all(), allow_null=True, required=False)
+
+    class Meta(TaskSerializer.Meta):
+        list_serializer_class = TaskBulkListSerializer
+
+    def validate(self, attrs):
+        if self.partial and 'id' not in attrs:
+            raise serializers.ValidationError({'id': [_('This field is required.')]})
+        if not self.partial:
+            attrs.pop('id', None)
+        return attrs
+
+
+class TaskBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False,
+                                max_length=settings.TASKS_BULK_MAX_ITEMS)
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Task.CHOICES)
+    after = serializers.IntegerField(required=False, allow_null=True,
+                                     help_text='The task right above the moved one, none at the top of the column.')
+    before = serializers.IntegerField(required=False, allow_null=True,
+                                      help_text='The task right below the moved one, none at the bottom of the column.')
+
+
+class ContextTaskField(serializers.PrimaryKeyRelatedField):
+    """Task picked among the ``tasks`` of the serializer context, e.g. those of the caller's teams."""
+
+    def get_queryset(self):
+        return self.context['tasks']
+
+
+class TaskDependencySerializer(serializers.ModelSerializer):
+    blocker = ContextTaskField()
+    blocked = ContextTaskField()
+
+    class Meta:
+        model = TaskDependency
+        fields = ['id', 'blocker', 'blocked', 'created_at']
+
+    def validate(self, attrs):
+        if attrs['blocker'].sprint_id != attrs['blocked'].sprint_id:
+            raise serializers.ValidationError(_('Only tasks of the same sprint can block each other.'))
+        return attrs
+
+
+class TaskFilterSerializer(serializers.Serializer):
+    sprint = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Task.CHOICES, required=False)
+    user = serializers.IntegerField(required=False)
+    label = serializers.IntegerField(required=False)
+    deadline_after = serializers.DateTimeField(required=False)
+    deadline_before = serializers.DateTimeField(required=False)
+    labels = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=50)
+    match = serializers.ChoiceField(choices=('all', 'any'), required=False)
+
+
+class TaskLabelBulkSerializer(serializers.Serializer):
+    """Tasks among the ``tasks`` of the context, e.g. those of the caller's teams, and labels to link them with."""
+    tasks = serializers.ListField(child=serializers.IntegerField(), allow_empty=False,
+                                  max_length=settings.TASKS_BULK_MAX_ITEMS)
+    labels = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+
+    def validate_tasks(self, value):
+        return self.existing(self.context['tasks'], value)
+
+    def validate_labels(self, value):
+        return self.existing(Label.objects.all(), value)
+
+    def existing(self, queryset, ids):
+        ids = list(dict.fromkeys(ids))
+        found = set(queryset.filter(pk__in=ids).values_list('pk', flat=True))
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            raise serializers.ValidationError(_('Unknown ids: %s.') % ', '.join(map(str, missing)))
+        return ids
+
+
+class TaskLabelAttachSerializer(serializers.Serializer):
+    labels = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+
+
+class TaskImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    input = serializers.ChoiceField(choices=("csv", "ndjson"), required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("input", guess_format(attrs["file"].name))
+        if attrs["input"] is None:
+            raise serializers.ValidationError({"input": [_("Cannot tell the format of the file.")]})
+        return attrs
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=20)
 
 
 class LabelSerializer(serializers.ModelSerializer):
@@ -23,16 +201,63 @@ class TaskLabelSerializer(serializers.ModelSerializer):
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
-        fields = ['content', 'created_at', 'user', 'task']
+        fields = ['id', 'content', 'created_at', 'user', 'task', 'parent']
+
+    def validate(self, attrs):
+        parent = attrs.get('parent')
+        if parent is not None and parent.task_id != attrs['task'].pk:
+            raise serializers.ValidationError({'parent': 'Replies must be on the same task.'})
+        return attrs
+
+
+class DiscussionCommentSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    reply_count = serializers.IntegerField(read_only=True, required=False)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'content', 'created_at', 'user', 'username', 'parent', 'reply_count']
+
+
+class DiscussionQuerySerializer(serializers.Serializer):
+    parent = serializers.IntegerField(required=False)
+    threaded = serializers.BooleanField(default=False)
 
 
 class AttachmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attachment
-        fields = ['content', 'task']
+        fields = ['id', 'content', 'checksum', 'task']
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    checksum = serializers.RegexField(r'^[0-9a-f]{64}$', required=False, allow_blank=True,
+                                      help_text='Hex sha256 of the whole file, checked when the upload is finalized.')
+
+    class Meta:
+        model = AttachmentUpload
+        fields = ['id', 'task', 'name', 'size', 'offset', 'checksum', 'attachment']
+        read_only_fields = ['offset', 'attachment']
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.TASKS_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Must be between 1 and {settings.TASKS_UPLOAD_MAX_SIZE} bytes.')
+        return value
 
 
 class WorkTimeSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkTime
-        fields = ['start_date', 'end_date', 'task']
+        fields = ['id', 'start_date', 'end_date', 'task', 'user']
+        read_only_fields = ['end_date', 'user']
+
+
+class ActivitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Activity
+        fields = ['id', 'project', 'task', 'actor', 'verb', 'target_type', 'target_id', 'data', 'created_at']
+
+
+class ActivityQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(required=False, min_value=0,
+                                     help_text='Only the activities after this id, for polling.')
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that keeps every distinct file once, named after the sha256 of its content.
+
+    Files are stored as ``blobs/ab/cd/abcd...``, so no directory holds more
+    than a few entries however many files there are. The name a file is saved
+    under is ignored: saving content that is already stored writes nothing
+    and returns the existing name. Since blobs are shared, ``delete()`` leaves
+    them alone; ``purge()`` removes one for good, which the
+    ``collect_attachment_blobs`` command does once nothing references it.
+    """
+    prefix = "blobs"
+
+    def blob_name(self, checksum):
+        return posixpath.join(self.prefix, checksum[:2], checksum[2:4], checksum)
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(self.prefix + "/")
+
+    @staticmethod
+    def checksum(name):
+        """Returns the sha256 of the blob stored under ``name``."""
+        return posixpath.basename(name)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        # The content is hashed while it is written to a temporary file next
+        # to the blobs, which is then renamed into place, so it is read once.
+        directory = self.path(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            name = self.blob_name(digest.hexdigest())
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(temp)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp, self.file_permissions_mode)
+                os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return name
+
+    def delete(self, name):
+        """Does nothing, the blob may be shared. See ``purge()``."""
+
+    def purge(self, name):
+        """Removes the blob stored under ``name``."""
+        super().delete(name)
+
+
+attachment_storage = ContentAddressedStorage()
@@ -1,8 +1,39 @@
+import hashlib
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-from accounts.models import CustomUser
-from projects.models import Sprint
-from .models import Task, Label, TaskLabel, WorkTime, Comment, Attachment
+from accounts.models import CustomUser, Team
+from core.pagination import encode_cursor, keyset_after
+from projects.models import Project, Sprint, WorkSpace
+from .importer import TaskImporter
+from .ranking import rank_between, ranks_between, spread_ranks
+from .models import (
+    Activity,
+    Task,
+    Label,
+    TaskLabel,
+    TaskImport,
+    TaskReminder,
+    TaskDependency,
+    WorkTime,
+    WorkTimeRollup,
+    OverlappingWorkTime,
+    Comment,
+    Attachment,
+    AttachmentBlob,
+)
 
 
 class TaskTestCase(TestCase):
@@ -77,9 +108,7 @@ class LabelTestCase(TestCase):
         TaskLabel.create_task_label(label_id=label.id, task_id=task1.id)
         TaskLabel.create_task_label(label_id=label.id, task_id=task2.id)
         tasks = label.all_tasks()
-        self.assertEqual(len(tasks), 2)
-        self.assertIn({'task': task1.id}, tasks)
-        self.assertIn({'task': task2.id}, tasks)
+        self.assertCountEqual(tasks, [task1, task2])
 
     def tearDown(self) -> None:
         pass
@@ -203,3 +232,1285 @@ class WorkTimeTestCase(TestCase):
 
     def tearDown(self) -> None:
         pass
+
+
+class TaskListTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='lister', email='lister@example.com')
+        team = Team.objects.create(name='List Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.other_sprint = Sprint.objects.create(project=project)
+        self.label = Label.objects.create(name='bug')
+        self.tasks = [Task.objects.create(title=f'Task {i}', description='Task', sprint=self.sprint,
+                                          status='ToDo' if i % 2 else 'Done', user=self.user,
+                                          deadline=timezone.now() + timedelta(days=i))
+                      for i in range(7)]
+        Task.objects.create(title='Elsewhere', description='Task', sprint=self.other_sprint, status='ToDo')
+        TaskLabel.objects.create(task=self.tasks[1], label=self.label)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_filters(self):
+        url = reverse('task-list')
+        ids = lambda response: [task['id'] for task in response.data['results']]
+        self.assertEqual(ids(self.client.get(url, {'sprint': self.sprint.id})), [task.id for task in self.tasks])
+        self.assertEqual(ids(self.client.get(url, {'sprint': self.sprint.id, 'status': 'ToDo'})),
+                         [task.id for task in self.tasks[1::2]])
+        self.assertEqual(ids(self.client.get(url, {'label': self.label.id})), [self.tasks[1].id])
+        self.assertEqual(ids(self.client.get(url, {'deadline_after': self.tasks[5].deadline.isoformat()})),
+                         [task.id for task in self.tasks[5:]])
+        self.assertEqual(self.client.get(url, {'status': 'Nope'}).status_code, 400)
+
+    def test_lists_only_tasks_of_the_users_teams(self):
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        team = Team.objects.create(name='Other Team', owner=outsider, description='Team')
+        workspace = WorkSpace.objects.create(title='Other', team=team)
+        project = Project.objects.create(title='Other', description='Project', workspace=workspace, team=team)
+        foreign = Task.objects.create(title='Foreign', description='Task', sprint=Sprint.objects.create(project=project))
+
+        ids = [task['id'] for task in self.client.get(reverse('task-list'), {'page_size': 50}).data['results']]
+        self.assertNotIn(foreign.id, ids)
+        self.assertEqual(len(ids), len(self.tasks) + 1)
+        self.client.force_authenticate(outsider)
+        ids = [task['id'] for task in self.client.get(reverse('task-list')).data['results']]
+        self.assertEqual(ids, [foreign.id])
+
+    def test_keyset_pages(self):
+        url = reverse('task-list')
+        seen = []
+        response = self.client.get(url, {'sprint': self.sprint.id, 'page_size': 3})
+        while True:
+            seen += [task['id'] for task in response.data['results']]
+            if response.data['next'] is None:
+                break
+            self.assertNotIn('offset', response.data['next'])
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, [task.id for task in self.tasks])
+
+    def test_tampered_cursor_is_rejected(self):
+        url = reverse('task-list')
+        for cursor in ('not base64!', encode_cursor('notadate', 1), encode_cursor(None, 1),
+                       encode_cursor(self.tasks[0].created_at, 'x'), encode_cursor(1)):
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 400)
+
+    def test_page_query_has_no_offset(self):
+        sprint_tasks = Task.objects.filter_by(sprint=self.sprint).order_by(*Task.ORDERING)
+        last = sprint_tasks.values_list(*Task.ORDERING)[2]
+        with CaptureQueriesContext(connection) as queries:
+            page = list(sprint_tasks.filter(keyset_after(Task.ORDERING, last))[:3])
+        self.assertEqual(page, self.tasks[3:6])
+        self.assertNotIn('OFFSET', queries[0]['sql'])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_task_list', tasks=30, page_size=5, pages=[1, 4], repeat=1, stdout=out)
+        self.assertIn('page 4: 5 rows', out.getvalue())
+        self.assertEqual(Task.objects.count(), 8)
+
+
+class TaskBulkTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='bulk', email='bulk@example.com')
+        team = Team.objects.create(name='Bulk Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-bulk')
+
+    def payload(self, count):
+        return [{'title': f'Task {i}', 'description': 'Bulk', 'sprint': self.sprint.id, 'user': self.user.id,
+                 'status': 'ToDo'} for i in range(count)]
+
+    def test_create_reports_per_item_results(self):
+        payload = self.payload(3)
+        payload[1]['sprint'] = 999999
+        payload[2]['status'] = 'Nope'
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'error', 'error'])
+        self.assertIn('sprint', response.data['results'][1]['errors'])
+        self.assertEqual(Task.objects.get(pk=response.data['results'][0]['id']).title, 'Task 0')
+
+    def test_create_query_count_does_not_depend_on_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.post(self.url, self.payload(2), format='json').status_code, 201)
+        # Counted right away: the next request resets the connection's query log.
+        small = len(small)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.client.post(self.url, self.payload(40), format='json').status_code, 201)
+        self.assertEqual(small, len(large))
+        self.assertEqual(Task.objects.filter(sprint=self.sprint).count(), 42)
+
+    def test_update(self):
+        tasks = [Task.objects.create(title=f'Task {i}', description='Bulk', sprint=self.sprint, status='ToDo')
+                 for i in range(3)]
+        payload = [{'id': task.id, 'status': 'Done'} for task in tasks] + [{'id': 999999, 'status': 'Done'},
+                                                                            {'status': 'Done'}]
+
+        response = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['updated'] * 3 + ['error'] * 2)
+        self.assertEqual(Task.objects.filter(sprint=self.sprint, status='Done').count(), 3)
+        self.assertEqual(Task.objects.get(pk=tasks[0].id).title, 'Task 0')
+
+    def test_delete(self):
+        tasks = [Task.objects.create(title=f'Task {i}', description='Bulk', sprint=self.sprint, status='ToDo')
+                 for i in range(3)]
+
+        response = self.client.delete(self.url, {'ids': [tasks[0].id, tasks[1].id]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Task.objects.filter(sprint=self.sprint)), [tasks[2]])
+        self.assertEqual(Task.objects.dead().count(), 2)
+
+    def test_tasks_and_sprints_of_other_teams_are_item_errors(self):
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        team = Team.objects.create(name='Other Team', owner=outsider, description='Team')
+        workspace = WorkSpace.objects.create(title='Other', team=team)
+        project = Project.objects.create(title='Other', description='Project', workspace=workspace, team=team)
+        foreign_sprint = Sprint.objects.create(project=project)
+        foreign = Task.objects.create(title='Foreign', description='Task', sprint=foreign_sprint, status='ToDo')
+        own = Task.objects.create(title='Own', description='Task', sprint=self.sprint, status='ToDo')
+
+        payload = self.payload(2)
+        payload[1]['sprint'] = foreign_sprint.id
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'error'])
+        self.assertIn('sprint', response.data['results'][1]['errors'])
+        self.assertFalse(Task.objects.filter(sprint=foreign_sprint).exclude(pk=foreign.pk).exists())
+
+        response = self.client.patch(self.url, [{'id': foreign.id, 'status': 'Done'},
+                                                {'id': own.id, 'sprint': foreign_sprint.id}], format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], ['error', 'error'])
+        self.assertEqual(Task.objects.get(pk=foreign.pk).status, 'ToDo')
+        self.assertEqual(Task.objects.get(pk=own.pk).sprint, self.sprint)
+
+        response = self.client.delete(self.url, {'ids': [foreign.id, own.id]}, format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], ['error', 'deleted'])
+        self.assertTrue(Task.objects.filter(pk=foreign.pk).exists())
+
+
+class TaskImportTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='importer', email='importer@example.com')
+        team = Team.objects.create(name='Import Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.label = Label.objects.create(name='bug')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-import')
+
+    def csv_file(self, rows, name='tasks.csv'):
+        lines = ['title,description,status,sprint,user,labels,created_at,deadline']
+        lines += [','.join(row) for row in rows]
+        return SimpleUploadedFile(name, '\n'.join(lines).encode(), content_type='text/csv')
+
+    @skipUnless(connection.vendor == 'postgresql', 'Tasks are only copied on PostgreSQL.')
+    def test_copied_tasks_get_their_update_date(self):
+        upload = self.csv_file([
+            ['One', 'First', 'Doing', str(self.sprint.id), 'importer', 'bug', '2020-01-02T03:04:05Z', ''],
+            ['Two', 'Second', '', str(self.sprint.id), '', '', '', ''],
+        ])
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.data['rows_imported'], 2)
+        one, two = Task.objects.filter(sprint=self.sprint).order_by('title')
+        self.assertEqual(one.created_at.isoformat(), '2020-01-02T03:04:05+00:00')
+        self.assertIsNotNone(two.created_at)
+        self.assertTrue(all(task.updated_at is not None and task.version == 1 for task in (one, two)))
+        self.assertEqual(TaskLabel.objects.get(task=one).label, self.label)
+
+    def test_imports_csv_with_lookups(self):
+        upload = self.csv_file([
+            ['One', 'First', 'Doing', str(self.sprint.id), 'importer', 'bug;new', '2020-01-02T03:04:05Z', ''],
+            ['Two', 'Second', '', str(self.sprint.id), str(self.user.id), '', '', '2030-01-01T00:00:00Z'],
+        ])
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rows_imported'], 2)
+        one = Task.objects.get(title='One')
+        self.assertEqual((one.status, one.user, one.sprint), ('Doing', self.user, self.sprint))
+        self.assertEqual(one.created_at.year, 2020)
+        self.assertEqual(sorted(one.labels.values_list('label__name', flat=True)), ['bug', 'new'])
+        self.assertEqual(one.label_count, 2)
+        self.assertEqual(Task.objects.get(title='Two').status, 'ToDo')
+
+    def test_reports_invalid_rows(self):
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        other_team = Team.objects.create(name='Other Team', owner=outsider, description='Team')
+        other_workspace = WorkSpace.objects.create(title='Other', team=other_team)
+        other = Sprint.objects.create(project=Project.objects.create(title='Other', description='Other',
+                                                                     workspace=other_workspace, team=other_team))
+        upload = self.csv_file([
+            ['Good', '', 'ToDo', str(self.sprint.id), '', '', '', ''],
+            ['Foreign', '', 'ToDo', str(other.id), '', '', '', ''],
+            ['', '', 'Unknown', str(self.sprint.id), 'nobody', '', 'yesterday', ''],
+        ])
+
+        data = self.client.post(self.url, {'file': upload}, format='multipart').data
+
+        self.assertEqual((data['rows_imported'], data['rows_failed']), (1, 2))
+        self.assertEqual(data['errors'][0], {'line': 3, 'errors': {'sprint': ['Unknown sprint.']}})
+        self.assertEqual(sorted(data['errors'][1]['errors']), ['created_at', 'status', 'title', 'user'])
+
+    def test_imports_project_export(self):
+        Task.objects.create(title='Exported', description='', sprint=self.sprint, status='Done')
+        export = StringIO()
+        call_command('export_project', self.sprint.project.id, stdout=export)
+        Task.objects.all().delete()
+
+        upload = SimpleUploadedFile('project.ndjson', export.getvalue().encode())
+        data = self.client.post(self.url, {'file': upload}, format='multipart').data
+
+        self.assertEqual(data['rows_imported'], 1)
+        self.assertEqual(Task.objects.get().status, 'Done')
+
+    def test_resumes_after_last_committed_batch(self):
+        rows = [[f'Task {i}', '', 'ToDo', str(self.sprint.id), '', '', '', ''] for i in range(5)]
+        with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+            file.write(self.csv_file(rows).read())
+            file.flush()
+            insert = TaskImporter.insert
+            calls = []
+
+            def failing_insert(importer, batch):
+                calls.append(batch)
+                if len(calls) == 2:
+                    raise DatabaseError('connection lost')
+                insert(importer, batch)
+
+            with mock.patch.object(TaskImporter, 'insert', failing_insert):
+                with self.assertRaises(DatabaseError):
+                    call_command('import_tasks', file.name, '--batch-size', '2', stdout=StringIO())
+            self.assertEqual(TaskImport.objects.get().rows_read, 2)
+
+            out = StringIO()
+            call_command('import_tasks', file.name, '--batch-size', '2', stdout=out)
+            self.assertIn('Resuming after row 2', out.getvalue())
+            self.assertIn('rows/s', out.getvalue())
+            self.assertEqual(list(Task.objects.order_by('id').values_list('title', flat=True)),
+                             [f'Task {i}' for i in range(5)])
+
+            call_command('import_tasks', file.name, stdout=StringIO())
+            self.assertEqual(Task.objects.count(), 5)
+
+
+class TaskCounterTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='counter', email='counter@example.com')
+        team = Team.objects.create(name='Counter Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=self.sprint, status='ToDo')
+
+    def counters(self):
+        task = Task.objects.with_deleted().get(pk=self.task.pk)
+        return task.comment_count, task.attachment_count, task.label_count, task.tracked_seconds
+
+    def test_create_soft_delete_and_restore(self):
+        comment = Comment.objects.create(content='Comment', user=self.user, task=self.task)
+        Comment.objects.create(content='Other', user=self.user, task=self.task)
+        Attachment.objects.create(content='file.txt', task=self.task)
+        task_label = TaskLabel.objects.create(task=self.task, label=Label.objects.create(name='bug'))
+        self.assertEqual(self.counters(), (2, 1, 1, 0))
+
+        comment.delete()
+        task_label.soft_delete()
+        self.assertEqual(self.counters(), (1, 1, 0, 0))
+
+        comment.restore()
+        self.assertEqual(self.counters(), (2, 1, 0, 0))
+
+    def test_tracked_seconds(self):
+        worktime = WorkTime.objects.create(task=self.task)
+        self.assertEqual(self.counters()[3], 0)
+
+        worktime.complete_worktime(worktime.start_date + timedelta(minutes=90))
+        self.assertEqual(self.counters()[3], 5400)
+
+        worktime.end_date = worktime.start_date + timedelta(minutes=30)
+        worktime.save()
+        self.assertEqual(self.counters()[3], 1800)
+
+        WorkTime.objects.filter(pk=worktime.pk).soft_delete()
+        self.assertEqual(self.counters()[3], 0)
+
+    def test_cascades_are_counted(self):
+        Comment.objects.create(content='Comment', user=self.user, task=self.task)
+        other = CustomUser.objects.create(username='other', email='other@example.com')
+        Comment.objects.create(content='Other', user=other, task=self.task)
+
+        other.delete()
+        self.assertEqual(self.counters()[0], 1)
+
+        self.sprint.delete()
+        self.assertEqual(self.counters()[0], 0)
+        self.sprint.restore()
+        self.assertEqual(self.counters()[0], 1)
+
+    def test_repair_command(self):
+        Comment.objects.create(content='Comment', user=self.user, task=self.task)
+        worktime = WorkTime.objects.create(task=self.task)
+        WorkTime.objects.filter(pk=worktime.pk).update(end_date=worktime.start_date + timedelta(seconds=42))
+        Task.objects.filter(pk=self.task.pk).update(comment_count=7)
+
+        out = StringIO()
+        call_command('repair_task_counters', '--batch-size', '1', stdout=out)
+
+        self.assertIn('Repaired the counters of 1 tasks', out.getvalue())
+        self.assertEqual(self.counters(), (1, 0, 0, 42))
+
+
+class WorkTimeRollupTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='rollup', email='rollup@example.com')
+        team = Team.objects.create(name='Rollup Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_complete_view_adds_to_rollup(self):
+        worktime = WorkTime.objects.create(task=self.task)
+        WorkTime.objects.filter(pk=worktime.pk).update(start_date=timezone.now() - timedelta(minutes=5))
+        url = reverse('worktime-complete', kwargs={'worktime_id': worktime.pk})
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data['end_date'])
+        rollup = WorkTimeRollup.objects.get()
+        self.assertEqual((rollup.task, rollup.user), (self.task, self.user))
+        self.assertEqual(rollup.seconds, Task.objects.get(pk=self.task.pk).tracked_seconds)
+        self.assertEqual(self.client.post(url).status_code, 400)
+
+    def test_deleting_and_editing_work_times_updates_the_report(self):
+        start = timezone.now() - timedelta(hours=2)
+        worktime = WorkTime.objects.create(task=self.task, user=self.user)
+        WorkTime.objects.filter(pk=worktime.pk).update(start_date=start)
+        worktime.refresh_from_db()
+        worktime.complete_worktime(start + timedelta(hours=1))
+        report = lambda: WorkTimeRollup.objects.filter(task__sprint=self.task.sprint).report()['total_seconds']
+        self.assertEqual(report(), 3600)
+
+        worktime.end_date = start + timedelta(minutes=30)
+        worktime.save()
+        self.assertEqual(report(), 1800)
+
+        WorkTime.objects.filter(pk=worktime.pk).delete()
+        self.assertEqual(report(), 0)
+        self.assertFalse(WorkTimeRollup.objects.exists())
+
+        WorkTime.objects.with_deleted().filter(pk=worktime.pk).restore()
+        self.assertEqual(report(), 1800)
+        self.assertEqual(report(), Task.objects.get(pk=self.task.pk).tracked_seconds)
+
+    def test_intervals_are_split_at_midnight(self):
+        start = timezone.make_aware(timezone.datetime(2023, 3, 1, 23, 0))
+        WorkTimeRollup.add_interval(self.task.pk, self.user.pk, start, start + timedelta(hours=26))
+        WorkTimeRollup.add_interval(self.task.pk, self.user.pk, start, start + timedelta(minutes=30))
+
+        days = dict(WorkTimeRollup.objects.values_list('day', 'seconds'))
+        self.assertEqual(days, {
+            start.date(): 5400,
+            start.date() + timedelta(days=1): 86400,
+            start.date() + timedelta(days=2): 3600,
+        })
+
+
+class ActiveTimerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='timer', email='timer@example.com')
+        team = Team.objects.create(name='Timer Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        sprint = Sprint.objects.create(project=project)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=sprint)
+        self.other_task = Task.objects.create(title='Other', description='Task', sprint=sprint)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_starting_a_timer_stops_the_running_one(self):
+        response = self.client.post(reverse('worktime-create'), {'task': self.task.pk})
+        self.assertEqual(response.status_code, 201)
+        first = WorkTime.objects.get(pk=response.data['id'])
+        WorkTime.objects.filter(pk=first.pk).update(start_date=first.start_date - timedelta(minutes=2))
+
+        response = self.client.post(reverse('worktime-create'), {'task': self.other_task.pk})
+
+        self.assertEqual(response.status_code, 201)
+        first.refresh_from_db()
+        self.assertIsNotNone(first.end_date)
+        self.assertGreaterEqual(Task.objects.get(pk=self.task.pk).tracked_seconds, 120)
+        self.assertEqual(WorkTimeRollup.objects.get().user, self.user)
+        active = self.client.get(reverse('worktime-active'))
+        self.assertEqual(active.data['id'], response.data['id'])
+        self.assertEqual(active.data['user'], self.user.pk)
+
+    def test_no_active_timer(self):
+        WorkTime.start(self.user, self.task)
+        WorkTime.stop(self.user)
+
+        self.assertEqual(self.client.get(reverse('worktime-active')).status_code, 204)
+        self.assertIsNone(WorkTime.stop(self.user))
+
+    def test_one_open_timer_per_user(self):
+        WorkTime.objects.create(task=self.task, user=self.user)
+        with self.assertRaises(IntegrityError):
+            WorkTime.objects.create(task=self.other_task, user=self.user)
+
+    def test_only_the_owner_completes_a_timer(self):
+        worktime = WorkTime.start(self.user, self.task)
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        self.client.force_authenticate(outsider)
+
+        response = self.client.post(reverse('worktime-complete', kwargs={'worktime_id': worktime.pk}))
+
+        self.assertEqual(response.status_code, 403)
+
+
+class WorkTimeOverlapTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='overlap', email='overlap@example.com')
+        self.other = CustomUser.objects.create(username='other', email='other@example.com')
+        team = Team.objects.create(name='Overlap Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project))
+        self.start = timezone.now() - timedelta(days=1)
+
+    def interval(self, start_hours, end_hours, user=None):
+        worktime = WorkTime.objects.create(task=self.task, user=user or self.user)
+        end_date = None if end_hours is None else self.start + timedelta(hours=end_hours)
+        WorkTime.objects.filter(pk=worktime.pk).update(start_date=self.start + timedelta(hours=start_hours),
+                                                       end_date=end_date)
+        worktime.refresh_from_db()
+        return worktime
+
+    def test_overlapping_intervals_are_rejected(self):
+        self.interval(2, 4)
+        worktime = self.interval(6, 8)
+
+        for start, end in ((3, 5), (1, 3), (2, 4), (1, 9), (0, None), (3, None)):
+            worktime.start_date = self.start + timedelta(hours=start)
+            worktime.end_date = None if end is None else self.start + timedelta(hours=end)
+            with self.assertRaises(OverlappingWorkTime):
+                worktime.check_overlap()
+
+    def test_adjacent_and_other_users_intervals_are_allowed(self):
+        self.interval(2, 4)
+        self.interval(2, 4, user=self.other)
+        worktime = self.interval(6, 8)
+
+        worktime.start_date = self.start + timedelta(hours=4)
+        worktime.end_date = self.start + timedelta(hours=5)
+        worktime.save()
+
+    def test_audit_command(self):
+        first = self.interval(0, 10)
+        second = self.interval(1, 2)
+        third = self.interval(5, 6)
+        self.interval(10, None)
+        self.interval(3, 4, user=self.other)
+
+        out = StringIO()
+        call_command('audit_worktime_overlaps', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(list(WorkTime.find_overlaps(WorkTime.objects.all())),
+                         [(self.user.pk, first.pk, second.pk), (self.user.pk, first.pk, third.pk)])
+        self.assertIn('Found 2 overlapping work times', out.getvalue())
+
+
+class AttachmentUploadTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='uploader', email='uploader@example.com')
+        team = Team.objects.create(name='Upload Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(MEDIA_ROOT=directory.name, FILE_UPLOAD_TEMP_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = bytes(range(256)) * 40
+
+    def start(self, **extra):
+        data = {'task': self.task.pk, 'name': 'design.bin', 'size': len(self.data), **extra}
+        response = self.client.post(reverse('attachment-upload-create'), data)
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def put(self, upload, offset, chunk):
+        url = reverse('attachment-upload', kwargs={'pk': upload})
+        return self.client.put(f'{url}?offset={offset}', chunk, content_type='application/octet-stream')
+
+    def test_chunked_upload(self):
+        upload = self.start(checksum=hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(self.put(upload, 0, self.data[:4000]).data['offset'], 4000)
+
+        response = self.put(upload, 0, self.data[4000:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 4000)
+        self.assertEqual(self.client.get(reverse('attachment-upload', kwargs={'pk': upload})).data['offset'], 4000)
+        self.assertEqual(self.put(upload, 4000, self.data[4000:]).status_code, 200)
+
+        finalize = reverse('attachment-upload-finalize', kwargs={'pk': upload})
+        response = self.client.post(finalize)
+        self.assertEqual(response.status_code, 201)
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        self.assertEqual(attachment.content.read(), self.data)
+        self.assertEqual(attachment.checksum, hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(Task.objects.get(pk=self.task.pk).attachment_count, 1)
+        self.assertEqual(self.client.post(finalize).data['id'], attachment.pk)
+
+    def test_incomplete_and_corrupt_uploads(self):
+        upload = self.start(checksum='0' * 64)
+        finalize = reverse('attachment-upload-finalize', kwargs={'pk': upload})
+        self.put(upload, 0, self.data[:100])
+        self.assertEqual(self.client.post(finalize).status_code, 409)
+        self.assertEqual(self.put(upload, 100, self.data).status_code, 400)
+
+        self.put(upload, 100, self.data[100:])
+        response = self.client.post(finalize)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['offset'], 0)
+        self.assertFalse(Attachment.objects.exists())
+
+    def test_uploads_are_private(self):
+        upload = self.start()
+        self.client.force_authenticate(CustomUser.objects.create(username='other', email='other@example.com'))
+        self.assertEqual(self.put(upload, 0, self.data).status_code, 404)
+
+
+class AttachmentBlobTestCase(TestCase):
+    def setUp(self) -> None:
+        user = CustomUser.objects.create(username='blobs', email='blobs@example.com')
+        team = Team.objects.create(name='Blob Team', owner=user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(MEDIA_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def attach(self, data, name='spec.pdf'):
+        return Attachment.objects.create(task=self.task, content=SimpleUploadedFile(name, data))
+
+    def test_identical_files_are_stored_once(self):
+        first = self.attach(b'logo')
+        second = self.attach(b'logo', name='logo.png')
+        other = self.attach(b'other')
+
+        checksum = hashlib.sha256(b'logo').hexdigest()
+        self.assertEqual(first.content.name, f'blobs/{checksum[:2]}/{checksum[2:4]}/{checksum}')
+        self.assertEqual(second.content.name, first.content.name)
+        self.assertEqual((first.name, second.name, second.checksum), ('spec.pdf', 'logo.png', checksum))
+        self.assertEqual(first.blob.ref_count, 1)
+        self.assertEqual(AttachmentBlob.objects.get(checksum=checksum).ref_count, 2)
+        self.assertNotEqual(other.blob_id, first.blob_id)
+        self.assertEqual(Attachment.objects.get(pk=second.pk).content.read(), b'logo')
+
+    def test_unreferenced_blobs_are_collected(self):
+        kept = self.attach(b'logo')
+        shared = self.attach(b'logo')
+        purged = self.attach(b'old')
+        hard_deleted = self.attach(b'gone')
+        storage = kept.content.storage
+        shared.delete()
+        purged.delete()
+        Attachment.objects.filter(pk=hard_deleted.pk).hard_delete()
+
+        call_command('archive_deleted', '--days', '0', '--sleep', '0', stdout=StringIO())
+        out = StringIO()
+        call_command('collect_attachment_blobs', '--min-age-hours', '0', stdout=out)
+
+        self.assertIn('Removed 2 blobs', out.getvalue())
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+        self.assertTrue(storage.exists(kept.content.name))
+        self.assertFalse(storage.exists(purged.content.name))
+        self.assertFalse(storage.exists(hard_deleted.content.name))
+
+
+class AttachmentDownloadTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='downloads', email='downloads@example.com')
+        team = Team.objects.create(name='Download Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(MEDIA_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.data = b'0123456789' * 10
+        self.attachment = Attachment.objects.create(task=task, content=SimpleUploadedFile('spec.pdf', self.data))
+        self.url = reverse('attachment-download', kwargs={'pk': self.attachment.pk})
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_download(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="spec.pdf"')
+        self.assertEqual(response['ETag'], f'"{self.attachment.checksum}"')
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        again = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.data[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-5:])
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-0', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_offload_to_proxy(self):
+        with self.settings(TASKS_ATTACHMENT_SENDFILE='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.attachment.content.name)
+        self.assertEqual(response.content, b'')
+
+        with self.settings(TASKS_ATTACHMENT_SENDFILE='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.attachment.content.path)
+
+    def test_requires_team_membership(self):
+        self.client.force_authenticate(CustomUser.objects.create(username='other', email='other@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class TaskDiscussionTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='talker', email='talker@example.com')
+        team = Team.objects.create(name='Discussion Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-comments', kwargs={'task_id': self.task.pk})
+
+    def comment(self, content, parent=None, user=None):
+        return Comment.objects.create(content=content, user=user or self.user, task=self.task, parent=parent)
+
+    def test_pages_in_creation_order(self):
+        comments = [self.comment(f'Comment {i}', user=CustomUser.objects.create(username=f'user{i}',
+                                                                                email=f'user{i}@example.com'))
+                    for i in range(5)]
+
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(self.url, {'page_size': 3}).data
+        # The task with its team, then the page with its authors.
+        self.assertEqual(len(queries), 2)
+        second = self.client.get(first['next']).data
+
+        self.assertEqual([comment['id'] for comment in first['results'] + second['results']],
+                         [comment.id for comment in comments])
+        self.assertEqual(first['results'][1]['username'], 'user1')
+        self.assertIsNone(second['next'])
+
+    def test_threads(self):
+        question = self.comment('Question')
+        answer = self.comment('Answer', parent=question)
+        self.comment('Follow-up', parent=answer)
+        self.comment('Deleted', parent=question).delete()
+        other = self.comment('Other')
+
+        threaded = self.client.get(self.url, {'threaded': 'true'}).data['results']
+        self.assertEqual([(comment['id'], comment['reply_count']) for comment in threaded],
+                         [(question.id, 1), (other.id, 0)])
+        replies = self.client.get(self.url, {'parent': question.id}).data['results']
+        self.assertEqual([comment['id'] for comment in replies], [answer.id])
+        self.assertNotIn('reply_count', replies[0])
+
+    def test_replies_stay_on_their_task(self):
+        other_task = Task.objects.create(title='Other', description='Task', sprint=self.task.sprint)
+        parent = self.comment('Question')
+
+        response = self.client.post(reverse('comment-create'), {'content': 'Reply', 'user': self.user.pk,
+                                                                'task': other_task.pk, 'parent': parent.pk})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_team_membership(self):
+        self.client.force_authenticate(CustomUser.objects.create(username='outsider', email='outsider@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class TaskVersionTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='editor', email='editor@example.com')
+        team = Team.objects.create(name='Version Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.task = Task.objects.create(title='Task', description='Task', sprint=Sprint.objects.create(project=project),
+                                        status='ToDo')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-update', kwargs={'pk': self.task.pk})
+
+    def test_update_writes_only_the_sent_fields_when_the_version_matches(self):
+        etag = self.client.get(reverse('task-detail', kwargs={'pk': self.task.pk}))['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {'status': 'Doing'}, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(response.data['version'], 2)
+        sql = [query['sql'] for query in queries]
+        updates = [index for index, query in enumerate(sql) if query.startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"title"', sql[updates[0]])
+        # The task is only read back after it was written.
+        self.assertFalse(any(query.startswith('SELECT "tasks_task"') for query in sql[:updates[0]]))
+
+    def test_stale_version_is_rejected(self):
+        self.client.patch(self.url, {'status': 'Doing'})
+
+        response = self.client.patch(self.url, {'status': 'Done'}, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, 412)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.version), ('Doing', 2))
+
+    def test_missing_task(self):
+        response = self.client.patch(reverse('task-update', kwargs={'pk': 999999}), {'status': 'Done'},
+                                     HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_counter_changes_bump_the_version(self):
+        Comment.objects.create(content='Comment', user=self.user, task=self.task)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 2)
+
+    def test_conditional_get_is_answered_from_the_validators(self):
+        url = reverse('task-detail', kwargs={'pk': self.task.pk})
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.patch(self.url, {'status': 'Doing'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'Doing')
+
+
+class ActivityTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='actor', email='actor@example.com')
+        team = Team.objects.create(name='Activity Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        self.project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=self.project)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project-activity', kwargs={'pk': self.project.pk})
+
+    def test_changes_are_recorded_with_their_actor(self):
+        response = self.client.post(reverse('task-create'), {'title': 'Task', 'description': 'Task',
+                                                              'sprint': self.sprint.pk, 'status': 'ToDo'})
+        task = Task.objects.get(pk=response.data['id'])
+        self.client.post(reverse('comment-create'), {'content': 'Hi', 'user': self.user.pk, 'task': task.pk})
+        self.client.delete(reverse('task-delete', kwargs={'pk': task.pk}))
+
+        activities = Activity.objects.order_by('id')
+        self.assertEqual([(activity.target_type, activity.verb) for activity in activities],
+                         [('task', 'created'), ('comment', 'created'), ('comment', 'deleted'), ('task', 'deleted')])
+        self.assertEqual({(activity.project_id, activity.task_id, activity.actor_id) for activity in activities},
+                         {(self.project.pk, task.pk, self.user.pk)})
+        self.assertEqual(activities[0].data, {'title': 'Task', 'status': 'ToDo'})
+
+    def test_bulk_changes_are_recorded_in_batches(self):
+        payload = [{'title': f'Task {i}', 'description': 'Bulk', 'sprint': self.sprint.pk, 'status': 'ToDo'}
+                   for i in range(30)]
+
+        with self.settings(TASKS_BULK_BATCH_SIZE=10), CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('task-bulk'), payload, format='json')
+
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "tasks_activity"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Activity.objects.filter(project=self.project, verb=Activity.CREATED).count(), 30)
+
+    def test_project_feed_pages_newest_first(self):
+        tasks = [Task.objects.create(title=f'Task {i}', description='Task', sprint=self.sprint, status='ToDo')
+                 for i in range(5)]
+
+        first = self.client.get(self.url, {'page_size': 3}).data
+        second = self.client.get(first['next']).data
+
+        self.assertEqual([activity['task'] for activity in first['results'] + second['results']],
+                         [task.pk for task in reversed(tasks)])
+        self.assertIsNone(second['next'])
+        since = self.client.get(self.url, {'since': first['results'][1]['id']}).data['results']
+        self.assertEqual([activity['task'] for activity in since], [tasks[4].pk])
+
+    def test_user_feed_covers_only_their_projects(self):
+        mine = Task.objects.create(title='Mine', description='Task', sprint=self.sprint, status='ToDo')
+        other = CustomUser.objects.create(username='other', email='other@example.com')
+        team = Team.objects.create(name='Other Team', owner=other, description='Team')
+        project = Project.objects.create(title='Other', description='Project',
+                                         workspace=WorkSpace.objects.create(title='Other', team=team), team=team)
+        Task.objects.create(title='Theirs', description='Task', sprint=Sprint.objects.create(project=project))
+
+        results = self.client.get(reverse('activity-feed')).data['results']
+
+        self.assertEqual([activity['task'] for activity in results], [mine.pk])
+        project_url = reverse('project-activity', kwargs={'pk': project.pk})
+        self.assertEqual(self.client.get(project_url).status_code, 403)
+
+
+class TaskLabelMembershipTestCase(TestCase):
+    def setUp(self) -> None:
+        user = CustomUser.objects.create(username='labels', email='labels@example.com')
+        team = Team.objects.create(name='Label Team', owner=user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        sprint = Sprint.objects.create(project=project)
+        self.tasks = [Task.objects.create(title=f'Task {i}', description='Task', sprint=sprint, status='ToDo')
+                      for i in range(3)]
+        self.bug, self.ui, self.api = [Label.objects.create(name=name) for name in ('bug', 'ui', 'api')]
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.url = reverse('task-labels')
+
+    def ids(self, tasks):
+        return [task.id for task in tasks]
+
+    def test_bulk_attach_ignores_existing_pairs(self):
+        TaskLabel.objects.create(task=self.tasks[0], label=self.bug)
+
+        data = {'tasks': self.ids(self.tasks), 'labels': [self.bug.id, self.ui.id]}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.client.post(self.url, data, format='json')
+
+        self.assertEqual(TaskLabel.objects.count(), 6)
+        self.assertEqual(set(Task.objects.values_list('label_count', flat=True)), {2})
+        self.assertEqual(Activity.objects.filter(target_type='tasklabel', verb=Activity.CREATED).count(), 6)
+
+    def test_bulk_detach(self):
+        TaskLabel.attach(self.ids(self.tasks), [self.bug.id, self.ui.id])
+
+        response = self.client.delete(self.url, {'tasks': self.ids(self.tasks[:2]), 'labels': [self.bug.id]},
+                                      format='json')
+
+        self.assertEqual(response.data, {'detached': 2})
+        self.assertEqual(list(Task.objects.order_by('id').values_list('label_count', flat=True)), [1, 1, 2])
+        TaskLabel.attach([self.tasks[0].id], [self.bug.id])
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].id).label_count, 2)
+
+    def test_unknown_ids_are_rejected(self):
+        response = self.client.post(self.url, {'tasks': [self.tasks[0].id, 999], 'labels': [self.bug.id]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tasks', response.data)
+
+    def test_tasks_of_other_teams_are_unknown(self):
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        team = Team.objects.create(name='Other Team', owner=outsider, description='Team')
+        workspace = WorkSpace.objects.create(title='Other', team=team)
+        project = Project.objects.create(title='Other', description='Project', workspace=workspace, team=team)
+        foreign = Task.objects.create(title='Foreign', description='Task', sprint=Sprint.objects.create(project=project))
+        TaskLabel.objects.create(task=foreign, label=self.bug)
+
+        response = self.client.post(self.url, {'tasks': [self.tasks[0].id, foreign.id], 'labels': [self.ui.id]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(foreign.id), str(response.data['tasks']))
+        response = self.client.delete(self.url, {'tasks': [foreign.id], 'labels': [self.bug.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('attach-label', kwargs={'task_id': foreign.id}),
+                                    {'labels': [self.ui.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(TaskLabel.objects.filter(task=foreign).values_list('label', flat=True)), [self.bug.id])
+
+    def test_attach_label_view(self):
+        response = self.client.post(reverse('attach-label', kwargs={'task_id': self.tasks[0].id}),
+                                    {'labels': [self.bug.id, self.api.id]}, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertCountEqual(self.bug.all_tasks(), [self.tasks[0]])
+
+    def test_attach_label_view_rejects_a_list_body(self):
+        response = self.client.post(reverse('attach-label', kwargs={'task_id': self.tasks[0].id}),
+                                    [self.bug.id], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_all_and_any_label_queries(self):
+        TaskLabel.attach(self.ids(self.tasks[:2]), [self.bug.id])
+        TaskLabel.attach(self.ids(self.tasks[1:]), [self.ui.id])
+        url = reverse('task-list')
+
+        both = self.client.get(url, {'labels': [self.bug.id, self.ui.id]}).data['results']
+        either = self.client.get(url, {'labels': [self.bug.id, self.ui.id], 'match': 'any'}).data['results']
+
+        self.assertEqual([task['id'] for task in both], [self.tasks[1].id])
+        self.assertEqual([task['id'] for task in either], self.ids(self.tasks))
+
+    def test_label_query_is_a_single_query(self):
+        TaskLabel.attach(self.ids(self.tasks), [self.bug.id, self.ui.id])
+        with self.assertNumQueries(1):
+            list(Task.objects.with_labels([self.bug.id, self.ui.id, self.api.id], match='any'))
+
+
+class SearchTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='searcher', email='searcher@example.com')
+        team = Team.objects.create(name='Search Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('search')
+
+    def search(self, q):
+        response = self.client.get(self.url, {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [(hit['type'], hit['id']) for hit in response.data['results']]
+
+    def test_ranks_tasks_and_comments(self):
+        titled = Task.objects.create(title='Invoice export', description='Broken', sprint=self.sprint, status='ToDo')
+        described = Task.objects.create(title='Reports', description='The invoice total is wrong',
+                                        sprint=self.sprint, status='ToDo')
+        comment = Comment.objects.create(content='Check the invoice <b>PDF</b>', user=self.user, task=described)
+        Task.objects.create(title='Unrelated', description='Nothing here', sprint=self.sprint, status='ToDo')
+
+        response = self.client.get(self.url, {'q': 'invoice'})
+
+        hits = [(hit['type'], hit['id']) for hit in response.data['results']]
+        self.assertEqual(hits[0], ('task', titled.id))
+        self.assertCountEqual(hits[1:], [('task', described.id), ('comment', comment.id)])
+        snippets = {hit['id']: hit['snippet'] for hit in response.data['results'] if hit['type'] == 'comment'}
+        self.assertEqual(snippets[comment.id], 'Check the <mark>invoice</mark> &lt;b&gt;PDF&lt;/b&gt;')
+
+    def test_index_follows_saves_and_soft_deletes(self):
+        task = Task.objects.create(title='Draft', description='', sprint=self.sprint, status='ToDo')
+        self.assertEqual(self.search('roadmap'), [])
+
+        task.title = 'Roadmap'
+        task.save()
+        self.assertEqual(self.search('roadmap'), [('task', task.id)])
+
+        self.sprint.delete()
+        self.assertEqual(self.search('roadmap'), [])
+        self.sprint.restore()
+        self.assertEqual(self.search('roadmap'), [('task', task.id)])
+
+    def test_limited_to_the_callers_teams(self):
+        Task.objects.create(title='Secret plan', description='', sprint=self.sprint, status='ToDo')
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.search('secret'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        Task.objects.create(title='Quote "this" AND that', description='', sprint=self.sprint, status='ToDo')
+        self.assertEqual(len(self.search('this" AND (that*')), 1)
+        self.assertEqual(self.search('***'), [])
+
+
+class DeadlineSchedulerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='assignee', email='assignee@example.com')
+        team = Team.objects.create(name='Deadline Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.now = timezone.now()
+
+    def task(self, hours, status='ToDo', user=True):
+        return Task.objects.create(title=f'Due in {hours}h', description='Task', sprint=self.sprint, status=status,
+                                   user=self.user if user else None, deadline=self.now + timedelta(hours=hours))
+
+    def scan(self, **kwargs):
+        return Task.objects.scan_deadlines(self.now, self.now - timedelta(hours=1), timedelta(hours=24), **kwargs)
+
+    def test_overdue_tasks_are_marked_and_reminders_enqueued_once(self):
+        late = [self.task(-0.5), self.task(-0.25)]
+        soon = self.task(2)
+        self.task(-0.5, status='Done')
+        self.task(-0.5, user=False)
+        self.task(-2)
+        self.task(48)
+
+        self.assertEqual(self.scan(batch_size=2), (3, 3))
+        self.assertEqual(self.scan(batch_size=2), (0, 0))
+
+        self.assertEqual(set(Task.objects.filter(is_overdue=True).values_list('title', flat=True)),
+                         {'Due in -0.5h', 'Due in -0.25h'})
+        self.assertEqual(set(TaskReminder.objects.values_list('task', 'kind')),
+                         {(late[0].pk, TaskReminder.OVERDUE), (late[1].pk, TaskReminder.OVERDUE),
+                          (soon.pk, TaskReminder.UPCOMING)})
+        late[0].refresh_from_db()
+        self.assertEqual(late[0].version, 2)
+
+    def test_batches_are_read_by_keyset(self):
+        for hours in range(1, 6):
+            self.task(hours)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.scan(batch_size=2)
+
+        scans = [query['sql'] for query in queries if query['sql'].startswith('SELECT "tasks_task"."id"')]
+        self.assertEqual(len(scans), 4)
+        self.assertTrue(all('OFFSET' not in sql for sql in scans))
+
+    def test_new_deadline_clears_the_overdue_mark(self):
+        task = self.task(-0.5)
+        self.scan()
+
+        task = Task.update_if_version(task.pk, {'deadline': self.now + timedelta(hours=5)})
+
+        self.assertFalse(task.is_overdue)
+        self.assertEqual(self.scan(), (0, 1))
+
+    def test_run_scheduler_command(self):
+        self.task(-0.5)
+        out = StringIO()
+        call_command('run_scheduler', '--once', stdout=out)
+        self.assertIn('Marked 1 tasks overdue, enqueued 1 reminders', out.getvalue())
+
+
+class TaskRankTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create(username='mover', email='mover@example.com')
+        team = Team.objects.create(name='Rank Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.tasks = [Task.objects.create(title=f'Task {i}', description='Task', sprint=self.sprint, status='ToDo')
+                      for i in range(4)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def column(self, status='ToDo'):
+        return list(Task.objects.filter(sprint=self.sprint, status=status)
+                    .order_by(*Task.BOARD_ORDERING).values_list('pk', flat=True))
+
+    def move(self, task, status='ToDo', after=None, before=None):
+        return self.client.post(reverse('task-move', kwargs={'pk': task.pk}),
+                                {'status': status, 'after': after and after.pk, 'before': before and before.pk},
+                                format='json')
+
+    def test_rank_keys(self):
+        keys = [None]
+        for i in range(100):
+            keys.append(rank_between(keys[-1], None))
+        self.assertEqual(keys[1:], sorted(keys[1:]))
+        self.assertLess(len(keys[-1]), 6)
+        self.assertTrue('a' < rank_between('a', 'a1') < 'a1')
+        self.assertTrue(rank_between(None, '01') < '01')
+        with self.assertRaises(ValueError):
+            rank_between('b', 'a')
+        batch = ranks_between('a', 'b', 500)
+        self.assertEqual(batch, sorted(set(batch)))
+        self.assertTrue('a' < batch[0] and batch[-1] < 'b')
+        spread = spread_ranks(1000)
+        self.assertEqual(spread, sorted(set(spread)))
+        self.assertFalse(any(key.endswith('0') for key in spread))
+
+    def test_created_tasks_are_appended(self):
+        self.assertEqual(self.column(), [task.pk for task in self.tasks])
+
+    def test_move_is_a_single_row_update(self):
+        first, second, third, fourth = self.tasks
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(fourth, after=first, before=second)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "tasks_task"')]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.column(), [first.pk, fourth.pk, second.pk, third.pk])
+
+        self.move(first, status='Doing')
+        self.move(third, status='Doing', before=first)
+        self.assertEqual(self.column('Doing'), [third.pk, first.pk])
+
+    def test_tasks_of_other_teams_cannot_be_moved(self):
+        first, second, third, fourth = self.tasks
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        self.client.force_authenticate(outsider)
+
+        self.assertEqual(self.move(fourth, status='Done').status_code, 404)
+        self.assertEqual(self.move(fourth, after=first, before=second).status_code, 404)
+        self.assertEqual(self.column(), [task.pk for task in self.tasks])
+
+    def test_tied_neighbours_rebalance_the_column(self):
+        first, second, third, fourth = self.tasks
+        Task.objects.filter(pk__in=[first.pk, second.pk]).update(rank='')
+
+        response = self.move(fourth, after=first, before=second)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column(), [first.pk, fourth.pk, second.pk, third.pk])
+
+    def test_neighbours_must_be_in_the_column(self):
+        first, second, third, fourth = self.tasks
+        self.assertEqual(self.move(fourth, status='Done', after=first).status_code, 400)
+        self.assertEqual(self.move(fourth, after=second, before=first).status_code, 400)
+
+    def test_changing_column_appends_the_task(self):
+        first, second, third, fourth = self.tasks
+        Task.update_if_version(second.pk, {'status': 'Doing'})
+        Task.update_if_version(first.pk, {'status': 'Doing'})
+
+        self.assertEqual(self.column('Doing'), [second.pk, first.pk])
+
+    def test_patching_the_same_column_keeps_the_rank(self):
+        first, second, third, fourth = self.tasks
+        url = reverse('task-update', kwargs={'pk': second.pk})
+
+        response = self.client.patch(url, {'status': 'ToDo', 'sprint': self.sprint.pk}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=second.pk).rank, second.rank)
+        self.assertEqual(self.column(), [task.pk for task in self.tasks])
+
+    def test_rebalance_only_long_columns(self):
+        for task in self.tasks:
+            Task.update_if_version(task.pk, {'status': 'Doing'})
+        before = self.column('Doing')
+
+        out = StringIO()
+        call_command('rebalance_task_ranks', '--max-length', '3', stdout=out)
+
+        self.assertIn('Rebalanced the ranks of 1 columns', out.getvalue())
+        self.assertEqual(self.column('Doing'), before)
+        self.assertEqual(max(len(rank) for rank in Task.objects.values_list('rank', flat=True)), 1)
+
+
+class TaskDependencyTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = CustomUser.objects.create(username='planner', email='planner@example.com')
+        team = Team.objects.create(name='Plan Team', owner=self.user, description='Team')
+        workspace = WorkSpace.objects.create(title='Workspace', team=team)
+        project = Project.objects.create(title='Project', description='Project', workspace=workspace, team=team)
+        self.sprint = Sprint.objects.create(project=project)
+        self.now = timezone.now()
+        self.tasks = [Task.objects.create(title=f'Task {i}', description='Task', sprint=self.sprint, status='ToDo',
+                                          deadline=self.now + timedelta(days=i))
+                      for i in range(5)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('sprint-critical-path', kwargs={'id': self.sprint.id})
+
+    def link(self, blocker, blocked):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('dependency-create'), {'blocker': blocker.pk, 'blocked': blocked.pk})
+
+    def test_cycles_are_rejected(self):
+        a, b, c, d, e = self.tasks
+        self.assertEqual(self.link(a, b).status_code, 201)
+        self.assertEqual(self.link(b, c).status_code, 201)
+
+        self.assertEqual(self.link(c, a).status_code, 400)
+        self.assertEqual(self.link(a, a).status_code, 400)
+        self.assertEqual(self.link(a, b).status_code, 400)
+        self.assertEqual(self.link(a, c).status_code, 201)
+        self.assertTrue(TaskDependency.reaches(a.pk, c.pk))
+        self.assertFalse(TaskDependency.reaches(c.pk, a.pk))
+
+        other = Task.objects.create(title='Elsewhere', description='Task', status='ToDo',
+                                    sprint=Sprint.objects.create(project=self.sprint.project))
+        self.assertEqual(self.link(a, other).status_code, 400)
+
+    def test_links_are_limited_to_the_users_teams(self):
+        a, b, c, d, e = self.tasks
+        link = self.link(a, b).data
+        outsider = CustomUser.objects.create(username='outsider', email='outsider@example.com')
+        team = Team.objects.create(name='Other Team', owner=outsider, description='Team')
+        workspace = WorkSpace.objects.create(title='Other', team=team)
+        project = Project.objects.create(title='Other', description='Project', workspace=workspace, team=team)
+        foreign = Task.objects.create(title='Foreign', description='Task', status='ToDo',
+                                      sprint=Sprint.objects.create(project=project))
+        self.client.force_authenticate(outsider)
+
+        response = self.link(foreign, a)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('blocked', response.data)
+        self.assertEqual(self.client.delete(reverse('dependency-delete', kwargs={'pk': link['id']})).status_code, 404)
+        self.assertTrue(TaskDependency.objects.filter(pk=link['id']).exists())
+
+    def test_critical_path(self):
+        a, b, c, d, e = self.tasks
+        for blocker, blocked in ((a, b), (b, d), (a, c), (c, d), (d, e), (c, e)):
+            self.link(blocker, blocked)
+        Task.update_if_version(b.pk, {'deadline': self.now - timedelta(days=1)})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        reads = [query for query in queries if 'tasks_taskdependency' in query['sql']]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(reads), 1)
+        self.assertEqual([task['id'] for task in response.data['tasks']], [a.pk, b.pk, d.pk, e.pk])
+        # a must be done before b is due.
+        self.assertEqual(response.data['tasks'][0]['due'], response.data['tasks'][1]['deadline'])
+
+    def test_path_is_cached_until_a_link_or_deadline_changes(self):
+        a, b, c, d, e = self.tasks
+        self.link(a, b)
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse(any('tasks_taskdependency' in query['sql'] for query in queries))
+
+        link = self.link(b, c).data
+        self.assertEqual(len(self.client.get(self.url).data['tasks']), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('dependency-delete', kwargs={'pk': link['id']}))
+        self.assertEqual(len(self.client.get(self.url).data['tasks']), 2)
+
+        deadline = self.now + timedelta(days=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.update_if_version(a.pk, {'deadline': deadline})
+        self.assertEqual(self.client.get(self.url).data['tasks'][0]['deadline'],
+                         deadline.isoformat().replace('+00:00', 'Z'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            b.soft_delete()
+        self.assertEqual(self.client.get(self.url).data['tasks'], [])
@@ -0,0 +1,93 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from .models import Attachment, AttachmentBlob
+
+PIECE_SIZE = 64 * 1024
+
+
+def temp_path(upload):
+    """Returns the path of the temporary file that holds the bytes of ``upload`` received so far."""
+    directory = settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir()
+    return os.path.join(directory, f"attachment-upload-{upload.pk}.part")
+
+
+def received(upload):
+    """Returns how many bytes of ``upload`` are safely stored, which is 0 if its temporary file was lost."""
+    try:
+        size = os.path.getsize(temp_path(upload))
+    except OSError:
+        return 0
+    return upload.offset if size >= upload.offset else 0
+
+
+def write_chunk(upload, stream, length):
+    """Writes ``length`` bytes of ``stream`` to the temporary file of ``upload`` at its offset.
+
+    The chunk is copied ``PIECE_SIZE`` bytes at a time, so memory use does not
+    depend on the chunk size. Anything after the chunk, left over from an
+    interrupted attempt, is cut off. Raises ValidationError if the stream ends
+    early; the offset only moves once the whole chunk is written.
+    """
+    path = temp_path(upload)
+    with open(path, "r+b" if os.path.exists(path) else "wb") as file:
+        file.seek(upload.offset)
+        remaining = length
+        while remaining:
+            piece = stream.read(min(PIECE_SIZE, remaining))
+            if not piece:
+                raise ValidationError(_("The chunk ended after %(count)s of %(length)s bytes.")
+                                      % {"count": length - remaining, "length": length})
+            file.write(piece)
+            remaining -= len(piece)
+        file.truncate()
+    upload.offset += length
+
+
+def finalize(upload):
+    """Stores the complete file of ``upload`` and creates its attachment.
+
+    The content addressed storage hashes the file while it copies it. If it
+    does not match the checksum given when the upload started, the stored
+    copy is removed, unless another attachment has the same content, and
+    ValidationError is raised. The attachment and the link from the upload
+    are saved in one transaction.
+    """
+    attachment = Attachment(task_id=upload.task_id, name=upload.name)
+    with open(temp_path(upload), "rb") as file:
+        attachment.content.save(upload.name, File(file, upload.name), save=False)
+    checksum = attachment.content.storage.checksum(attachment.content.name)
+    if upload.checksum and upload.checksum != checksum:
+        purge_unused(attachment.content)
+        raise ValidationError(_("The file does not match its checksum."))
+    try:
+        with transaction.atomic():
+            attachment.save()
+            upload.attachment = attachment
+            upload.save(update_fields=["attachment", "updated_at"])
+    except Exception:
+        purge_unused(attachment.content)
+        raise
+    transaction.on_commit(lambda: discard(upload))
+    return attachment
+
+
+def purge_unused(content):
+    """Removes a just stored blob, unless it was stored before and belongs to other attachments too."""
+    storage = content.storage
+    if not AttachmentBlob.objects.filter(checksum=storage.checksum(content.name)).exists():
+        storage.purge(content.name)
+
+
+def discard(upload):
+    """Removes the temporary file of ``upload``, if there is one."""
+    try:
+        os.remove(temp_path(upload))
+    except FileNotFoundError:
+        pass
@@ -2,16 +2,32 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path('tasks/', views.TaskListView.as_view(), name='task-list'),
+    path('tasks/bulk/', views.TaskBulkView.as_view(), name='task-bulk'),
+    path('tasks/import/', views.TaskImportView.as_view(), name='task-import'),
+    path('tasks/labels/', views.TaskLabelBulkView.as_view(), name='task-labels'),
     path('tasks/create/', views.TaskCreateView.as_view(), name='task-create'),
     path('tasks/<int:pk>/', views.TaskRetrieveView.as_view(), name='task-detail'),
     path('tasks/<int:pk>/update/', views.TaskUpdateView.as_view(), name='task-update'),
+    path('tasks/<int:pk>/move/', views.TaskMoveView.as_view(), name='task-move'),
     path('tasks/<int:pk>/delete/', views.TaskDeleteView.as_view(), name='task-delete'),
     path('tasks/<int:task_id>/assign/', views.AssignTaskView.as_view(), name='task-assign'),
     path('tasks/<int:task_id>/attach-label/', views.AttachLabelView.as_view(), name='attach-label'),
+    path('tasks/<int:task_id>/comments/', views.TaskCommentListView.as_view(), name='task-comments'),
+    path('dependencies/create/', views.TaskDependencyCreateView.as_view(), name='dependency-create'),
+    path('dependencies/<int:pk>/delete/', views.TaskDependencyDeleteView.as_view(), name='dependency-delete'),
+    path('activity/', views.ActivityFeedView.as_view(), name='activity-feed'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('comments/create/', views.CommentCreateView.as_view(), name='comment-create'),
     path('comments/<int:pk>/delete/', views.CommentDeleteView.as_view(), name='comment-delete'),
     path('attachments/create/', views.AttachmentCreateView.as_view(), name='attachment-create'),
+    path('attachments/uploads/', views.AttachmentUploadCreateView.as_view(), name='attachment-upload-create'),
+    path('attachments/uploads/<int:pk>/', views.AttachmentUploadView.as_view(), name='attachment-upload'),
+    path('attachments/uploads/<int:pk>/finalize/', views.AttachmentUploadFinalizeView.as_view(),
+         name='attachment-upload-finalize'),
+    path('attachments/<int:pk>/download/', views.AttachmentDownloadView.as_view(), name='attachment-download'),
     path('attachments/<int:pk>/delete/', views.AttachmentDeleteView.as_view(), name='attachment-delete'),
     path('worktimes/create/', views.WorkTimeCreateView.as_view(), name='worktime-create'),
+    path('worktimes/active/', views.WorkTimeActiveView.as_view(), name='worktime-active'),
     path('worktimes/<int:worktime_id>/complete/', views.WorkTimeCompleteView.as_view(), name='worktime-complete'),
 ]
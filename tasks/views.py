@@ -1,7 +1,41 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, status, views
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from .models import Task, Comment, Attachment, WorkTime, Label
-from .serializers import TaskSerializer, CommentSerializer, AttachmentSerializer, WorkTimeSerializer
+from . import uploads
+from .models import Activity, DependencyCycle, InvalidMove, Task, TaskDependency, Comment, Attachment, AttachmentUpload, WorkTime, OverlappingWorkTime, Label, TaskLabel
+from core.conditional import if_match_versions, not_modified, validator_headers
+from core.pagination import KeysetPagination, NewestFirstPagination
+from projects.models import Project, Sprint
+from .downloads import serve_attachment
+from .importer import TaskImporter
+from .search import search
+from .serializers import (
+    TaskSerializer,
+    TaskBulkSerializer,
+    TaskBulkDeleteSerializer,
+    TaskFilterSerializer,
+    TaskImportSerializer,
+    TaskMoveSerializer,
+    TaskDependencySerializer,
+    TaskLabelAttachSerializer,
+    TaskLabelBulkSerializer,
+    SearchQuerySerializer,
+    CommentSerializer,
+    DiscussionCommentSerializer,
+    DiscussionQuerySerializer,
+    AttachmentSerializer,
+    AttachmentUploadSerializer,
+    WorkTimeSerializer,
+    ActivitySerializer,
+    ActivityQuerySerializer,
+)
 
 
 # Create Task
@@ -14,17 +48,260 @@ class TaskCreateView(generics.CreateAPIView):
         serializer.save()
 
 
+# List Tasks
+class TaskListView(generics.ListAPIView):
+    """
+    List the tasks of the caller's teams, a keyset page at a time.
+    """
+    serializer_class = TaskSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        filters = TaskFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        user = self.request.user
+        sprints = Sprint.objects.filter(Q(project__team__owner=user) | Q(project__team__members=user)).values('pk')
+        return Task.objects.filter_by(**filters.validated_data).filter(sprint__in=sprints)
+
+
+# Bulk Create, Update and Delete Tasks
+class TaskBulkView(views.APIView):
+    """
+    Create, update or delete many tasks in one request and one transaction.
+
+    POST takes a list of tasks, PATCH a list of partial tasks with their ``id``
+    and DELETE ``{"ids": [...]}``. Every item gets its own result, so invalid
+    items are reported without rejecting the valid ones. Only the tasks and
+    sprints of the caller's teams can be written, other ids are item errors.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = TaskBulkSerializer(data=request.data, many=True, max_length=settings.TASKS_BULK_MAX_ITEMS,
+                                        context={'request': request, 'sprints': self.team_sprints()})
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            created = serializer.create_tasks(settings.TASKS_BULK_BATCH_SIZE)
+        return self.bulk_response(serializer.results(created, 'created'), status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        serializer = TaskBulkSerializer(data=request.data, many=True, partial=True,
+                                        max_length=settings.TASKS_BULK_MAX_ITEMS,
+                                        context={'request': request, 'sprints': self.team_sprints()})
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            updated = serializer.update_tasks(settings.TASKS_BULK_BATCH_SIZE)
+        return self.bulk_response(serializer.results(updated, 'updated'), status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        serializer = TaskBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        batch_size = settings.TASKS_BULK_BATCH_SIZE
+        sprints = self.team_sprints().values('pk')
+        found = set()
+        with transaction.atomic():
+            for start in range(0, len(ids), batch_size):
+                tasks = Task.objects.filter(pk__in=ids[start:start + batch_size], sprint__in=sprints)
+                found.update(tasks.values_list('pk', flat=True))
+                tasks.soft_delete()
+        results = [
+            {'index': index, 'status': 'deleted', 'id': pk} if pk in found
+            else {'index': index, 'status': 'error', 'errors': {'id': ['Task not found.']}}
+            for index, pk in enumerate(ids)
+        ]
+        return self.bulk_response(results, status.HTTP_200_OK)
+
+    def team_sprints(self):
+        user = self.request.user
+        return Sprint.objects.filter(Q(project__team__owner=user) | Q(project__team__members=user)).distinct()
+
+    def bulk_response(self, results, success_status):
+        if any(result['status'] == 'error' for result in results):
+            success_status = status.HTTP_207_MULTI_STATUS
+        return Response({'results': results}, status=success_status)
+
+
+# Import Tasks from a File
+class TaskImportView(views.APIView):
+    """
+    Import tasks from an uploaded CSV or NDJSON file into the caller's sprints.
+
+    The file is imported in committed batches. Uploading the same file again
+    after a failure resumes after the last committed batch.
+    """
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = TaskImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        sprints = Sprint.objects.filter(Q(project__team__owner=request.user) | Q(project__team__members=request.user))
+        importer = TaskImporter.for_file(upload, upload.name, user=request.user, sprints=sprints)
+        importer.run(upload, serializer.validated_data['input'])
+        job = importer.job
+        return Response({
+            'import': job.id,
+            'rows_read': job.rows_read,
+            'rows_imported': job.rows_imported,
+            'rows_failed': job.rows_failed,
+            'rows_per_second': round(importer.rows_per_second),
+            'errors': importer.errors,
+        }, status=status.HTTP_200_OK)
+
+
+# Search Tasks and Comments
+class SearchView(views.APIView):
+    """
+    Full-text search over the titles and descriptions of tasks and the content of comments.
+
+    Only the tasks of the caller's teams are searched. Hits come best first,
+    each with an HTML snippet where the matched words are wrapped in ``<mark>``.
+    """
+
+    def get(self, request, *args, **kwargs):
+        serializer = SearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        results = search(request.user, serializer.validated_data['q'], limit=serializer.validated_data['page_size'])
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+# Activity of the user's Projects
+class ActivityFeedView(generics.ListAPIView):
+    """
+    List the changes made in the projects of the caller's teams, newest first, a keyset page at a time.
+
+    ``since=<id>`` lists only the activities recorded after that one, so
+    clients can poll for changes instead of reloading their tasks.
+    """
+    serializer_class = ActivitySerializer
+    pagination_class = NewestFirstPagination
+
+    def get_queryset(self):
+        params = ActivityQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        user = self.request.user
+        projects = Project.objects.filter(Q(team__owner=user) | Q(team__members=user)).values('pk')
+        activities = Activity.objects.filter(project__in=projects)
+        if 'since' in params.validated_data:
+            activities = activities.filter(id__gt=params.validated_data['since'])
+        return activities
+
+
 # Retrieve Task Information
 class TaskRetrieveView(generics.RetrieveAPIView):
+    """
+    Retrieve a task with its ETag and Last-Modified.
+
+    Conditional requests are answered from the task's version and update
+    time, looked up by primary key, before anything else is loaded.
+    """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        response = not_modified(request, self.get_queryset().filter(pk=kwargs['pk']))
+        if response is not None:
+            return response
+        task = self.get_object()
+        return Response(self.get_serializer(task).data, headers=validator_headers(task))
+
 
 # Update Task
 class TaskUpdateView(generics.UpdateAPIView):
+    """
+    Update a task with a single UPDATE of the fields sent, without reading it first.
+
+    Send the task's ETag in ``If-Match`` to apply the change only if nobody
+    changed the task since it was read; otherwise the answer is 412 and
+    nothing is written. The response carries the new ETag.
+    """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
 
+    def update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+        if_match = request.META.get('HTTP_IF_MATCH')
+        versions = if_match_versions(if_match) if if_match else None
+        task = Task.update_if_version(kwargs['pk'], serializer.validated_data, versions=versions)
+        if task is None:
+            if not Task.objects.filter(pk=kwargs['pk']).exists():
+                raise Http404
+            return Response({'message': 'The task was changed by someone else. Reload it and try again.'},
+                            status=status.HTTP_412_PRECONDITION_FAILED)
+        return Response(self.get_serializer(task).data, headers=validator_headers(task))
+
+
+# Move Task on the Board
+class TaskMoveView(generics.GenericAPIView):
+    """
+    Move a task to a board column, between two of its tasks, with a single UPDATE of the task.
+
+    ``If-Match`` works as for updates. Only tasks of the caller's teams can
+    be moved, the neighbours being in the same column.
+    """
+    serializer_class = TaskMoveSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+        sprints = Sprint.objects.filter(Q(project__team__owner=user) | Q(project__team__members=user)).values('pk')
+        if not Task.objects.filter(pk=kwargs['pk'], sprint__in=sprints).exists():
+            raise Http404
+        if_match = request.META.get('HTTP_IF_MATCH')
+        versions = if_match_versions(if_match) if if_match else None
+        try:
+            task = Task.move(kwargs['pk'], versions=versions, **serializer.validated_data)
+        except InvalidMove as error:
+            return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        if task is None:
+            if not Task.objects.filter(pk=kwargs['pk']).exists():
+                raise Http404
+            return Response({'message': 'The task was changed by someone else. Reload it and try again.'},
+                            status=status.HTTP_412_PRECONDITION_FAILED)
+        return Response(TaskSerializer(task).data, headers=validator_headers(task))
+
+
+# Make a Task Block Another
+class TaskDependencyCreateView(generics.CreateAPIView):
+    """
+    Make a task block another task of its sprint, both of the caller's teams.
+
+    A link that would make a task block itself, through any number of other
+    tasks, is rejected.
+    """
+    serializer_class = TaskDependencySerializer
+
+    def get_serializer_context(self):
+        user = self.request.user
+        sprints = Sprint.objects.filter(Q(project__team__owner=user) | Q(project__team__members=user)).values('pk')
+        return {**super().get_serializer_context(), 'tasks': Task.objects.filter(sprint__in=sprints)}
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            link = TaskDependency.link(serializer.validated_data['blocker'], serializer.validated_data['blocked'])
+        except DependencyCycle as error:
+            return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            return Response({'message': 'The task blocks this task already.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(link).data, status=status.HTTP_201_CREATED)
+
+
+# Remove a Task Dependency
+class TaskDependencyDeleteView(generics.DestroyAPIView):
+    """
+    Remove a link between two tasks of the caller's teams.
+    """
+    serializer_class = TaskDependencySerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        sprints = Sprint.objects.filter(Q(project__team__owner=user) | Q(project__team__members=user)).values('pk')
+        return TaskDependency.objects.filter(blocker__sprint__in=sprints)
+
 
 # Delete Task
 class TaskDeleteView(generics.DestroyAPIView):
@@ -39,11 +316,49 @@ class AssignTaskView(views.APIView):
         return Response(status=status.HTTP_200_OK)
 
 
-# Attach Label to Task
-class AttachLabelView(views.APIView):
+# Tasks of the caller's teams for the label serializers
+class TeamTasksMixin:
+    """Gives the serializers the tasks of the caller's teams to pick from."""
+
+    def get_serializer_context(self):
+        user = self.request.user
+        sprints = Sprint.objects.filter(Q(project__team__owner=user) | Q(project__team__members=user)).values('pk')
+        return {'request': self.request, 'tasks': Task.objects.filter(sprint__in=sprints)}
+
+
+# Attach Labels to Task
+class AttachLabelView(TeamTasksMixin, views.APIView):
     def post(self, request, task_id):
-        # Implement label attachment logic here
-        return Response(status=status.HTTP_200_OK)
+        body = TaskLabelAttachSerializer(data=request.data)
+        body.is_valid(raise_exception=True)
+        serializer = TaskLabelBulkSerializer(data={'tasks': [task_id], 'labels': body.validated_data['labels']},
+                                             context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        TaskLabel.attach([task_id], serializer.validated_data['labels'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# Attach or Detach Labels for Many Tasks
+class TaskLabelBulkView(TeamTasksMixin, views.APIView):
+    """
+    Attach (POST) or detach (DELETE) every label in ``labels`` to every task in ``tasks``.
+
+    Pairs that are already attached, or already detached, are left alone.
+    Tasks of other teams than the caller's are unknown ids.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = TaskLabelBulkSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        TaskLabel.attach(serializer.validated_data['tasks'], serializer.validated_data['labels'],
+                         batch_size=settings.TASKS_BULK_BATCH_SIZE)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def delete(self, request, *args, **kwargs):
+        serializer = TaskLabelBulkSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        detached = TaskLabel.detach(serializer.validated_data['tasks'], serializer.validated_data['labels'])
+        return Response({'detached': detached}, status=status.HTTP_200_OK)
 
 
 # Create Comment for Task
@@ -52,6 +367,33 @@ class CommentCreateView(generics.CreateAPIView):
     serializer_class = CommentSerializer
 
 
+# List the Comments of a Task
+class TaskCommentListView(generics.ListAPIView):
+    """
+    List a task's comments oldest first, a keyset page at a time.
+
+    ``threaded=true`` lists only the comments that are not replies, each with
+    its ``reply_count``; ``parent=<id>`` lists the replies to one comment.
+    Authors are joined into the page query.
+    """
+    serializer_class = DiscussionCommentSerializer
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        task = get_object_or_404(Task.objects.select_related('sprint__project__team__owner'), pk=kwargs['task_id'])
+        team = task.sprint.project.team if task.sprint is not None else None
+        if team is None or not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to read this discussion.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        params = DiscussionQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return Comment.discussion(self.kwargs['task_id'], parent_id=params.validated_data.get('parent'),
+                                  top_level=params.validated_data['threaded'])
+
+
 # Delete Comment
 class CommentDeleteView(generics.DestroyAPIView):
     queryset = Comment.objects.all()
@@ -64,6 +406,120 @@ class AttachmentCreateView(generics.CreateAPIView):
     serializer_class = AttachmentSerializer
 
 
+# Start a chunked Attachment upload
+class AttachmentUploadCreateView(generics.CreateAPIView):
+    """
+    Start uploading an attachment in chunks.
+
+    Send the chunks with ``PUT`` to the upload, each at the ``offset`` where
+    the previous one ended, then finalize it to create the attachment.
+    """
+    serializer_class = AttachmentUploadSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sprint = serializer.validated_data['task'].sprint
+        team = sprint.project.team if sprint is not None else None
+        if team is None or not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to attach files to this task.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# Resume and send chunks of an Attachment upload
+class AttachmentUploadView(views.APIView):
+    """
+    ``GET`` returns the upload with the ``offset`` to continue from.
+
+    ``PUT`` appends the raw request body at ``?offset=``, which must be the
+    upload's current offset. The body is streamed to disk, never read whole.
+    """
+
+    def get(self, request, pk):
+        upload = get_object_or_404(AttachmentUpload, pk=pk, user=request.user)
+        upload.offset = uploads.received(upload)
+        return Response(AttachmentUploadSerializer(upload).data)
+
+    def put(self, request, pk):
+        try:
+            offset = int(request.query_params['offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({'message': 'An integer offset is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < length <= settings.TASKS_UPLOAD_CHUNK_SIZE:
+            return Response({'message': f'Chunks must be 1 to {settings.TASKS_UPLOAD_CHUNK_SIZE} bytes.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        with transaction.atomic():
+            upload = get_object_or_404(AttachmentUpload.objects.select_for_update(), pk=pk, user=request.user)
+            if upload.attachment_id is not None:
+                return Response({'message': 'This upload is already finalized.'}, status=status.HTTP_409_CONFLICT)
+            upload.offset = uploads.received(upload)
+            if offset != upload.offset:
+                upload.save(update_fields=['offset', 'updated_at'])
+                return Response({'message': 'Send the chunk at the current offset.', 'offset': upload.offset},
+                                status=status.HTTP_409_CONFLICT)
+            if offset + length > upload.size:
+                return Response({'message': 'The chunk goes past the end of the file.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            try:
+                uploads.write_chunk(upload, request.stream, length)
+            except ValidationError as error:
+                return Response({'message': error.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+            upload.save(update_fields=['offset', 'updated_at'])
+        return Response(AttachmentUploadSerializer(upload).data)
+
+
+# Finalize an Attachment upload
+class AttachmentUploadFinalizeView(views.APIView):
+    """
+    Create the attachment from a completely received upload.
+
+    Finalizing again returns the same attachment, so a lost response can be retried.
+    """
+
+    def post(self, request, pk):
+        with transaction.atomic():
+            upload = get_object_or_404(AttachmentUpload.objects.select_for_update(), pk=pk, user=request.user)
+            if upload.attachment_id is not None:
+                return Response(AttachmentSerializer(upload.attachment).data, status=status.HTTP_200_OK)
+            if uploads.received(upload) != upload.size:
+                return Response({'message': 'The upload is not complete.', 'offset': uploads.received(upload)},
+                                status=status.HTTP_409_CONFLICT)
+            try:
+                attachment = uploads.finalize(upload)
+            except ValidationError as error:
+                # The received bytes are corrupt, so the upload starts over.
+                uploads.discard(upload)
+                upload.offset = 0
+                upload.save(update_fields=['offset', 'updated_at'])
+                return Response({'message': error.messages[0], 'offset': 0}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(AttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
+
+
+# Download Attachment
+class AttachmentDownloadView(views.APIView):
+    """
+    Download the file of an attachment of one of the caller's teams.
+
+    Supports conditional requests and single byte ranges; see ``serve_attachment``.
+    """
+
+    def get(self, request, pk):
+        attachments = Attachment.objects.select_related('task__sprint__project__team__owner')
+        attachment = get_object_or_404(attachments, pk=pk)
+        sprint = attachment.task.sprint
+        team = sprint.project.team if sprint is not None else None
+        if team is None or not (team.is_owner(request.user) or team.is_member(request.user)):
+            return Response({'message': 'You do not have permission to download this attachment.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        try:
+            return serve_attachment(request, attachment)
+        except FileNotFoundError:
+            raise Http404('The file of this attachment is missing.')
+
+
 # Delete Attachment
 class AttachmentDeleteView(generics.DestroyAPIView):
     queryset = Attachment.objects.all()
@@ -75,9 +531,41 @@ class WorkTimeCreateView(generics.CreateAPIView):
     queryset = WorkTime.objects.all()
     serializer_class = WorkTimeSerializer
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            worktime = WorkTime.start(request.user, serializer.validated_data['task'])
+        except OverlappingWorkTime as error:
+            return Response({'message': str(error)}, status=status.HTTP_409_CONFLICT)
+        except IntegrityError:
+            return Response({'message': 'Another timer was started at the same time.'},
+                            status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(worktime).data, status=status.HTTP_201_CREATED)
+
+
+# Running WorkTime of the user
+class WorkTimeActiveView(views.APIView):
+    def get(self, request):
+        worktime = WorkTime.active(request.user)
+        if worktime is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(WorkTimeSerializer(worktime).data)
+
 
 # Complete WorkTime
 class WorkTimeCompleteView(views.APIView):
     def post(self, request, worktime_id):
-        # Implement worktime completion logic here
-        return Response(status=status.HTTP_200_OK)
+        try:
+            with transaction.atomic():
+                worktime = get_object_or_404(WorkTime.objects.select_for_update(), pk=worktime_id)
+                if worktime.user_id is not None and worktime.user_id != request.user.pk:
+                    return Response({'message': 'You can only complete your own work times.'},
+                                    status=status.HTTP_403_FORBIDDEN)
+                if worktime.end_date is not None:
+                    return Response({'message': 'This work time is already completed.'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                worktime.complete_worktime(timezone.now(), user=request.user)
+        except OverlappingWorkTime as error:
+            return Response({'message': str(error)}, status=status.HTTP_409_CONFLICT)
+        return Response(WorkTimeSerializer(worktime).data, status=status.HTTP_200_OK)